@@ -0,0 +1,73 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import typer
+
+from .bulk import describe_error
+
+FAN_OUT_OPTION = typer.Option(8, "--concurrency", min=1, help="Number of requests to run at once.")
+
+
+async def call(func, *args, **kwargs):
+    """Run a blocking API call on a worker thread without blocking the event loop."""
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+
+async def gather_bounded(calls, limit):
+    """
+    Await every coroutine factory in ``calls`` with at most ``limit`` in flight.
+
+    Results come back in input order. A call that raises returns its
+    exception in place instead of cancelling the others.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(factory):
+        async with semaphore:
+            try:
+                return await factory()
+            except Exception as e:  # noqa: BLE001
+                return e
+
+    return await asyncio.gather(*(run(factory) for factory in calls))
+
+
+def fan_out(func, items, limit):
+    """
+    Call the blocking ``func`` on every item concurrently and return ``(item, result, error)`` tuples.
+
+    The calls share the process-wide API client, so the whole fan-out takes
+    about as long as its slowest request when ``limit`` covers every item.
+    """
+    items = list(items)
+
+    async def main():
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=limit))
+        return await gather_bounded([functools.partial(call, func, item) for item in items], limit)
+
+    results = asyncio.run(main()) if items else []
+    return [
+        (item, None, result) if isinstance(result, Exception) else (item, result, None)
+        for item, result in zip(items, results)
+    ]
+
+
+def usage_rows(objects, used_by, limit, key=lambda obj: obj.pk):
+    """
+    Fetch what uses each of ``objects`` and return ``(rows, failed)``.
+
+    ``used_by`` is a ``*_used_by_list`` method taking the value of ``key``.
+    Each row has ``pk``, ``name``, ``used_by`` and ``error`` fields.
+    """
+    rows = []
+    failed = 0
+    for obj, result, error in fan_out(lambda obj: used_by(key(obj)), objects, limit):
+        failed += error is not None
+        rows.append({
+            "pk": str(obj.pk),
+            "name": obj.name,
+            "used_by": [item.to_dict() for item in result or []],
+            "error": describe_error(error) if error is not None else None,
+        })
+    return rows, failed
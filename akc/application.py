@@ -1,11 +1,23 @@
+import pathlib
+
 import typer
-from rich.console import Console
-from rich.table import Table
-import json
 from authentik_client import api
 from authentik_client.exceptions import ApiException
 from authentik_client.models import Application, PatchedApplicationRequest
-from .main import get_client, app
+from rich.console import Console
+
+from .cache import NO_CACHE_OPTION, REFRESH_OPTION, cached, invalidate
+from .main import get_client
+from .output import OUTPUT_FILE_OPTION, OUTPUT_OPTION, print_items
+from .pagination import CONCURRENCY_OPTION, LIMIT_OPTION, PAGE_SIZE_OPTION, paginate
+from .query import (
+    FIELDS_OPTION,
+    FILTER_OPTION,
+    ORDERING_OPTION,
+    SEARCH_OPTION,
+    query_params,
+)
+from .resolve import forget, reindex, resolve
 
 app_app = typer.Typer()
 console = Console()
@@ -23,47 +35,60 @@ def create_application(
     application = Application(name=name, slug=slug)
     try:
         new_app = applications_api.applications_create(application)
+        invalidate("applications")
         console.print(f"[bold green]Application '{new_app.name}' created successfully.[/bold green]")
     except Exception as e:
         console.print(f"[bold red]Error creating application: {e}[/bold red]")
+        raise typer.Exit(1)
 
 @app_app.command("list")
-def list_applications(output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")):
+def list_applications(
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    filters: list[str] = FILTER_OPTION,
+    search: str = SEARCH_OPTION,
+    ordering: str = ORDERING_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
     """
     List all applications.
     """
     client = get_client()
     applications_api = api.ApplicationsApi(client)
+    params = query_params(applications_api.applications_list, filters, search, ordering)
     try:
-        apps = applications_api.applications_list()
-        if output == "json":
-            console.print(json.dumps([a.to_dict() for a in apps.results], indent=2))
-        else:
-            table = Table(title="Applications")
-            table.add_column("ID", style="cyan")
-            table.add_column("Name", style="magenta")
-            table.add_column("Slug", style="green")
-            for app in apps.results:
-                table.add_row(app.pk, app.name, app.slug)
-            console.print(table)
+        apps = paginate(cached(applications_api.applications_list, "applications", no_cache, refresh), page_size=page_size, limit=limit, concurrency=concurrency, **params)
+        print_items(console, apps, output, "Applications", [
+            ("ID", "cyan", lambda a: a.pk),
+            ("Name", "magenta", lambda a: a.name),
+            ("Slug", "green", lambda a: a.slug),
+        ], fields, output_file)
     except Exception as e:
         console.print(f"[bold red]Error listing applications: {e}[/bold red]")
+        raise typer.Exit(1)
 
 @app_app.command("get")
-def get_application(app_id: str = typer.Argument(..., help="The UUID of the application.")):
+def get_application(app_id: str = typer.Argument(..., help="The UUID, slug or name of the application.")):
     """Get an application by UUID."""
     client = get_client()
     applications_api = api.ApplicationsApi(client)
     console = Console()
     try:
+        app_id = resolve(client, "application", app_id)
         application = applications_api.applications_retrieve(application_uuid=app_id)
         console.print(application.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @app_app.command("update")
 def update_application(
-    app_id: str = typer.Argument(..., help="The ID of the application to update."),
+    app_id: str = typer.Argument(..., help="The UUID, slug or name of the application to update."),
     name: str = typer.Option(None, "--name", help="New name for the application."),
     slug: str = typer.Option(None, "--slug", help="New slug for the application."),
 ):
@@ -73,6 +98,7 @@ def update_application(
     client = get_client()
     applications_api = api.ApplicationsApi(client)
     try:
+        app_id = resolve(client, "application", app_id)
         update_data = PatchedApplicationRequest()
         if name is not None:
             update_data.name = name
@@ -84,48 +110,59 @@ def update_application(
             return
 
         updated_app = applications_api.applications_partial_update(application_uuid=app_id, patched_application_request=update_data)
+        invalidate("applications")
+        reindex(client, "application", updated_app)
         console.print(f"[bold green]Application '{updated_app.name}' (ID: {updated_app.pk}) updated successfully.[/bold green]")
     except Exception as e:
         console.print(f"[bold red]Error updating application: {e}[/bold red]")
+        raise typer.Exit(1)
 
 @app_app.command("delete")
-def delete_application(app_id: str = typer.Argument(..., help="The ID of the application to delete.")):
+def delete_application(app_id: str = typer.Argument(..., help="The UUID, slug or name of the application to delete.")):
     """
     Delete an application.
     """
     client = get_client()
     applications_api = api.ApplicationsApi(client)
     try:
+        app_id = resolve(client, "application", app_id)
         applications_api.applications_destroy(application_uuid=app_id)
+        invalidate("applications")
+        forget(client, "application", app_id)
         console.print(f"[bold green]Application with ID {app_id} deleted successfully.[/bold green]")
     except Exception as e:
         console.print(f"[bold red]Error deleting application: {e}[/bold red]")
+        raise typer.Exit(1)
 
 
 @app_app.command("assign-provider")
 def assign_provider(
-    app_id: str = typer.Argument(..., help="The UUID of the application."),
-    provider_id: int = typer.Argument(..., help="The ID of the provider to assign."),
+    app_id: str = typer.Argument(..., help="The UUID, slug or name of the application."),
+    provider_id: str = typer.Argument(..., help="The ID or name of the provider to assign."),
 ):
     """Assign a provider to an application."""
     client = get_client()
     applications_api = api.ApplicationsApi(client)
     try:
+        app_id = resolve(client, "application", app_id)
+        provider_id = resolve(client, "provider", provider_id)
         update_data = PatchedApplicationRequest(provider=provider_id)
         updated_app = applications_api.applications_partial_update(
             application_uuid=app_id, patched_application_request=update_data
         )
+        invalidate("applications", "providers")
         console.print(
             f"[bold green]Provider with ID {provider_id} assigned to application '{updated_app.name}' successfully.[/bold green]"
         )
     except ApiException as e:
         console.print(f"[bold red]Error assigning provider: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 
 @app_app.command("bind-flow")
 def bind_flow(
-    app_id: str = typer.Argument(..., help="The UUID of the application."),
-    flow_slug: str = typer.Argument(..., help="The slug of the flow to bind."),
+    app_id: str = typer.Argument(..., help="The UUID, slug or name of the application."),
+    flow_slug: str = typer.Argument(..., help="The slug or UUID of the flow to bind."),
     flow_type: str = typer.Option(
         "authorization",
         "--flow-type",
@@ -136,15 +173,10 @@ def bind_flow(
     """Bind a flow to an application."""
     client = get_client()
     applications_api = api.ApplicationsApi(client)
-    flows_api = api.FlowsApi(client)
 
     try:
-        # Find the flow by slug to get its UUID
-        flows = flows_api.flows_instances_list(slug=flow_slug)
-        if not flows.results:
-            console.print(f"[bold red]Flow with slug '{flow_slug}' not found.[/bold red]")
-            raise typer.Exit(1)
-        flow_uuid = flows.results[0].pk
+        app_id = resolve(client, "application", app_id)
+        flow_uuid = resolve(client, "flow", flow_slug)
 
         update_data = PatchedApplicationRequest()
         if flow_type == "authorization":
@@ -160,11 +192,10 @@ def bind_flow(
         updated_app = applications_api.applications_partial_update(
             application_uuid=app_id, patched_application_request=update_data
         )
+        invalidate("applications")
         console.print(
             f"[bold green]Flow '{flow_slug}' bound to application '{updated_app.name}' as {flow_type} flow.[/bold green]"
         )
     except ApiException as e:
         console.print(f"[bold red]Error binding flow: {e.body}[/bold red]")
-
-
-app.add_typer(app_app, name="application")
+        raise typer.Exit(1)
@@ -0,0 +1,151 @@
+import datetime
+import glob
+import gzip
+import json
+import os
+import uuid
+
+# High-water mark of an archive directory: the newest archived event.
+STATE_FILE = "_state.json"
+FORMATS = ("ndjson", "parquet")
+EXTENSIONS = {"ndjson": ".ndjson.gz", "parquet": ".parquet"}
+
+
+def parquet_available():
+    """Return True if pyarrow is installed and Parquet output can be written."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_format(fmt):
+    """Turn a ``--format`` value into ``ndjson`` or ``parquet``, preferring Parquet for ``auto``."""
+    if fmt == "auto":
+        return "parquet" if parquet_available() else "ndjson"
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown archive format '{fmt}', expected auto, ndjson or parquet.")
+    if fmt == "parquet" and not parquet_available():
+        raise ValueError("Parquet output needs pyarrow. Install it or use --format ndjson.")
+    return fmt
+
+
+def load_mark(directory):
+    """Return ``(created, pks)`` of the newest archived events, or ``(None, set())`` for a new archive."""
+    try:
+        with open(os.path.join(directory, STATE_FILE)) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None, set()
+    return datetime.datetime.fromisoformat(state["created"]), set(state["pks"])
+
+
+def save_mark(directory, created, pks):
+    path = os.path.join(directory, STATE_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"created": created.isoformat(), "pks": sorted(str(pk) for pk in pks)}, f)
+    os.replace(tmp_path, path)
+
+
+def event_day(event):
+    """Return the UTC calendar day an event belongs to."""
+    created = event.created
+    if created.tzinfo is not None:
+        created = created.astimezone(datetime.UTC)
+    return created.date().isoformat()
+
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("pk", pa.string()),
+        ("created", pa.string()),
+        ("action", pa.string()),
+        ("app", pa.string()),
+        ("client_ip", pa.string()),
+        ("username", pa.string()),
+        ("data", pa.string()),
+    ])
+
+
+def _parquet_row(event, data):
+    return {
+        "pk": str(event.pk),
+        "created": event.created.isoformat(),
+        "action": data.get("action"),
+        "app": data.get("app"),
+        "client_ip": data.get("client_ip"),
+        "username": (data.get("user") or {}).get("username"),
+        "data": json.dumps(data, default=str),
+    }
+
+
+def clean_incomplete(directory):
+    """Remove part files left behind by an interrupted run."""
+    for path in glob.glob(os.path.join(directory, "date=*", ".*.tmp")):
+        os.remove(path)
+
+
+class PartitionWriter:
+    """
+    Write the events of one archive run into per-day part files.
+
+    Files are created as hidden temporaries under ``date=YYYY-MM-DD/`` and
+    only renamed into place by ``commit``. An interrupted run therefore
+    never leaves events that the high-water mark does not cover.
+    """
+
+    def __init__(self, directory, fmt):
+        self.directory = directory
+        self.fmt = fmt
+        self.run_id = datetime.datetime.now(datetime.UTC).strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:8]
+        self.files = {}
+        self.count = 0
+
+    def _open(self, day):
+        partition = os.path.join(self.directory, f"date={day}")
+        os.makedirs(partition, exist_ok=True)
+        name = f"part-{self.run_id}{EXTENSIONS[self.fmt]}"
+        tmp_path = os.path.join(partition, f".{name}.tmp")
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            handle = pq.ParquetWriter(tmp_path, _parquet_schema(), compression="zstd")
+        else:
+            handle = gzip.open(tmp_path, "wt", encoding="utf-8")  # noqa: SIM115
+        self.files[day] = (tmp_path, os.path.join(partition, name), handle)
+        return handle
+
+    def write(self, events):
+        """Append a batch of events, typically one page, to their day partitions."""
+        by_day = {}
+        for event in events:
+            by_day.setdefault(event_day(event), []).append(event)
+        for day, day_events in by_day.items():
+            handle = self.files[day][2] if day in self.files else self._open(day)
+            if self.fmt == "parquet":
+                import pyarrow as pa
+
+                rows = [_parquet_row(event, event.to_dict()) for event in day_events]
+                handle.write_table(pa.Table.from_pylist(rows, schema=_parquet_schema()))
+            else:
+                for event in day_events:
+                    handle.write(json.dumps(event.to_dict(), default=str))
+                    handle.write("\n")
+            self.count += len(day_events)
+
+    def commit(self):
+        """Close every part file and publish it."""
+        for tmp_path, path, handle in self.files.values():
+            handle.close()
+            os.replace(tmp_path, path)
+        return len(self.files)
+
+    def abort(self):
+        """Close and delete every part file of this run."""
+        for tmp_path, _, handle in self.files.values():
+            handle.close()
+            os.remove(tmp_path)
@@ -0,0 +1,163 @@
+import contextlib
+import io
+import json
+import pathlib
+import sys
+import threading
+import time
+
+import typer
+from rich.console import Console
+
+from .concurrency import ordered_map
+from .main import app
+from .shell import run_line
+
+batch_app = typer.Typer()
+console = Console(stderr=True)
+
+REPORT_OPTION = typer.Option(None, "--report", dir_okay=False, help="Write the report to this file instead of stdout.")
+
+# Commands that cannot run inside a batch.
+NESTED_COMMANDS = ("batch", "shell")
+
+
+class ThreadLocalStream:
+    """
+    Stand-in for ``sys.stdout``/``sys.stderr`` that captures output per thread.
+
+    Rich consoles created without a file look up ``sys.stdout`` on every
+    print. Output from a thread that called ``capture`` therefore lands in
+    that thread's buffer, and other threads write to the wrapped stream.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self):
+        self._local.buffer = io.StringIO()
+        return self._local.buffer
+
+    def release(self):
+        buffer = self._local.buffer
+        self._local.buffer = None
+        return buffer.getvalue()
+
+    @property
+    def _target(self):
+        buffer = getattr(self._local, "buffer", None)
+        return self._stream if buffer is None else buffer
+
+    def write(self, text):
+        return self._target.write(text)
+
+    def flush(self):
+        self._target.flush()
+
+    def isatty(self):
+        return self._target.isatty()
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+@contextlib.contextmanager
+def captured_streams():
+    """Swap in thread-local stdout and stderr proxies for the duration of the block."""
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = ThreadLocalStream(stdout), ThreadLocalStream(stderr)
+    try:
+        yield sys.stdout, sys.stderr
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+
+
+def read_commands(source):
+    """Yield ``(line_number, command)`` for each non-blank, non-comment line."""
+    for number, line in enumerate(source, 1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield number, line
+
+
+def run_commands(root, commands, parallel, stdout, stderr):
+    """
+    Run numbered command lines, yielding one result dict per line in input order.
+
+    With ``parallel`` above one, lines run concurrently on a bounded pool
+    and must not depend on each other. Output is captured per line.
+    """
+
+    def run(numbered):
+        number, line = numbered
+        stdout.capture()
+        stderr.capture()
+        started = time.perf_counter()
+        try:
+            if line.split()[0] in NESTED_COMMANDS:
+                print(f"'{line.split()[0]}' cannot run inside a batch.", file=sys.stderr)
+                exit_code = 2
+            else:
+                exit_code = run_line(root, line)
+        except Exception as e:  # noqa: BLE001
+            print(f"Error: {e}", file=sys.stderr)
+            exit_code = 1
+        finally:
+            duration = time.perf_counter() - started
+            output, error = stdout.release(), stderr.release()
+        return {
+            "line": number,
+            "command": line,
+            "exit_code": exit_code,
+            "status": "ok" if exit_code == 0 else "error",
+            "duration_ms": round(duration * 1000, 1),
+            "output": output,
+            "error": error,
+        }
+
+    return ordered_map(run, commands, parallel)
+
+
+@batch_app.command()
+def batch(
+    file: str = typer.Argument(..., help="File with one akc command per line, or - to read standard input."),
+    parallel: int = typer.Option(1, "--parallel", min=1, help="Number of lines to run at once. Only use with independent lines."),
+    report: pathlib.Path = REPORT_OPTION,
+    fail_fast: bool = typer.Option(False, "--fail-fast", help="Stop after the first failing line."),
+):
+    """
+    Run many akc commands in one process and report the result of each as NDJSON.
+    """
+    root = typer.main.get_command(app)
+    if file == "-":
+        commands = list(read_commands(sys.stdin))
+    else:
+        with open(file) as source:
+            commands = list(read_commands(source))
+
+    # Import every subcommand module up front so workers never race on it.
+    context = typer.Context(root)
+    for name in {line.split()[0] for _, line in commands}:
+        if name not in NESTED_COMMANDS:
+            root.get_command(context, name)
+
+    total = failed = 0
+    started = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        report_file = stack.enter_context(open(report, "w")) if report is not None else sys.stdout
+        stdout, stderr = stack.enter_context(captured_streams())
+        results = run_commands(root, iter(commands), parallel, stdout, stderr)
+        for result in results:
+            total += 1
+            report_file.write(json.dumps(result) + "\n")
+            report_file.flush()
+            if result["status"] != "ok":
+                failed += 1
+                if fail_fast:
+                    results.close()
+                    break
+
+    console.print(f"{total} commands run in {time.perf_counter() - started:.2f}s, {failed} failed.")
+    if failed:
+        raise typer.Exit(1)
@@ -0,0 +1,141 @@
+import csv
+import itertools
+import json
+import os
+
+from .concurrency import ordered_map
+
+
+def read_rows(path):
+    """
+    Lazily yield one dict per record of an input file.
+
+    ``.csv`` files are read with their header row as keys; anything else is
+    treated as JSON Lines with one object per line.
+    """
+    with open(path, newline="") as f:
+        if str(path).lower().endswith(".csv"):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def read_names(path):
+    """Lazily yield the non-empty, non-comment lines of a file, stripped."""
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+def unique(items):
+    """Yield items in order, dropping repeats."""
+    seen = set()
+    for item in items:
+        if item not in seen:
+            seen.add(item)
+            yield item
+
+
+def parse_bool(value, default=None):
+    """Interpret a CSV/JSON cell as a boolean, falling back to ``default`` when empty."""
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+def describe_error(error):
+    """Return the most useful message for a failed API call."""
+    return getattr(error, "body", None) or str(error)
+
+
+class Checkpoint:
+    """
+    Input rows already processed, persisted in a small file.
+
+    The first line holds the number of leading rows processed, the second
+    the numbers of those rows that failed and should be tried again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return f.read().splitlines()
+        except FileNotFoundError:
+            return []
+
+    def load(self):
+        lines = self._read()
+        return int(lines[0].strip() or 0) if lines else 0
+
+    def failed(self):
+        lines = self._read()
+        return {int(number) for number in lines[1].split(",") if number.strip()} if len(lines) > 1 else set()
+
+    def save(self, count, failed=()):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(count))
+            if failed:
+                f.write("\n" + ",".join(str(number) for number in sorted(failed)))
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def process_rows(func, rows, concurrency, checkpoint=None, log=None, label=None):
+    """
+    Apply ``func`` to every row on a bounded worker pool, yielding one result dict per row.
+
+    Rows are numbered from 1 and results come back in input order. A row
+    whose call raises is reported with ``status: error`` instead of stopping
+    the run. Each result is appended to ``log`` as a JSON line, and the
+    ``checkpoint`` is advanced after it. Rows the checkpoint already covers
+    are skipped, so an interrupted run resumes where it stopped, and rows
+    it records as failed are tried again. ``label(row)`` may return fields
+    to include in every result, such as the username.
+    """
+    start = checkpoint.load() if checkpoint else 0
+    failed = checkpoint.failed() if checkpoint else set()
+    numbered = enumerate(rows, 1)
+    if failed:
+        numbered = (item for item in numbered if item[0] > start or item[0] in failed)
+    else:
+        numbered = itertools.islice(numbered, start, None)
+    done = start
+
+    def run(numbered_row):
+        number, row = numbered_row
+        result = {"row": number, **(label(row) if label else {})}
+        try:
+            result.update(func(row) or {})
+            result["status"] = "ok"
+        except Exception as e:  # noqa: BLE001
+            result["status"] = "error"
+            result["error"] = describe_error(e)
+        return result
+
+    for result in ordered_map(run, numbered, concurrency):
+        if log is not None:
+            log.write(json.dumps(result, default=str) + "\n")
+            log.flush()
+        if checkpoint:
+            done = max(done, result["row"])
+            if result["status"] == "error":
+                failed.add(result["row"])
+            else:
+                failed.discard(result["row"])
+            checkpoint.save(done, failed)
+        yield result
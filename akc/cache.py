@@ -0,0 +1,148 @@
+import hashlib
+import importlib
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlencode
+
+import typer
+
+from .main import CONFIG_PATH, get_config
+
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "akc")
+CACHE_PATH = os.path.join(CACHE_DIR, "cache.sqlite")
+
+# Seconds a cached list page stays fresh. Override per resource with the
+# "cache_ttl" mapping in ~/.akc_config.json.
+DEFAULT_TTL = 60
+DEFAULT_TTLS = {
+    "groups": 300,
+    "roles": 300,
+    "flows": 300,
+    "stages": 300,
+    "applications": 300,
+    "providers": 300,
+    "policies": 300,
+    "propertymappings": 300,
+    "sources": 300,
+    "events": 0,
+}
+
+# Entries older than this are purged regardless of their resource TTL.
+MAX_AGE = 24 * 60 * 60
+
+NO_CACHE_OPTION = typer.Option(False, "--no-cache", envvar="AKC_NO_CACHE", help="Bypass the local response cache.")
+REFRESH_OPTION = typer.Option(False, "--refresh", help="Ignore cached results and refetch them.")
+
+_lock = threading.Lock()
+_connection = None
+
+
+def _connect():
+    global _connection
+    if _connection is None:
+        # Cached pages hold user data, so keep them private to the user.
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+        _connection = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        with _connection:
+            _connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, resource TEXT NOT NULL, model TEXT NOT NULL, "
+                "body TEXT NOT NULL, hash TEXT NOT NULL, stored REAL NOT NULL)"
+            )
+            _connection.execute("CREATE INDEX IF NOT EXISTS entries_resource ON entries (resource)")
+            _connection.execute("DELETE FROM entries WHERE stored < ?", (time.time() - MAX_AGE,))
+    return _connection
+
+
+def ttl_for(resource):
+    """Return the freshness lifetime in seconds for cached pages of ``resource``."""
+    overrides = get_config().get("cache_ttl", {}) if os.path.exists(CONFIG_PATH) else {}
+    return overrides.get(resource, DEFAULT_TTLS.get(resource, DEFAULT_TTL))
+
+
+def _load_model(path, body):
+    module_name, _, class_name = path.rpartition(".")
+    return getattr(importlib.import_module(module_name), class_name).from_json(body)
+
+
+def lookup(key, ttl):
+    """Return the cached response stored under ``key`` if it is younger than ``ttl`` seconds."""
+    try:
+        with _lock:
+            row = _connect().execute("SELECT model, body, stored FROM entries WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None or time.time() - row[2] >= ttl:
+        return None
+    return _load_model(row[0], row[1])
+
+
+def store(key, resource, response):
+    """
+    Store ``response`` under ``key``.
+
+    An entry whose content hash is unchanged only has its timestamp bumped,
+    so revalidating a stale page that did not change costs no rewrite.
+    """
+    body = response.to_json()
+    digest = hashlib.sha256(body.encode()).hexdigest()
+    model = f"{type(response).__module__}.{type(response).__qualname__}"
+    try:
+        with _lock:
+            connection = _connect()
+            with connection:
+                updated = connection.execute(
+                    "UPDATE entries SET stored = ? WHERE key = ? AND hash = ?", (time.time(), key, digest)
+                ).rowcount
+                if not updated:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO entries (key, resource, model, body, hash, stored) VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, resource, model, body, digest, time.time()),
+                    )
+    except sqlite3.Error:
+        pass
+
+
+def invalidate(*resources):
+    """Drop every cached page of the given resource types."""
+    try:
+        with _lock:
+            connection = _connect()
+            with connection:
+                connection.executemany("DELETE FROM entries WHERE resource = ?", [(r,) for r in resources])
+    except sqlite3.Error:
+        pass
+
+
+def cached(list_method, resource, no_cache=False, refresh=False):
+    """
+    Wrap a paginated ``*_list`` API method with the local response cache.
+
+    Pages are keyed by server, API token, endpoint and query parameters, so
+    tokens with different permissions never share pages. The token is only
+    stored as a hash. With ``no_cache`` the method is returned untouched;
+    with ``refresh`` cached pages are ignored but the fresh responses are
+    still stored.
+    """
+    ttl = ttl_for(resource)
+    if no_cache or ttl <= 0:
+        return list_method
+    api_client = getattr(getattr(list_method, "__self__", None), "api_client", None)
+    configuration = getattr(api_client, "configuration", None)
+    host = getattr(configuration, "host", "")
+    token = hashlib.sha256(str(getattr(configuration, "access_token", None) or "").encode()).hexdigest()[:16]
+    endpoint = f"{host}/{token}/{list_method.__name__}"
+
+    def cached_list_method(**kwargs):
+        key = f"{endpoint}?{urlencode(sorted(kwargs.items()), doseq=True)}"
+        if not refresh:
+            response = lookup(key, ttl)
+            if response is not None:
+                return response
+        response = list_method(**kwargs)
+        store(key, resource, response)
+        return response
+
+    return cached_list_method
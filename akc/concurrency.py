@@ -0,0 +1,31 @@
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def ordered_map(func, items, concurrency):
+    """
+    Apply ``func`` to ``items`` on a bounded thread pool.
+
+    Results are yielded in input order. At most ``concurrency`` calls are in
+    flight at a time and ``items`` is consumed lazily, so arbitrarily long
+    inputs can be processed with constant memory. An exception raised by
+    ``func`` is re-raised when its result is reached.
+    """
+    if concurrency <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = deque(executor.submit(func, item) for item in itertools.islice(items, concurrency))
+        try:
+            while pending:
+                result = pending.popleft().result()
+                for item in itertools.islice(items, 1):
+                    pending.append(executor.submit(func, item))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
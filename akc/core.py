@@ -1,13 +1,23 @@
-import typer
-from rich.console import Console
-from rich.table import Table
+import pathlib
 
+import typer
 from authentik_client import api
 from authentik_client.exceptions import ApiException
 from authentik_client.models.patched_tenant_request import PatchedTenantRequest
 from authentik_client.models.tenant_request import TenantRequest
+from rich.console import Console
 
+from .cache import NO_CACHE_OPTION, REFRESH_OPTION, cached, invalidate
 from .main import get_client
+from .output import OUTPUT_FILE_OPTION, print_items
+from .pagination import CONCURRENCY_OPTION, LIMIT_OPTION, PAGE_SIZE_OPTION, paginate
+from .query import (
+    FIELDS_OPTION,
+    FILTER_OPTION,
+    ORDERING_OPTION,
+    SEARCH_OPTION,
+    query_params,
+)
 
 app = typer.Typer()
 
@@ -23,34 +33,39 @@ def get_version():
         console.print(version.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 
 @app.command()
-def list_tenants(output: str = typer.Option("table", help="Output format (table or json)")):
+def list_tenants(
+    output: str = typer.Option("table", help="Output format (table, json, ndjson or csv)"),
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    filters: list[str] = FILTER_OPTION,
+    search: str = SEARCH_OPTION,
+    ordering: str = ORDERING_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
     """List all tenants."""
     client = get_client()
     core_api = api.CoreApi(client)
     console = Console()
+    params = query_params(core_api.core_tenants_list, filters, search, ordering)
     try:
-        tenants = core_api.core_tenants_list()
-        if output == "json":
-            console.print([t.to_dict() for t in tenants.results])
-        else:
-            table = Table(show_header=True, header_style="bold magenta")
-            table.add_column("Tenant UUID")
-            table.add_column("Schema Name")
-            table.add_column("Name")
-            table.add_column("Domain")
-            for tenant in tenants.results:
-                table.add_row(
-                    tenant.tenant_uuid,
-                    tenant.schema_name,
-                    tenant.name,
-                    tenant.domain if tenant.domain else ""
-                )
-            console.print(table)
+        tenants = paginate(cached(core_api.core_tenants_list, "tenants", no_cache, refresh), page_size=page_size, limit=limit, concurrency=concurrency, **params)
+        print_items(console, tenants, output, None, [
+            ("Tenant UUID", None, lambda t: t.tenant_uuid),
+            ("Schema Name", None, lambda t: t.schema_name),
+            ("Name", None, lambda t: t.name),
+            ("Domain", None, lambda t: t.domain if t.domain else ""),
+        ], fields, output_file)
     except ApiException as e:
         console.print(f"[bold red]Error: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 
 @app.command()
@@ -71,10 +86,12 @@ def create_tenant(
             tenant_data.domain = domain
 
         new_tenant = core_api.core_tenants_create(tenant_request=tenant_data)
+        invalidate("tenants")
         console.print(f"[bold green]Tenant '{new_tenant.name}' created successfully.[/bold green]")
         console.print(new_tenant.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 
 @app.command()
@@ -100,10 +117,12 @@ def update_tenant(
         updated_tenant = core_api.core_tenants_partial_update(
             tenant_uuid=tenant_uuid, patched_tenant_request=update_data
         )
+        invalidate("tenants")
         console.print(f"[bold green]Tenant '{updated_tenant.name}' updated successfully.[/bold green]")
         console.print(updated_tenant.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 
 @app.command()
@@ -117,6 +136,7 @@ def get_tenant(tenant_uuid: str = typer.Argument(..., help="The UUID of the tena
         console.print(tenant.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 
 @app.command()
@@ -127,6 +147,8 @@ def delete_tenant(tenant_uuid: str = typer.Argument(..., help="The UUID of the t
     console = Console()
     try:
         core_api.core_tenants_destroy(tenant_uuid=tenant_uuid)
+        invalidate("tenants")
         console.print(f"[bold green]Tenant with UUID '{tenant_uuid}' deleted successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error: {e.body}[/bold red]")
+        raise typer.Exit(1)
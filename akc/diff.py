@@ -0,0 +1,201 @@
+import collections
+import functools
+import json
+import pathlib
+
+import typer
+from rich.console import Console
+
+from .output import OUTPUT_FILE_OPTION, print_items
+from .snapshot import RESOURCES, read_manifest, read_records, record_hash, record_line
+
+diff_app = typer.Typer()
+console = Console()
+
+OLD_ARGUMENT = typer.Argument(..., exists=True, file_okay=False, help="The older snapshot directory.")
+NEW_ARGUMENT = typer.Argument(..., exists=True, file_okay=False, help="The newer snapshot directory.")
+RESOURCE_OPTION = typer.Option(None, "--resource", help="Only compare this resource type. Repeat for several.")
+IGNORE_OPTION = typer.Option(None, "--ignore", help="Top-level field to leave out of the comparison. Repeat for several.")
+err_console = Console(stderr=True)
+
+# Fields that name the same object on two different instances, where
+# primary keys differ. Bindings have no such field and stay keyed by pk.
+NATURAL_KEYS = {
+    "users": "username",
+    "groups": "name",
+    "roles": "name",
+    "applications": "slug",
+    "providers": "name",
+    "flows": "slug",
+    "stages": "name",
+    "policies": "name",
+    "policy_bindings": "pk",
+    "property_mappings": "name",
+    "sources": "slug",
+    "outposts": "name",
+}
+
+CHANGE_COLUMNS = [
+    ("Resource", "cyan", lambda c: c["resource"]),
+    ("Key", "magenta", lambda c: c["key"]),
+    ("Change", "green", lambda c: c["change"]),
+    ("Fields", "yellow", lambda c: ", ".join(f["field"] for f in c.get("fields", []))),
+]
+
+
+def records(directory, entry, key_field, ignore=()):
+    """
+    Yield ``(key, digest, record)`` for every line of one snapshot file.
+
+    The digest covers the canonical line, minus the ``ignore`` fields, so
+    equal digests mean equal records and no field comparison is needed.
+    """
+    if entry is None:
+        return
+    for _, line in read_records(directory, entry):
+        record = json.loads(line)
+        key = str(record.get(key_field))
+        if ignore:
+            for field in ignore:
+                record.pop(field, None)
+            line = record_line(record)
+        yield key, record_hash(line), record
+
+
+def field_changes(old, new, prefix=""):
+    """Return the fields that differ between two records, descending into nested objects."""
+    changes = []
+    for field in sorted(set(old) | set(new)):
+        path = f"{prefix}{field}"
+        before, after = old.get(field), new.get(field)
+        if isinstance(before, dict) and isinstance(after, dict):
+            changes.extend(field_changes(before, after, f"{path}."))
+        elif before != after or (field in old) != (field in new):
+            changes.append({"field": path, "old": before, "new": after})
+    return changes
+
+
+def _change(resource, key, kind, old=None, new=None):
+    change = {"resource": resource, "key": key, "change": kind}
+    if kind == "changed":
+        change["fields"] = field_changes(old, new)
+    else:
+        change["record"] = new if kind == "added" else old
+    return change
+
+
+def merge_changes(resource, old, new):
+    """
+    Compare two record streams sorted by key in a single pass.
+
+    Only the current record of each side is held, so snapshots of any size
+    can be compared. Records whose digests match are skipped untouched.
+    """
+    old, new = iter(old), iter(new)
+    a, b = next(old, None), next(new, None)
+    while a is not None or b is not None:
+        if b is None or (a is not None and a[0] < b[0]):
+            yield _change(resource, a[0], "removed", old=a[2])
+            a = next(old, None)
+        elif a is None or b[0] < a[0]:
+            yield _change(resource, b[0], "added", new=b[2])
+            b = next(new, None)
+        else:
+            if a[1] != b[1]:
+                yield _change(resource, a[0], "changed", a[2], b[2])
+            a, b = next(old, None), next(new, None)
+
+
+def hashed_changes(resource, old, new_records):
+    """
+    Compare two record streams in any order through a hash map of keys.
+
+    ``old`` is a callable returning a fresh stream of the older records. The
+    first pass keeps only their keys and digests; the records that changed
+    are read again in a second pass for their field-level diff.
+    """
+    digests = {key: digest for key, digest, _ in old()}
+    changed = {}
+    for key, digest, record in new_records:
+        previous = digests.pop(key, None)
+        if previous is None:
+            yield _change(resource, key, "added", new=record)
+        elif previous != digest:
+            changed[key] = record
+    if not changed and not digests:
+        return
+    for key, _, record in old():
+        if key in changed:
+            yield _change(resource, key, "changed", record, changed[key])
+        elif key in digests:
+            yield _change(resource, key, "removed", old=record)
+
+
+def _contents(entry):
+    """Identify the files of one resource type, base file and delta segments alike."""
+    return [entry["sha256"]] + [segment["sha256"] for segment in entry.get("segments", [])]
+
+
+def diff_snapshots(old_dir, new_dir, resources=None, natural=False, ignore=()):
+    """
+    Yield the change list from snapshot ``old_dir`` to ``new_dir``.
+
+    Resource types whose files hash identically in both manifests are
+    skipped without being read. Delta segments of incremental snapshots
+    are applied while reading. With ``natural`` records are matched by
+    their ``NATURAL_KEYS`` field instead of by primary key.
+    """
+    old_manifest, new_manifest = read_manifest(old_dir), read_manifest(new_dir)
+    for resource in resources or RESOURCES:
+        old_entry = old_manifest["resources"].get(resource)
+        new_entry = new_manifest["resources"].get(resource)
+        if old_entry is None and new_entry is None:
+            continue
+        if old_entry is not None and new_entry is not None and _contents(old_entry) == _contents(new_entry):
+            continue
+        key_field = NATURAL_KEYS[resource] if natural else "pk"
+        old = functools.partial(records, old_dir, old_entry, key_field, ignore)
+        new = records(new_dir, new_entry, key_field, ignore)
+        if key_field == "pk":
+            yield from merge_changes(resource, old(), new)
+        else:
+            yield from hashed_changes(resource, old, new)
+
+
+@diff_app.command()
+def diff(
+    old: pathlib.Path = OLD_ARGUMENT,
+    new: pathlib.Path = NEW_ARGUMENT,
+    resources: list[str] = RESOURCE_OPTION,
+    natural: bool = typer.Option(False, "--natural-keys", help="Match records by slug, name or username instead of pk, e.g. across instances."),
+    ignore: list[str] = IGNORE_OPTION,
+    output: str = typer.Option("ndjson", "--output", "-o", help="Output format (ndjson, json, csv or table)"),
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+    exit_code: bool = typer.Option(False, "--exit-code", help="Exit with status 1 if the snapshots differ."),
+):
+    """
+    List the records added, removed or changed between two snapshots.
+    """
+    unknown = [resource for resource in resources or [] if resource not in RESOURCES]
+    if unknown:
+        raise typer.BadParameter(f"Unknown resource {', '.join(unknown)}; choose from {', '.join(RESOURCES)}.")
+    ignore = set(ignore or [])
+    if natural:
+        # Primary keys never match across instances.
+        ignore.add("pk")
+    try:
+        changes = diff_snapshots(old, new, resources, natural, ignore)
+        counts = collections.Counter()
+
+        def counted():
+            for change in changes:
+                counts[change["change"]] += 1
+                yield change
+
+        print_items(console, counted(), output, "Changes", CHANGE_COLUMNS, output_file=output_file)
+    except (OSError, ValueError, KeyError) as e:
+        err_console.print(f"[bold red]Error comparing snapshots: {e}[/bold red]")
+        raise typer.Exit(1)
+    err_console.print(f"{counts['added']} added, {counts['removed']} removed, {counts['changed']} changed.")
+    if exit_code and counts:
+        raise typer.Exit(1)
@@ -1,45 +1,80 @@
-import typer
-from rich.console import Console
-from rich.table import Table
-import json
+import collections
+import datetime
+import os
+import pathlib
+import time
 
+import typer
 from authentik_client.api.events_api import EventsApi
 from authentik_client.exceptions import ApiException
+from rich.console import Console
 
-from .main import get_client, app
+from .archive import (
+    PartitionWriter,
+    clean_incomplete,
+    load_mark,
+    resolve_format,
+    save_mark,
+)
+from .cache import NO_CACHE_OPTION, REFRESH_OPTION, cached
+from .main import get_client
+from .output import (
+    OUTPUT_FILE_OPTION,
+    OUTPUT_OPTION,
+    parse_fields,
+    print_items,
+    project,
+    write_ndjson,
+)
+from .pagination import CONCURRENCY_OPTION, LIMIT_OPTION, PAGE_SIZE_OPTION, paginate
+from .query import (
+    FIELDS_OPTION,
+    FILTER_OPTION,
+    ORDERING_OPTION,
+    SEARCH_OPTION,
+    query_params,
+)
+from .retry import backoff_delay, is_retryable
+from .stats import EventCounter, archive_records, event_records, parse_duration
 
 event_app = typer.Typer()
 console = Console()
 
+ARCHIVE_DIR_OPTION = typer.Option(..., "--dir", file_okay=False, help="Archive directory. Created if missing.")
+STATS_ARCHIVE_OPTION = typer.Option(None, "--archive", exists=True, file_okay=False, help="Read events from an 'event archive' directory instead of the server.")
+
 @event_app.command("list")
-def list_events(output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")):
+def list_events(
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    filters: list[str] = FILTER_OPTION,
+    search: str = SEARCH_OPTION,
+    ordering: str = ORDERING_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
     """
     List all events.
     """
     client = get_client()
     events_api = EventsApi(client)
+    params = query_params(events_api.events_events_list, filters, search, ordering)
     try:
-        events = events_api.events_events_list()
-        if output == "json":
-            console.print(json.dumps([e.to_dict() for e in events.results], indent=2))
-        else:
-            table = Table(title="Events")
-            table.add_column("UUID", style="cyan")
-            table.add_column("User", style="magenta")
-            table.add_column("Action", style="green")
-            table.add_column("App", style="yellow")
-            table.add_column("Created", style="blue")
-            for event in events.results:
-                table.add_row(
-                    event.pk,
-                    event.user.get("username"),
-                    event.action,
-                    event.app,
-                    str(event.created),
-                )
-            console.print(table)
+        events = paginate(cached(events_api.events_events_list, "events", no_cache, refresh), page_size=page_size, limit=limit, concurrency=concurrency, **params)
+        print_items(console, events, output, "Events", [
+            ("UUID", "cyan", lambda e: e.pk),
+            ("User", "magenta", lambda e: e.user.get("username")),
+            ("Action", "green", lambda e: e.action),
+            ("App", "yellow", lambda e: e.app),
+            ("Created", "blue", lambda e: str(e.created)),
+        ], fields, output_file)
     except ApiException as e:
         console.print(f"[bold red]Error listing events: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @event_app.command("get")
 def get_event(uuid: str = typer.Argument(..., help="The UUID of the event to get.")):
@@ -53,6 +88,234 @@ def get_event(uuid: str = typer.Argument(..., help="The UUID of the event to get
         console.print(event.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error getting event: {e.body}[/bold red]")
+        raise typer.Exit(1)
+
+
+
+class EventCursor:
+    """
+    Position of the newest event already emitted by ``event tail``.
+
+    Events are ordered by ``created``. Several events can share a timestamp,
+    so the cursor also keeps the pks already seen at the newest one.
+    """
+
+    def __init__(self):
+        self.created = None
+        self.seen = set()
+
+    def is_new(self, event):
+        if self.created is None or event.created > self.created:
+            return True
+        return event.created == self.created and event.pk not in self.seen
+
+    def is_older(self, event):
+        return self.created is not None and event.created < self.created
+
+    def advance(self, events):
+        for event in events:
+            if self.created is None or event.created > self.created:
+                self.created = event.created
+                self.seen = {event.pk}
+            elif event.created == self.created:
+                self.seen.add(event.pk)
+
+
+def poll_events(list_method, cursor, page_size, limit=None, **params):
+    """
+    Return the events newer than ``cursor``, oldest first, and advance the cursor.
+
+    Pages are requested newest first and only until the cursor is reached.
+    An idle poll therefore costs a single small page. After a burst it
+    costs as many pages as the new events fill.
+    """
+    new = []
+    for event in paginate(list_method, page_size=page_size, limit=limit, ordering="-created", **params):
+        if cursor.is_older(event):
+            break
+        if cursor.is_new(event):
+            new.append(event)
+    new.reverse()
+    cursor.advance(new)
+    return new
+
+
+@event_app.command("tail")
+def tail_events(
+    follow: bool = typer.Option(False, "--follow", "-f", help="Keep polling and print new events as they arrive."),
+    lines: int = typer.Option(10, "--lines", "-n", min=0, help="Number of recent events to print first."),
+    page_size: int = typer.Option(20, "--page-size", min=1, help="Number of events to fetch per request."),
+    interval: float = typer.Option(2.0, "--interval", min=0.1, help="Seconds between polls while events are arriving."),
+    max_interval: float = typer.Option(30.0, "--max-interval", min=0.1, help="Longest wait between polls when idle."),
+    filters: list[str] = FILTER_OPTION,
+    search: str = SEARCH_OPTION,
+    fields: str = FIELDS_OPTION,
+):
+    """
+    Print the most recent events as NDJSON, optionally following new ones.
+    """
+    client = get_client()
+    events_api = EventsApi(client)
+    params = query_params(events_api.events_events_list, filters, search)
+    names = parse_fields(fields)
+    cursor = EventCursor()
+    stream = console.file
 
-app.add_typer(event_app, name="event")
+    def emit(events):
+        write_ndjson(stream, project(events, names) if names else events)
+        stream.flush()
+
+    try:
+        if lines:
+            emit(poll_events(events_api.events_events_list, cursor, page_size, limit=lines, **params))
+        else:
+            # Print nothing yet, but follow from the newest event onwards.
+            poll_events(events_api.events_events_list, cursor, 1, limit=1, **params)
+    except ApiException as e:
+        console.print(f"[bold red]Error tailing events: {e.body}[/bold red]")
+        raise typer.Exit(1)
+
+    delay = interval
+    errors = 0
+    try:
+        while follow:
+            time.sleep(delay)
+            try:
+                new = poll_events(events_api.events_events_list, cursor, page_size, **params)
+            except ApiException as e:
+                if not is_retryable(e):
+                    console.print(f"[bold red]Error tailing events: {e.body}[/bold red]")
+                    raise typer.Exit(1)
+                delay = min(max_interval, interval + backoff_delay(errors, base=interval, cap=max_interval))
+                errors += 1
+                continue
+            errors = 0
+            if new:
+                emit(new)
+                delay = interval
+            else:
+                # Back off while idle so a quiet server is polled less and less often.
+                delay = min(max_interval, delay * 2)
+    except KeyboardInterrupt:
+        pass
+
+
+@event_app.command("archive")
+def archive_events(
+    directory: pathlib.Path = ARCHIVE_DIR_OPTION,
+    fmt: str = typer.Option("auto", "--format", help="Archive format: auto (Parquet if pyarrow is installed), ndjson or parquet."),
+    page_size: int = PAGE_SIZE_OPTION,
+    concurrency: int = typer.Option(4, "--concurrency", min=1, help="Number of pages to fetch in parallel."),
+):
+    """
+    Append events newer than the last run to a partitioned local archive.
+    """
+    try:
+        fmt = resolve_format(fmt)
+    except ValueError as e:
+        console.print(f"[bold red]Error: {e}[/bold red]")
+        raise typer.Exit(1)
+    client = get_client()
+    events_api = EventsApi(client)
+    os.makedirs(directory, exist_ok=True)
+    clean_incomplete(directory)
+
+    mark = EventCursor()
+    mark.created, mark.seen = load_mark(directory)
+    newest = EventCursor()
+    newest.created, newest.seen = mark.created, set(mark.seen)
+    writer = PartitionWriter(directory, fmt)
+    # New events shift older ones onto later pages while we read, so a few
+    # may be returned twice. Remember the pks of the last couple of pages.
+    recent = collections.deque(maxlen=2 * page_size * concurrency)
+    recent_pks = set()
+    batch = []
+    events = paginate(events_api.events_events_list, page_size=page_size, concurrency=concurrency, ordering="-created")
+    try:
+        for event in events:
+            if mark.is_older(event):
+                break
+            if not mark.is_new(event) or event.pk in recent_pks:
+                continue
+            if len(recent) == recent.maxlen:
+                recent_pks.discard(recent[0])
+            recent.append(event.pk)
+            recent_pks.add(event.pk)
+            batch.append(event)
+            newest.advance([event])
+            if len(batch) >= page_size:
+                writer.write(batch)
+                batch = []
+        writer.write(batch)
+    except (ApiException, KeyboardInterrupt) as e:
+        writer.abort()
+        message = e.body if isinstance(e, ApiException) else "interrupted"
+        console.print(f"[bold red]Error archiving events: {message}. Nothing was archived.[/bold red]")
+        raise typer.Exit(1)
+    finally:
+        # Stops any pages still being prefetched once the mark is reached.
+        events.close()
+
+    files = writer.commit()
+    if newest.created is not None:
+        save_mark(directory, newest.created, newest.seen)
+    console.print(f"[bold green]Archived {writer.count} events into {files} {fmt} files in {directory}.[/bold green]")
+
+
+# Fields an archive can be filtered on locally, mapped to record attributes.
+ARCHIVE_FILTERS = {"action": "action", "app": "app", "client_ip": "client_ip", "username": "user", "user": "user"}
+
+
+@event_app.command("stats")
+def event_stats(
+    group_by: str = typer.Option("action", "--group-by", help="Comma-separated fields to group by: action, user, app, client_ip, bucket."),
+    bucket: str = typer.Option("1h", "--bucket", help="Size of the time buckets for --group-by bucket, e.g. 5m, 1h, 1d."),
+    since: str = typer.Option(None, "--since", help="Only count events from this long ago onwards, e.g. 1h or 7d."),
+    top: int = typer.Option(20, "--top", min=1, help="Number of groups to show."),
+    archive: pathlib.Path = STATS_ARCHIVE_OPTION,
+    filters: list[str] = FILTER_OPTION,
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+):
+    """
+    Count events grouped by action, user, app, client IP or time bucket.
+    """
+    try:
+        counter = EventCounter([field.strip() for field in group_by.split(",") if field.strip()], parse_duration(bucket))
+        cutoff = datetime.datetime.now(datetime.UTC) - datetime.timedelta(seconds=parse_duration(since)) if since else None
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+
+    events = None
+    try:
+        if archive is not None:
+            wanted = []
+            for item in filters or []:
+                key, _, value = item.partition("=")
+                if key not in ARCHIVE_FILTERS:
+                    raise typer.BadParameter(
+                        f"Archives can only be filtered on {', '.join(sorted(ARCHIVE_FILTERS))}.", param_hint="--filter"
+                    )
+                wanted.append((ARCHIVE_FILTERS[key], value))
+            records = (
+                record for record in archive_records(archive, cutoff)
+                if all(str(getattr(record, field)) == value for field, value in wanted)
+            )
+        else:
+            events_api = EventsApi(get_client())
+            params = query_params(events_api.events_events_list, filters)
+            events = paginate(events_api.events_events_list, page_size=page_size, concurrency=concurrency, ordering="-created", **params)
+            records = event_records(events, cutoff)
+        counter.add(records)
+    except ApiException as e:
+        console.print(f"[bold red]Error fetching events: {e.body}[/bold red]")
+        raise typer.Exit(1)
+    finally:
+        if events is not None:
+            # Stops any pages still being prefetched past the --since cutoff.
+            events.close()
 
+    columns = [(field, None, lambda row, field=field: str(row[field])) for field in counter.group_by]
+    columns.append(("count", "cyan", lambda row: str(row["count"])))
+    print_items(console, iter(counter.top(top)), output, f"Top {top} of {counter.total} events", columns)
@@ -1,75 +1,157 @@
+import hashlib
 import json
+import os
 import pathlib
-import yaml
-from rich.console import Console
-from rich.table import Table
-import typer
+import time
 
+import typer
 from authentik_client import api
 from authentik_client.exceptions import ApiException
+from authentik_client.models import FlowStageBindingRequest
 from authentik_client.models.flow_request import FlowRequest
-from authentik_client.models.flow_set_request import FlowSetRequest
 from authentik_client.models.patched_flow_request import PatchedFlowRequest
-from authentik_client.models import FlowStageBindingRequest
+from rich.console import Console
+
+try:
+    from authentik_client.models.flow_set_request import FlowSetRequest
+except ImportError:
+    # Newer clients dropped the flow import endpoint along with its request model.
+    FlowSetRequest = None
 
-from .main import get_client, app
+from .aio import FAN_OUT_OPTION, fan_out
+from .bulk import describe_error
+from .cache import NO_CACHE_OPTION, REFRESH_OPTION, cached, invalidate
+from .main import get_client
+from .output import OUTPUT_FILE_OPTION, OUTPUT_OPTION, print_items
+from .pagination import CONCURRENCY_OPTION, LIMIT_OPTION, PAGE_SIZE_OPTION, paginate
+from .query import (
+    FIELDS_OPTION,
+    FILTER_OPTION,
+    ORDERING_OPTION,
+    SEARCH_OPTION,
+    query_params,
+)
+from .resolve import forget, reindex, resolve
+from .yamlio import safe_load_all
 
 flow_app = typer.Typer()
 console = Console()
 
+EXPORT_DIR_OPTION = typer.Option(..., "--dir", file_okay=False, help="Directory to write one <slug>.yaml per flow to. Created if missing.")
+IMPORT_DIR_ARGUMENT = typer.Argument(..., exists=True, file_okay=False, help="Directory of flow YAML files, e.g. from export-all.")
+
+# Content hashes of the last export-all and import-dir runs, kept in the directory.
+STATE_FILE = "_state.json"
+FLOW_FILE_PATTERNS = ("*.yaml", "*.yml")
+
+TIMING_COLUMNS = [
+    ("Flow", "cyan", lambda r: r["flow"]),
+    ("File", "magenta", lambda r: r["file"]),
+    ("Status", "green", lambda r: r["status"]),
+    ("Time (ms)", "yellow", lambda r: "" if r["duration_ms"] is None else str(r["duration_ms"])),
+]
+
+
+def _content_hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def export_blueprint(flows_api, slug):
+    """Return the exported blueprint of flow ``slug`` as YAML text."""
+    blueprint = flows_api.flows_instances_export_retrieve(slug=slug)
+    return blueprint.decode("utf-8") if isinstance(blueprint, bytes) else blueprint
+
+
+def _load_state(directory):
+    try:
+        with open(os.path.join(directory, STATE_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_state(directory, state):
+    path = os.path.join(directory, STATE_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _import_documents(flows_api, flow_data):
+    """Import each document of a flow file, a string or an open file, one document at a time."""
+    if FlowSetRequest is None:
+        raise RuntimeError("This version of authentik-client cannot import flows.")
+    for parsed_data in safe_load_all(flow_data):
+        if not parsed_data:
+            continue
+        # The API expects a FlowSetRequest object. The yaml file is a dictionary that can be used to create it.
+        flow_set_request = FlowSetRequest(**parsed_data)
+        flows_api.flows_instances_import_create(flow_set_request=flow_set_request)
+
 @flow_app.command("list")
-def list_flows(output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")):
+def list_flows(
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    filters: list[str] = FILTER_OPTION,
+    search: str = SEARCH_OPTION,
+    ordering: str = ORDERING_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
     """
     List all flows.
     """
     client = get_client()
     flows_api = api.FlowsApi(client)
+    params = query_params(flows_api.flows_instances_list, filters, search, ordering)
     try:
-        flows = flows_api.flows_instances_list()
-        if output == "json":
-            console.print(json.dumps([f.to_dict() for f in flows.results], indent=2))
-        else:
-            table = Table(title="Flows")
-            table.add_column("PK", style="cyan")
-            table.add_column("Name", style="magenta")
-            table.add_column("Slug", style="green")
-            table.add_column("Title", style="yellow")
-            for flow in flows.results:
-                table.add_row(
-                    flow.pk,
-                    flow.name,
-                    flow.slug,
-                    flow.title,
-                )
-            console.print(table)
+        flows = paginate(cached(flows_api.flows_instances_list, "flows", no_cache, refresh), page_size=page_size, limit=limit, concurrency=concurrency, **params)
+        print_items(console, flows, output, "Flows", [
+            ("PK", "cyan", lambda f: f.pk),
+            ("Name", "magenta", lambda f: f.name),
+            ("Slug", "green", lambda f: f.slug),
+            ("Title", "yellow", lambda f: f.title),
+        ], fields, output_file)
     except ApiException as e:
         console.print(f"[bold red]Error listing flows: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @flow_app.command("get")
-def get_flow(flow_uuid: str = typer.Argument(..., help="The UUID of the flow to get.")):
+def get_flow(flow_uuid: str = typer.Argument(..., help="The UUID or slug of the flow to get.")):
     """
     Get a flow.
     """
     client = get_client()
     flows_api = api.FlowsApi(client)
     try:
+        flow_uuid = resolve(client, "flow", flow_uuid)
         flow = flows_api.flows_instances_retrieve(flow_uuid=flow_uuid)
         console.print(flow.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error getting flow: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @flow_app.command("delete")
-def delete_flow(flow_uuid: str = typer.Argument(..., help="The UUID of the flow to delete.")):
+def delete_flow(flow_uuid: str = typer.Argument(..., help="The UUID or slug of the flow to delete.")):
     """
     Delete a flow.
     """
     client = get_client()
     flows_api = api.FlowsApi(client)
     try:
+        flow_uuid = resolve(client, "flow", flow_uuid)
         flows_api.flows_instances_destroy(flow_uuid=flow_uuid)
+        invalidate("flows")
+        forget(client, "flow", flow_uuid)
         console.print(f"[bold green]Flow '{flow_uuid}' deleted successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error deleting flow: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 
 @flow_app.command("export")
@@ -83,8 +165,7 @@ def export_flow(
     client = get_client()
     flows_api = api.FlowsApi(client)
     try:
-        # The export endpoint returns a yaml file as a string
-        exported_flow = flows_api.flows_instances_export_retrieve(fs_slug=flow_slug)
+        exported_flow = export_blueprint(flows_api, flow_slug)
         if output_file:
             with open(output_file, "w") as f:
                 f.write(exported_flow)
@@ -93,6 +174,7 @@ def export_flow(
             console.print(exported_flow)
     except ApiException as e:
         console.print(f"[bold red]Error exporting flow: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 
 @flow_app.command("import")
@@ -105,16 +187,123 @@ def import_flow(
     client = get_client()
     flows_api = api.FlowsApi(client)
     try:
-        flow_data = file.read()
-        parsed_data = yaml.safe_load(flow_data)
-        # The API expects a FlowSetRequest object. The yaml file is a dictionary that can be used to create it.
-        flow_set_request = FlowSetRequest(**parsed_data)
-        flows_api.flows_instances_import_create(flow_set_request=flow_set_request)
+        _import_documents(flows_api, file)
+        invalidate("flows")
         console.print(f"[bold green]Flow from '{file.name}' imported successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error importing flow: {e.body}[/bold red]")
+        raise typer.Exit(1)
     except Exception as e:
         console.print(f"[bold red]An unexpected error occurred: {e}[/bold red]")
+        raise typer.Exit(1)
+
+@flow_app.command("export-all")
+def export_all_flows(
+    directory: pathlib.Path = EXPORT_DIR_OPTION,
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    concurrency: int = FAN_OUT_OPTION,
+    force: bool = typer.Option(False, "--force", help="Rewrite files even if their content is unchanged."),
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
+    """
+    Export every flow to a directory, exporting flows concurrently.
+    """
+    client = get_client()
+    flows_api = api.FlowsApi(client)
+    try:
+        flows = list(paginate(flows_api.flows_instances_list, page_size=page_size))
+    except ApiException as e:
+        console.print(f"[bold red]Error listing flows: {e.body}[/bold red]")
+        raise typer.Exit(1)
+    os.makedirs(directory, exist_ok=True)
+    state = _load_state(directory)
+    exported = state.get("exported", {})
+
+    def export(flow):
+        started = time.monotonic()
+        # Written as bytes, so the file holds exactly the content that was hashed.
+        content = export_blueprint(flows_api, flow.slug).encode("utf-8")
+        digest = hashlib.sha256(content).hexdigest()
+        path = directory / f"{flow.slug}.yaml"
+        changed = force or exported.get(flow.slug) != digest or not path.exists()
+        if changed:
+            tmp_path = directory / f".{flow.slug}.yaml.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        return digest, changed, round((time.monotonic() - started) * 1000)
+
+    rows = []
+    hashes = {}
+    failed = 0
+    for flow, result, error in fan_out(export, flows, concurrency):
+        row = {"flow": flow.slug, "file": f"{flow.slug}.yaml"}
+        if error is not None:
+            failed += 1
+            if flow.slug in exported:
+                hashes[flow.slug] = exported[flow.slug]
+            rows.append({**row, "status": f"error: {describe_error(error)}", "duration_ms": None})
+            continue
+        hashes[flow.slug], changed, duration_ms = result
+        rows.append({**row, "status": "exported" if changed else "unchanged", "duration_ms": duration_ms})
+    # Flows deleted on the server drop out of the state.
+    state["exported"] = hashes
+    _save_state(directory, state)
+    print_items(console, rows, output, "Flow Export", TIMING_COLUMNS, output_file=output_file)
+    if failed:
+        raise typer.Exit(1)
+
+
+@flow_app.command("import-dir")
+def import_flow_dir(
+    directory: pathlib.Path = IMPORT_DIR_ARGUMENT,
+    output: str = OUTPUT_OPTION,
+    concurrency: int = FAN_OUT_OPTION,
+    force: bool = typer.Option(False, "--force", help="Import files even if they are unchanged since their last import."),
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
+    """
+    Import every flow file of a directory, importing files concurrently.
+    """
+    client = get_client()
+    flows_api = api.FlowsApi(client)
+    state = _load_state(directory)
+    # Imports are tracked per server, so one directory can be imported into several.
+    imported = state.setdefault("imported", {}).setdefault(client.configuration.host or "", {})
+    paths = sorted({path for pattern in FLOW_FILE_PATTERNS for path in directory.glob(pattern)})
+
+    pending = []
+    rows = {}
+    for path in paths:
+        content = path.read_text()
+        digest = _content_hash(content)
+        if not force and imported.get(path.name) == digest:
+            rows[path.name] = {"flow": path.stem, "file": path.name, "status": "unchanged", "duration_ms": None}
+        else:
+            pending.append((path, content, digest))
+
+    def import_file(item):
+        started = time.monotonic()
+        _import_documents(flows_api, item[1])
+        return round((time.monotonic() - started) * 1000)
+
+    failed = 0
+    for (path, _, digest), duration_ms, error in fan_out(import_file, pending, concurrency):
+        row = {"flow": path.stem, "file": path.name, "status": "imported", "duration_ms": duration_ms}
+        if error is not None:
+            failed += 1
+            row["status"] = f"error: {describe_error(error)}"
+        else:
+            imported[path.name] = digest
+        rows[path.name] = row
+    if pending:
+        invalidate("flows")
+    _save_state(directory, state)
+    print_items(console, [rows[path.name] for path in paths], output, "Flow Import", TIMING_COLUMNS, output_file=output_file)
+    if failed:
+        raise typer.Exit(1)
+
 
 @flow_app.command("create")
 def create_flow(
@@ -130,13 +319,15 @@ def create_flow(
     try:
         flow_request = FlowRequest(name=name, slug=slug, title=title)
         flow = flows_api.flows_instances_create(flow_request=flow_request)
+        invalidate("flows")
         console.print(f"[bold green]Flow '{flow.name}' created successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error creating flow: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @flow_app.command("update")
 def update_flow(
-    flow_uuid: str = typer.Argument(..., help="The UUID of the flow to update."),
+    flow_uuid: str = typer.Argument(..., help="The UUID or slug of the flow to update."),
     name: str = typer.Option(None, "--name"),
     slug: str = typer.Option(None, "--slug"),
     title: str = typer.Option(None, "--title"),
@@ -147,6 +338,7 @@ def update_flow(
     client = get_client()
     flows_api = api.FlowsApi(client)
     try:
+        flow_uuid = resolve(client, "flow", flow_uuid)
         update_data = PatchedFlowRequest()
         if name:
             update_data.name = name
@@ -158,14 +350,17 @@ def update_flow(
         flow = flows_api.flows_instances_partial_update(
             flow_uuid=flow_uuid, patched_flow_request=update_data
         )
+        invalidate("flows")
+        reindex(client, "flow", flow)
         console.print(f"[bold green]Flow '{flow.name}' updated successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error updating flow: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @flow_app.command("bind-stage")
 def bind_stage(
-    flow_slug: str = typer.Argument(..., help="The slug of the flow."),
-    stage_uuid: str = typer.Argument(..., help="The UUID of the stage to bind."),
+    flow_slug: str = typer.Argument(..., help="The slug or UUID of the flow."),
+    stage_uuid: str = typer.Argument(..., help="The UUID or name of the stage to bind."),
     order: int = typer.Argument(..., help="The order of the stage in the flow."),
 ):
     """Bind a stage to a flow."""
@@ -173,15 +368,8 @@ def bind_stage(
     flows_api = api.FlowsApi(client)
     stages_api = api.StagesApi(client)
     try:
-        # Get flow to retrieve its PK
-        flows = flows_api.flows_instances_list(slug=flow_slug)
-        if not flows.results:
-            console.print(f"[bold red]Flow with slug '{flow_slug}' not found.[/bold red]")
-            raise typer.Exit(1)
-        flow_pk = flows.results[0].pk
-
-        # Get stage to retrieve its PK
-        stage = stages_api.stages_all_retrieve(stage_uuid=stage_uuid)
+        flow_pk = resolve(client, "flow", flow_slug)
+        stage = stages_api.stages_all_retrieve(stage_uuid=resolve(client, "stage", stage_uuid))
 
         binding_request = FlowStageBindingRequest(
             target=flow_pk,
@@ -193,16 +381,15 @@ def bind_stage(
         flows_api.flows_instances_add_stage_create(
             flow_pk=flow_pk, flow_stage_binding_request=binding_request
         )
+        invalidate("flows")
 
         console.print(
-            f"[bold green]Stage '{stage.name}' bound to flow '{flows.results[0].name}' successfully.[/bold green]"
+            f"[bold green]Stage '{stage.name}' bound to flow '{flow_slug}' successfully.[/bold green]"
         )
     except ApiException as e:
         console.print(f"[bold red]Error binding stage: {e.body}[/bold red]")
+        raise typer.Exit(1)
     except AttributeError:
         console.print(
             "[bold red]The version of authentik_client appears to be missing functionality for binding stages to flows.[/bold red]"
         )
-
-
-app.add_typer(flow_app, name="flow")
@@ -0,0 +1,210 @@
+import datetime
+import email.utils
+import threading
+import time
+
+import urllib3
+from authentik_client.exceptions import ApiException
+
+from .retry import (
+    DEFAULT_ATTEMPTS,
+    EXHAUSTED_HEADER,
+    NOT_PROCESSED_STATUSES,
+    RETRY_STATUSES,
+    backoff_delay,
+)
+
+# Methods that are safe to resend after any transient failure. Other methods
+# are only retried when the server says it did not process the request.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Statuses that count as server failures for the circuit breaker. Rate
+# limiting is the server working as intended, so 429 does not trip it.
+FAILURE_STATUSES = RETRY_STATUSES - {429}
+
+DEFAULT_CIRCUIT_THRESHOLD = 10
+DEFAULT_CIRCUIT_COOLDOWN = 30.0
+# Longest Retry-After the governor waits for; longer ones are capped.
+MAX_RETRY_AFTER = 120.0
+
+
+class CircuitOpenError(ApiException):
+    """Raised without contacting the server while the circuit breaker is open."""
+
+    def __init__(self, remaining):
+        super().__init__(status=503, reason="Circuit open")
+        self.body = f"Too many consecutive server errors; not sending requests for another {remaining:.0f}s."
+        self.headers = {EXHAUSTED_HEADER: "1"}
+
+
+class TokenBucket:
+    """
+    Allow ``rate`` requests per second on average, in bursts of up to ``burst``.
+
+    The bucket is shared by every worker thread. ``pause`` holds all of
+    them back, e.g. for a server-sent ``Retry-After``. A ``rate`` of 0
+    disables the limit but pauses still apply.
+    """
+
+    def __init__(self, rate=0, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def _reserve(self):
+        """Take a token if one is available and return how long to wait otherwise."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            if not self.rate:
+                return 0
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # The epsilon absorbs rounding left over from the computed wait.
+            if self.tokens >= 1 - 1e-9:
+                self.tokens = max(self.tokens - 1, 0.0)
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            delay = self._reserve()
+            if not delay:
+                return
+            time.sleep(delay)
+
+
+class CircuitBreaker:
+    """
+    Stop sending requests after ``threshold`` consecutive server failures.
+
+    The circuit stays open for ``cooldown`` seconds. A single trial request
+    is then let through: success closes the circuit, failure reopens it.
+    """
+
+    def __init__(self, threshold=DEFAULT_CIRCUIT_THRESHOLD, cooldown=DEFAULT_CIRCUIT_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self._lock = threading.Lock()
+
+    def before(self):
+        """Raise ``CircuitOpenError`` unless a request may be sent now."""
+        if not self.threshold:
+            return
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining > 0 or self.trial:
+                raise CircuitOpenError(max(remaining, 0))
+            self.trial = True
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial or (self.threshold and self.failures >= self.threshold):
+                self.opened_at = time.monotonic()
+            self.trial = False
+
+
+def retry_after(response):
+    """Return the delay in seconds requested by a ``Retry-After`` header, or None."""
+    value = response.getheader("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        seconds = (when - datetime.datetime.now(datetime.UTC)).total_seconds()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+def _retryable(method, status):
+    return status in RETRY_STATUSES and (method.upper() in IDEMPOTENT_METHODS or status in NOT_PROCESSED_STATUSES)
+
+
+class Governor:
+    """
+    Wrap a REST client's ``request`` method with rate limiting and retries.
+
+    Every request waits for a token from the shared bucket and is refused
+    while the circuit breaker is open. Rate-limited and transient server
+    responses are retried with exponential backoff and jitter. A
+    ``Retry-After`` header overrides the backoff and pauses every worker.
+    The last failed response is returned as it is, so the generated client
+    raises its usual ``ApiException``. Non-idempotent requests are only
+    resent on 429 and 503, which the server did not process.
+    """
+
+    def __init__(self, request, bucket=None, breaker=None, attempts=DEFAULT_ATTEMPTS):
+        self.request = request
+        self.bucket = bucket or TokenBucket()
+        self.breaker = breaker or CircuitBreaker()
+        self.attempts = attempts
+
+    def __call__(self, method, url, *args, **kwargs):
+        for attempt in range(self.attempts):
+            self.breaker.before()
+            self.bucket.acquire()
+            try:
+                response = self.request(method, url, *args, **kwargs)
+            except (ApiException, urllib3.exceptions.HTTPError):
+                # Connection failures that urllib3 gave up on.
+                self.breaker.failure()
+                if attempt == self.attempts - 1 or method.upper() not in IDEMPOTENT_METHODS:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            if response.status in FAILURE_STATUSES:
+                self.breaker.failure()
+            else:
+                self.breaker.success()
+            if response.status not in RETRY_STATUSES:
+                return response
+            if attempt == self.attempts - 1 or not _retryable(method, response.status):
+                # Tell call_with_retry not to resend what was settled here.
+                response.headers[EXHAUSTED_HEADER] = "1"
+                return response
+            delay = retry_after(response)
+            if delay is not None:
+                self.bucket.pause(delay)
+            else:
+                time.sleep(backoff_delay(attempt))
+        return response
+
+
+def install(client, config):
+    """Route every request of ``client`` through a ``Governor`` configured from ``config``."""
+    rest_client = client.rest_client
+    rest_client.request = Governor(
+        rest_client.request,
+        TokenBucket(config.get("rate_limit", 0), config.get("burst")),
+        CircuitBreaker(
+            config.get("circuit_threshold", DEFAULT_CIRCUIT_THRESHOLD),
+            config.get("circuit_cooldown", DEFAULT_CIRCUIT_COOLDOWN),
+        ),
+        config.get("retry_attempts", DEFAULT_ATTEMPTS),
+    )
+    return client
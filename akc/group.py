@@ -1,11 +1,23 @@
+import pathlib
+
 import typer
-from rich.console import Console
-from rich.table import Table
-import json
-from authentik_client.models import Group, PatchedGroupRequest, User
 from authentik_client import api
 from authentik_client.exceptions import ApiException
-from .main import get_client, app
+from authentik_client.models import Group, PatchedGroupRequest, User
+from rich.console import Console
+
+from .cache import NO_CACHE_OPTION, REFRESH_OPTION, cached, invalidate
+from .main import get_client
+from .output import OUTPUT_FILE_OPTION, OUTPUT_OPTION, print_items
+from .pagination import CONCURRENCY_OPTION, LIMIT_OPTION, PAGE_SIZE_OPTION, paginate
+from .query import (
+    FIELDS_OPTION,
+    FILTER_OPTION,
+    ORDERING_OPTION,
+    SEARCH_OPTION,
+    query_params,
+)
+from .resolve import forget, reindex, resolve
 
 group_app = typer.Typer()
 console = Console()
@@ -20,45 +32,58 @@ def create_group(name: str):
     group = Group(name=name)
     try:
         new_group = core_api.core_groups_create(group)
+        invalidate("groups")
         console.print(f"[bold green]Group '{new_group.name}' created successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error creating group: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @group_app.command("list")
-def list_groups(output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")):
+def list_groups(
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    filters: list[str] = FILTER_OPTION,
+    search: str = SEARCH_OPTION,
+    ordering: str = ORDERING_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
     """
     List all groups.
     """
     client = get_client()
     core_api = api.CoreApi(client)
+    params = query_params(core_api.core_groups_list, filters, search, ordering)
     try:
-        groups = core_api.core_groups_list()
-        if output == "json":
-            console.print(json.dumps([g.to_dict() for g in groups.results], indent=2))
-        else:
-            table = Table(title="Groups")
-            table.add_column("ID", style="cyan")
-            table.add_column("Name", style="magenta")
-            for group in groups.results:
-                table.add_row(group.pk, group.name)
-            console.print(table)
+        groups = paginate(cached(core_api.core_groups_list, "groups", no_cache, refresh), page_size=page_size, limit=limit, concurrency=concurrency, **params)
+        print_items(console, groups, output, "Groups", [
+            ("ID", "cyan", lambda g: g.pk),
+            ("Name", "magenta", lambda g: g.name),
+        ], fields, output_file)
     except ApiException as e:
         console.print(f"[bold red]Error listing groups: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @group_app.command("get")
-def get_group(group_id: str = typer.Argument(..., help="The ID or UUID of the group.")):
+def get_group(group_id: str = typer.Argument(..., help="The UUID or name of the group.")):
     """Get a single group."""
     client = get_client()
     core_api = api.CoreApi(client)
     try:
+        group_id = resolve(client, "group", group_id)
         group = core_api.core_groups_retrieve(group_pk=group_id)
         console.print(group.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error getting group: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @group_app.command("update")
 def update_group(
-    group_id: str = typer.Argument(..., help="The ID of the group to update."),
+    group_id: str = typer.Argument(..., help="The UUID or name of the group to update."),
     name: str = typer.Option(None, "--name", help="New name for the group."),
     is_superuser: bool = typer.Option(None, "--is-superuser/--not-superuser"),
 ):
@@ -68,6 +93,7 @@ def update_group(
     client = get_client()
     core_api = api.CoreApi(client)
     try:
+        group_id = resolve(client, "group", group_id)
         update_data = PatchedGroupRequest()
         if name is not None:
             update_data.name = name
@@ -79,44 +105,49 @@ def update_group(
             return
 
         updated_group = core_api.core_groups_partial_update(group_pk=group_id, patched_group_request=update_data)
+        invalidate("groups")
+        reindex(client, "group", updated_group)
         console.print(f"[bold green]Group '{updated_group.name}' (ID: {updated_group.pk}) updated successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error updating group: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @group_app.command("list-users")
 def list_group_users(
-    group_id: str = typer.Argument(..., help="The ID or UUID of the group."),
-    output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")
+    group_id: str = typer.Argument(..., help="The UUID or name of the group."),
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
 ):
     """List users in a group."""
     client = get_client()
     core_api = api.CoreApi(client)
     try:
-        users = core_api.core_groups_users_list(group_pk=group_id)
-        if output == "json":
-            console.print(json.dumps([u.to_dict() for u in users.results], indent=2))
-        else:
-            table = Table(title=f"Users in group {group_id}")
-            table.add_column("ID", style="cyan")
-            table.add_column("Username", style="magenta")
-            table.add_column("Email", style="green")
-            for user in users.results:
-                table.add_row(str(user.pk), user.username, user.email)
-            console.print(table)
+        group_id = resolve(client, "group", group_id)
+        users = paginate(core_api.core_groups_users_list, page_size=page_size, limit=limit, concurrency=concurrency, group_pk=group_id)
+        print_items(console, users, output, f"Users in group {group_id}", [
+            ("ID", "cyan", lambda u: str(u.pk)),
+            ("Username", "magenta", lambda u: u.username),
+            ("Email", "green", lambda u: u.email),
+        ])
     except ApiException as e:
         console.print(f"[bold red]Error listing users in group: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @group_app.command("delete")
-def delete_group(group_id: str = typer.Argument(..., help="The ID of the group to delete.")):
+def delete_group(group_id: str = typer.Argument(..., help="The UUID or name of the group to delete.")):
     """
     Delete a group.
     """
     client = get_client()
     core_api = api.CoreApi(client)
     try:
+        group_id = resolve(client, "group", group_id)
         core_api.core_groups_destroy(group_pk=group_id)
+        invalidate("groups")
+        forget(client, "group", group_id)
         console.print(f"[bold green]Group with ID {group_id} deleted successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error deleting group: {e.body}[/bold red]")
-
-app.add_typer(group_app, name="group")
+        raise typer.Exit(1)
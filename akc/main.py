@@ -1,23 +1,162 @@
 #!/usr/bin/env python3
+import importlib
 import json
 import os
+import socket
 import sys
-from authentik_client.api_client import ApiClient as Client
+import threading
+
 import typer
 from rich.console import Console
+from typer.core import TyperCommand, TyperGroup
+
+# Subcommand name -> (module, Typer attribute, short help). Modules are only
+# imported when their subcommand is invoked, so `akc --help` and shell
+# completion never pay for importing the generated API client.
+COMMANDS = {
+    "user": ("akc.user", "user_app", "Manage users."),
+    "group": ("akc.group", "group_app", "Manage groups."),
+    "role": ("akc.role", "role_app", "Manage roles."),
+    "application": ("akc.application", "app_app", "Manage applications."),
+    "user-group": ("akc.user_group", "user_group_app", "Manage group memberships of users."),
+    "user-role": ("akc.user_role", "user_role_app", "Manage role assignments of users."),
+    "provider": ("akc.provider", "provider_app", "Manage providers."),
+    "flow": ("akc.flow", "flow_app", "Manage flows."),
+    "core": ("akc.core", "app", "Manage tenants and server info."),
+    "outpost": ("akc.outpost", "outpost_app", "Manage outposts."),
+    "event": ("akc.event", "event_app", "Inspect events."),
+    "propertymapping": ("akc.propertymapping", "propertymapping_app", "Manage property mappings."),
+    "policy": ("akc.policy", "policy_app", "Manage policies."),
+    "stage": ("akc.stage", "stage_app", "Manage stages."),
+    "source": ("akc.source", "source_app", "Manage sources."),
+    "apply": ("akc.state", "apply_app", "Apply a declarative state file."),
+    "shell": ("akc.shell", "shell_app", "Start an interactive shell."),
+    "batch": ("akc.batch", "batch_app", "Run a file of akc commands."),
+    "index": ("akc.resolve", "index_app", "Manage the local name index."),
+    "snapshot": ("akc.snapshot", "snapshot_app", "Export the whole instance to a local snapshot."),
+    "diff": ("akc.diff", "diff_app", "Compare two snapshots."),
+}
+
+class LazyGroup(TyperGroup):
+    """Typer group that imports the module of a subcommand only when it is used."""
+
+    _listing = False
+
+    def list_commands(self, ctx):
+        return super().list_commands(ctx) + [name for name in COMMANDS if name not in self.commands]
+
+    def get_command(self, ctx, cmd_name):
+        command = super().get_command(ctx, cmd_name)
+        if command is not None or cmd_name not in COMMANDS:
+            return command
+        module_name, attribute, help_text = COMMANDS[cmd_name]
+        if self._listing:
+            # Help and completion only need the name and summary.
+            return TyperCommand(cmd_name, help=help_text)
+        command = typer.main.get_command(getattr(importlib.import_module(module_name), attribute))
+        # Completion is installed once for the whole tree, not per subcommand.
+        command.params = [p for p in command.params if p.name not in ("install_completion", "show_completion")]
+        command.name = cmd_name
+        command.help = command.help or help_text
+        self.commands[cmd_name] = command
+        return command
+
+    def format_help(self, ctx, formatter):
+        self._listing = True
+        try:
+            return super().format_help(ctx, formatter)
+        finally:
+            self._listing = False
 
-app = typer.Typer(add_completion=True)
+    def shell_complete(self, ctx, incomplete):
+        self._listing = True
+        try:
+            return super().shell_complete(ctx, incomplete)
+        finally:
+            self._listing = False
+
+app = typer.Typer(cls=LazyGroup, add_completion=True)
 console = Console()
 
+@app.callback()
+def cli():
+    """
+    Manage Authentik resources from the command line.
+    """
+
 CONFIG_PATH = os.path.expanduser("~/.akc_config.json")
+API_PATH = "/api/v3"
+DEFAULT_POOL_SIZE = 16
 
-def get_client():
+_config = None
+_client = None
+_client_lock = threading.Lock()
+
+def load_config():
     if not os.path.exists(CONFIG_PATH):
         console.print(f"[bold red]Config file not found at {CONFIG_PATH}. Please create it with your Authentik URL and API token by running `akc init`[/bold red]")
         raise typer.Exit(code=1)
     with open(CONFIG_PATH) as f:
-        config = json.load(f)
-    return Client(base_url=config["base_url"], api_token=config["api_token"])
+        return json.load(f)
+
+def build_client(config):
+    """
+    Build an API client backed by a single tuned urllib3 pool manager.
+
+    ``pool_size`` bounds the number of connections kept open per host and
+    should be at least the largest ``--concurrency`` in use. ``keep_alive``
+    enables TCP keep-alive probes so idle pooled connections survive
+    between requests. Every request goes through the rate limit, retry and
+    circuit breaker settings of ``governor.install``.
+    """
+    from authentik_client.api_client import ApiClient as Client
+    from authentik_client.configuration import Configuration
+    from urllib3.connection import HTTPConnection
+
+    from .governor import install
+
+    host = config["base_url"].rstrip("/")
+    if not host.endswith(API_PATH):
+        host += API_PATH
+    socket_options = list(HTTPConnection.default_socket_options)
+    if config.get("keep_alive", True):
+        socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    configuration = Configuration(
+        host=host,
+        access_token=config["api_token"],
+        connection_pool_maxsize=config.get("pool_size", DEFAULT_POOL_SIZE),
+        socket_options=socket_options,
+    )
+    return install(Client(configuration), config)
+
+def get_config():
+    """Return the parsed config file, reading it on first use only."""
+    global _config
+    if _config is None:
+        _config = load_config()
+    return _config
+
+def get_client():
+    """
+    Return the process-wide API client.
+
+    The config file is read and the client built on first use only. Every
+    ``*Api`` object created afterwards shares the same connection pool, so
+    TLS handshakes are paid once per process rather than once per request.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = build_client(get_config())
+    return _client
+
+def reset_client():
+    """Drop the cached config and client so the next ``get_client()`` call rebuilds them."""
+    global _config, _client
+    with _client_lock:
+        _config = None
+        _client = None
 
 @app.command()
 def init(
@@ -33,16 +172,8 @@ def init(
     }
     with open(CONFIG_PATH, "w") as f:
         json.dump(config, f, indent=2)
+    reset_client()
     console.print(f"Config saved to {CONFIG_PATH}")
 
-from . import user, group, role, application, user_group, user_role, provider, flow, core, outpost, event, propertymapping, policy, stage, source
-
 if __name__ == "__main__":
-    app.add_typer(core.app, name="core")
-    app.add_typer(outpost.outpost_app, name="outpost")
-    app.add_typer(event.event_app, name="event")
-    app.add_typer(propertymapping.propertymapping_app, name="propertymapping")
-    app.add_typer(policy.policy_app, name="policy")
-    app.add_typer(stage.stage_app, name="stage")
-    app.add_typer(source.source_app, name="source")
     app()
@@ -1,44 +1,54 @@
 import json
+import pathlib
 
 import typer
 from rich.console import Console
-from rich.table import Table
 
 from authentik_client import api
 from authentik_client.exceptions import ApiException
 
-from .main import get_client, app
+from .aio import FAN_OUT_OPTION, fan_out
+from .bulk import describe_error
+from .cache import NO_CACHE_OPTION, REFRESH_OPTION, cached, invalidate
+from .main import get_client
+from .output import OUTPUT_FILE_OPTION, OUTPUT_OPTION, print_items
+from .pagination import CONCURRENCY_OPTION, LIMIT_OPTION, PAGE_SIZE_OPTION, paginate
+from .query import FIELDS_OPTION, FILTER_OPTION, ORDERING_OPTION, SEARCH_OPTION, query_params
 
 outpost_app = typer.Typer()
 console = Console()
 
 @outpost_app.command("list")
-def list_outposts(output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")):
+def list_outposts(
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    filters: list[str] = FILTER_OPTION,
+    search: str = SEARCH_OPTION,
+    ordering: str = ORDERING_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
     """
     List all outposts.
     """
     client = get_client()
     outposts_api = api.OutpostsApi(client)
+    params = query_params(outposts_api.outposts_instances_list, filters, search, ordering)
     try:
-        outposts = outposts_api.outposts_instances_list()
-        if output == "json":
-            console.print(json.dumps([o.to_dict() for o in outposts.results], indent=2))
-        else:
-            table = Table(title="Outposts")
-            table.add_column("UUID", style="cyan")
-            table.add_column("Name", style="magenta")
-            table.add_column("Type", style="green")
-            table.add_column("Service Connection", style="yellow")
-            for outpost in outposts.results:
-                table.add_row(
-                    outpost.pk,
-                    outpost.name,
-                    outpost.type,
-                    outpost.service_connection_name,
-                )
-            console.print(table)
+        outposts = paginate(cached(outposts_api.outposts_instances_list, "outposts", no_cache, refresh), page_size=page_size, limit=limit, concurrency=concurrency, **params)
+        print_items(console, outposts, output, "Outposts", [
+            ("UUID", "cyan", lambda o: o.pk),
+            ("Name", "magenta", lambda o: o.name),
+            ("Type", "green", lambda o: o.type),
+            ("Service Connection", "yellow", lambda o: o.service_connection_name),
+        ], fields, output_file)
     except ApiException as e:
         console.print(f"[bold red]Error listing outposts: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @outpost_app.command("get")
 def get_outpost(uuid: str = typer.Argument(..., help="The UUID of the outpost to get.")):
@@ -52,6 +62,7 @@ def get_outpost(uuid: str = typer.Argument(..., help="The UUID of the outpost to
         console.print(outpost.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error getting outpost: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @outpost_app.command("delete")
 def delete_outpost(uuid: str = typer.Argument(..., help="The UUID of the outpost to delete.")):
@@ -62,9 +73,11 @@ def delete_outpost(uuid: str = typer.Argument(..., help="The UUID of the outpost
     outposts_api = api.OutpostsApi(client)
     try:
         outposts_api.outposts_instances_destroy(uuid=uuid)
+        invalidate("outposts")
         console.print(f"[bold green]Outpost '{uuid}' deleted successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error deleting outpost: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @outpost_app.command("health")
 def health_outpost(uuid: str = typer.Argument(..., help="The UUID of the outpost to check health.")):
@@ -78,5 +91,49 @@ def health_outpost(uuid: str = typer.Argument(..., help="The UUID of the outpost
         console.print(json.dumps([h.to_dict() for h in health], indent=2))
     except ApiException as e:
         console.print(f"[bold red]Error getting outpost health: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
-app.add_typer(outpost_app, name="outpost")
+@outpost_app.command("health-all")
+def health_all_outposts(
+    output: str = OUTPUT_OPTION,
+    concurrency: int = FAN_OUT_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
+    """
+    Get the health of every outpost instance, checking outposts concurrently.
+    """
+    client = get_client()
+    outposts_api = api.OutpostsApi(client)
+    try:
+        outposts = list(paginate(outposts_api.outposts_instances_list))
+    except ApiException as e:
+        console.print(f"[bold red]Error listing outposts: {e.body}[/bold red]")
+        raise typer.Exit(1)
+
+    rows = []
+    failed = 0
+    for outpost, health, error in fan_out(lambda o: outposts_api.outposts_instances_health_list(uuid=o.pk), outposts, concurrency):
+        row = {"outpost": outpost.name, "uuid": str(outpost.pk)}
+        if error is not None:
+            failed += 1
+            rows.append({**row, "status": f"error: {describe_error(error)}"})
+        elif not health:
+            rows.append({**row, "status": "no instances"})
+        for instance in health or []:
+            rows.append({
+                **row,
+                "status": "outdated" if instance.version_outdated else "ok",
+                "hostname": instance.hostname,
+                "version": instance.version,
+                "last_seen": instance.last_seen,
+            })
+    print_items(console, rows, output, "Outpost Health", [
+        ("Outpost", "cyan", lambda r: r["outpost"]),
+        ("Status", "green", lambda r: r["status"]),
+        ("Hostname", "magenta", lambda r: r.get("hostname")),
+        ("Version", "yellow", lambda r: r.get("version")),
+        ("Last Seen", None, lambda r: str(r["last_seen"]) if r.get("last_seen") else ""),
+    ], fields, output_file)
+    if failed:
+        raise typer.Exit(1)
@@ -0,0 +1,205 @@
+import csv
+import itertools
+import json
+import textwrap
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+OUTPUT_OPTION = typer.Option("table", "--output", "-o", help="Output format (table, json, ndjson or csv)")
+OUTPUT_FILE_OPTION = typer.Option(None, "--output-file", dir_okay=False, help="Write the output to this file instead of stdout.")
+
+
+def _data(item):
+    return item.to_dict() if hasattr(item, "to_dict") else item
+
+
+def _cell(value):
+    return "" if value is None else str(value)
+
+
+def print_json(console, items):
+    """
+    Print items as an indented JSON array, one element at a time.
+
+    The output matches ``json.dumps([...], indent=2)`` but never builds the
+    whole list, so memory stays flat for arbitrarily long streams.
+    """
+    first = True
+    for item in items:
+        element = textwrap.indent(json.dumps(_data(item), indent=2, default=str), "  ")
+        if first:
+            console.print("[", markup=False, soft_wrap=True)
+            first = False
+        else:
+            console.print(",", markup=False, soft_wrap=True)
+        console.print(element, markup=False, soft_wrap=True, end="")
+    console.print("[]" if first else "\n]", markup=False, soft_wrap=True)
+
+
+def write_ndjson(stream, items):
+    """Write one compact JSON object per line straight to ``stream``, bypassing Rich."""
+    for item in items:
+        stream.write(json.dumps(_data(item), default=str))
+        stream.write("\n")
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def write_csv(stream, items):
+    """
+    Write items as CSV straight to ``stream``, bypassing Rich.
+
+    The header is taken from the first item's fields. Nested values are
+    written as JSON so every row stays one line of the file.
+    """
+    writer = None
+    for item in items:
+        data = _data(item)
+        if writer is None:
+            writer = csv.DictWriter(stream, fieldnames=list(data), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow({key: _csv_value(value) for key, value in data.items()})
+
+
+WRITERS = {"ndjson": write_ndjson, "csv": write_csv}
+
+
+# Tables longer than this, or written anywhere but a terminal, are streamed
+# as plain text instead of being measured and laid out by Rich.
+RICH_TABLE_MAX_ROWS = 500
+# Rows sampled to size the columns of a plain table.
+WIDTH_SAMPLE_ROWS = 100
+# Table columns for the rows of ``akc.aio.usage_rows``.
+USAGE_COLUMNS = [
+    ("ID", "cyan", lambda row: row["pk"]),
+    ("Name", "magenta", lambda row: row["name"]),
+    ("Used By", "green", lambda row: str(len(row["used_by"]))),
+    ("Objects", "yellow", lambda row: row["error"] or ", ".join(f"{u['model_name']} '{u['name']}'" for u in row["used_by"])),
+]
+
+# Rows written per chunk of a plain table.
+CHUNK_ROWS = 200
+MAX_COLUMN_WIDTH = 60
+
+
+def print_table(console, items, title, columns):
+    """
+    Print items as a table.
+
+    ``columns`` is a list of ``(header, style, getter)`` tuples where
+    ``getter`` turns an item into the cell text. Short listings on a terminal
+    get a Rich table. Longer ones, and any output that is not a terminal,
+    use the streaming plain renderer so printing starts at once and takes
+    linear time.
+    """
+    rows = (tuple(getter(item) for _, _, getter in columns) for item in items)
+    if not console.is_terminal:
+        print_plain_table(console, rows, [header for header, _, _ in columns])
+        return
+
+    buffered = list(itertools.islice(rows, RICH_TABLE_MAX_ROWS + 1))
+    if len(buffered) > RICH_TABLE_MAX_ROWS:
+        if title:
+            console.print(title, markup=False)
+        print_plain_table(console, itertools.chain(buffered, rows), [header for header, _, _ in columns])
+        return
+
+    table = Table(title=title)
+    for header, style, _ in columns:
+        table.add_column(header, style=style)
+    for row in buffered:
+        table.add_row(*(_cell(value) for value in row))
+    console.print(table)
+
+
+def _fit(text, width):
+    return text if len(text) <= width else text[: width - 1] + "\u2026"
+
+
+def print_plain_table(console, rows, headers):
+    """
+    Stream rows as a plain, space-aligned text table.
+
+    Column widths come from the headers and the first ``WIDTH_SAMPLE_ROWS``
+    rows, capped at ``MAX_COLUMN_WIDTH``. Later cells that do not fit are
+    truncated, except in the last column. Lines go straight to the console's
+    file in chunks of ``CHUNK_ROWS``, bypassing Rich.
+    """
+    sample = []
+    for row in rows:
+        sample.append(tuple(_cell(value).replace("\n", " ") for value in row))
+        if len(sample) == WIDTH_SAMPLE_ROWS:
+            break
+    widths = [
+        min(MAX_COLUMN_WIDTH, max([len(header)] + [len(row[i]) for row in sample]))
+        for i, header in enumerate(headers)
+    ]
+
+    def format_row(cells):
+        *head, last = cells
+        return "  ".join([_fit(cell, width).ljust(width) for cell, width in zip(head, widths)] + [last]).rstrip()
+
+    stream = console.file
+    lines = [format_row(headers), format_row(["-" * width for width in widths])]
+    remaining = (tuple(_cell(value).replace("\n", " ") for value in row) for row in rows)
+    for cells in itertools.chain(sample, remaining):
+        lines.append(format_row(cells))
+        if len(lines) >= CHUNK_ROWS:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+            lines = []
+    if lines:
+        stream.write("\n".join(lines) + "\n")
+        stream.flush()
+
+
+def parse_fields(fields):
+    """Split a ``--fields`` value into field names, or return None when it is empty."""
+    names = [name.strip() for name in (fields or "").split(",") if name.strip()]
+    return names or None
+
+
+def project(items, fields):
+    """Lazily reduce API models to dicts holding only ``fields``, in that order."""
+    for item in items:
+        data = _data(item)
+        yield {field: data.get(field) for field in fields}
+
+
+def print_items(console, items, output, title, columns, fields=None, output_file=None):
+    """
+    Render a stream of API models in the requested output format.
+
+    ``fields`` is a ``--fields`` value. When given, each item is projected to
+    just those fields and they replace the default table columns. With
+    ``output_file`` the output goes to that file instead of the console.
+    The ``ndjson`` and ``csv`` formats write each item as it arrives, without
+    going through Rich, so memory use does not grow with the result count.
+    """
+    names = parse_fields(fields)
+    if names:
+        items = project(items, names)
+        columns = [(name, None, lambda row, name=name: _cell(row[name])) for name in names]
+    if output_file is not None:
+        with open(output_file, "w", newline="", encoding="utf-8") as stream:
+            _render(Console(file=stream, width=console.width), stream, items, output, title, columns)
+    else:
+        _render(console, console.file, items, output, title, columns)
+
+
+def _render(console, stream, items, output, title, columns):
+    if output in WRITERS:
+        WRITERS[output](stream, items)
+        stream.flush()
+    elif output == "json":
+        print_json(console, items)
+    else:
+        print_table(console, items, title, columns)
@@ -0,0 +1,77 @@
+import math
+
+import typer
+
+from .concurrency import ordered_map
+
+DEFAULT_PAGE_SIZE = 100
+
+PAGE_SIZE_OPTION = typer.Option(DEFAULT_PAGE_SIZE, "--page-size", min=1, help="Number of results to fetch per request.")
+LIMIT_OPTION = typer.Option(None, "--limit", min=1, help="Stop after this many results.")
+CONCURRENCY_OPTION = typer.Option(1, "--concurrency", min=1, help="Number of pages to fetch in parallel.")
+
+
+def _next_page(response, current):
+    """Return the next page number of a paginated response, or 0 when there is none."""
+    pagination = getattr(response, "pagination", None)
+    next_page = getattr(pagination, "next", 0)
+    if not isinstance(next_page, (int, float)) or next_page <= current:
+        return 0
+    return int(next_page)
+
+
+def _total_pages(response):
+    """Return the page count reported by a paginated response, or 0 if unknown."""
+    total_pages = getattr(getattr(response, "pagination", None), "total_pages", 0)
+    if not isinstance(total_pages, (int, float)):
+        return 0
+    return int(total_pages)
+
+
+def _pages(list_method, page_size, limit, concurrency, kwargs):
+    """Yield the responses of a paginated list call in page order."""
+    first = list_method(page=1, page_size=page_size, **kwargs)
+    yield first
+    page = _next_page(first, 1)
+    if not page:
+        return
+
+    if concurrency > 1 and _total_pages(first):
+        last_page = _total_pages(first)
+        if limit is not None:
+            last_page = min(last_page, math.ceil(limit / page_size))
+        yield from ordered_map(
+            lambda number: list_method(page=number, page_size=page_size, **kwargs),
+            range(page, last_page + 1),
+            concurrency,
+        )
+        return
+
+    while page:
+        response = list_method(page=page, page_size=page_size, **kwargs)
+        yield response
+        page = _next_page(response, page)
+
+
+def paginate(list_method, page_size=DEFAULT_PAGE_SIZE, limit=None, concurrency=1, **kwargs):
+    """
+    Lazily yield every result of a paginated ``*_list`` API method.
+
+    Pages are requested one at a time by following ``pagination.next``, so
+    only a single page is held in memory and callers can start rendering
+    before the last page arrives. Extra keyword arguments are passed through
+    to ``list_method`` as query parameters.
+
+    With ``concurrency`` above one, the page count is read from the first
+    response and the remaining pages are fetched on a bounded thread pool.
+    Results are still yielded in server order.
+    """
+    if limit is not None:
+        page_size = min(page_size, limit)
+    yielded = 0
+    for response in _pages(list_method, page_size, limit, concurrency, kwargs):
+        for item in response.results:
+            yield item
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
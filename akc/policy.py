@@ -1,45 +1,59 @@
-import json
+import pathlib
 
 import typer
-from rich.console import Console
-from rich.table import Table
-
 from authentik_client import api
 from authentik_client.exceptions import ApiException
 from authentik_client.models import PolicyBindingRequest
+from rich.console import Console
 
-from .main import get_client, app
+from .aio import FAN_OUT_OPTION, usage_rows
+from .cache import NO_CACHE_OPTION, REFRESH_OPTION, cached, invalidate
+from .main import get_client
+from .output import OUTPUT_FILE_OPTION, OUTPUT_OPTION, USAGE_COLUMNS, print_items
+from .pagination import CONCURRENCY_OPTION, LIMIT_OPTION, PAGE_SIZE_OPTION, paginate
+from .query import (
+    FIELDS_OPTION,
+    FILTER_OPTION,
+    ORDERING_OPTION,
+    SEARCH_OPTION,
+    query_params,
+)
+from .resolve import resolve
 
 policy_app = typer.Typer()
 console = Console()
 
 @policy_app.command("list")
-def list_policies(output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")):
+def list_policies(
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    filters: list[str] = FILTER_OPTION,
+    search: str = SEARCH_OPTION,
+    ordering: str = ORDERING_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
     """
     List all policies.
     """
     client = get_client()
     policies_api = api.PoliciesApi(client)
+    params = query_params(policies_api.policies_all_list, filters, search, ordering)
     try:
-        policies = policies_api.policies_all_list()
-        if output == "json":
-            console.print(json.dumps([p.to_dict() for p in policies.results], indent=2))
-        else:
-            table = Table(title="Policies")
-            table.add_column("UUID", style="cyan")
-            table.add_column("Name", style="magenta")
-            table.add_column("Component", style="green")
-            table.add_column("Bound To", style="yellow")
-            for policy in policies.results:
-                table.add_row(
-                    policy.pk,
-                    policy.name,
-                    policy.component,
-                    str(policy.bound_to)
-                )
-            console.print(table)
+        policies = paginate(cached(policies_api.policies_all_list, "policies", no_cache, refresh), page_size=page_size, limit=limit, concurrency=concurrency, **params)
+        print_items(console, policies, output, "Policies", [
+            ("UUID", "cyan", lambda p: p.pk),
+            ("Name", "magenta", lambda p: p.name),
+            ("Component", "green", lambda p: p.component),
+            ("Bound To", "yellow", lambda p: str(p.bound_to)),
+        ], fields, output_file)
     except ApiException as e:
         console.print(f"[bold red]Error listing policies: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @policy_app.command("get")
 def get_policy(uuid: str = typer.Argument(..., help="The UUID of the policy to get.")):
@@ -53,6 +67,7 @@ def get_policy(uuid: str = typer.Argument(..., help="The UUID of the policy to g
         console.print(policy.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error getting policy: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @policy_app.command("delete")
 def delete_policy(uuid: str = typer.Argument(..., help="The UUID of the policy to delete.")):
@@ -63,9 +78,11 @@ def delete_policy(uuid: str = typer.Argument(..., help="The UUID of the policy t
     policies_api = api.PoliciesApi(client)
     try:
         policies_api.policies_all_destroy(policy_uuid=uuid)
+        invalidate("policies")
         console.print(f"[bold green]Policy '{uuid}' deleted successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error deleting policy: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @policy_app.command("use")
 def get_policy_use(uuid: str = typer.Argument(..., help="The UUID of the policy to check.")):
@@ -77,29 +94,50 @@ def get_policy_use(uuid: str = typer.Argument(..., help="The UUID of the policy
         console.print([item.to_dict() for item in used_by])
     except ApiException as e:
         console.print(f"[bold red]Error getting policy usage: {e.body}[/bold red]")
+        raise typer.Exit(1)
+
+@policy_app.command("use-all")
+def get_all_policy_use(
+    output: str = OUTPUT_OPTION,
+    concurrency: int = FAN_OUT_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
+    """Check which objects are using each policy, fetching usage concurrently."""
+    client = get_client()
+    policies_api = api.PoliciesApi(client)
+    try:
+        policies = list(paginate(policies_api.policies_all_list))
+    except ApiException as e:
+        console.print(f"[bold red]Error listing policies: {e.body}[/bold red]")
+        raise typer.Exit(1)
+    rows, failed = usage_rows(policies, lambda pk: policies_api.policies_all_used_by_list(policy_uuid=pk), concurrency)
+    print_items(console, rows, output, "Policy Usage", USAGE_COLUMNS, fields, output_file)
+    if failed:
+        raise typer.Exit(1)
 
 
 @policy_app.command("bind-to-app")
 def bind_policy_to_app(
     policy_uuid: str = typer.Argument(..., help="The UUID of the policy to bind."),
-    app_uuid: str = typer.Argument(..., help="The UUID of the application to bind to."),
+    app_uuid: str = typer.Argument(..., help="The UUID, slug or name of the application to bind to."),
     order: int = typer.Argument(..., help="The order of the policy binding."),
 ):
     """Bind a policy to an application."""
     client = get_client()
     policies_api = api.PoliciesApi(client)
     try:
+        app_uuid = resolve(client, "application", app_uuid)
         binding_request = PolicyBindingRequest(
             policy=policy_uuid,
             target=app_uuid,
             order=order,
         )
         policies_api.policies_bindings_create(policy_binding_request=binding_request)
+        invalidate("policies")
         console.print(
             f"[bold green]Policy '{policy_uuid}' bound to application '{app_uuid}' successfully.[/bold green]"
         )
     except ApiException as e:
         console.print(f"[bold red]Error binding policy: {e.body}[/bold red]")
-
-
-app.add_typer(policy_app, name="policy")
+        raise typer.Exit(1)
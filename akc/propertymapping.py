@@ -1,42 +1,55 @@
-import json
+import pathlib
 
 import typer
-from rich.console import Console
-from rich.table import Table
-
 from authentik_client import api
 from authentik_client.exceptions import ApiException
+from rich.console import Console
 
-from .main import get_client, app
+from .cache import NO_CACHE_OPTION, REFRESH_OPTION, cached, invalidate
+from .main import get_client
+from .output import OUTPUT_FILE_OPTION, OUTPUT_OPTION, print_items
+from .pagination import CONCURRENCY_OPTION, LIMIT_OPTION, PAGE_SIZE_OPTION, paginate
+from .query import (
+    FIELDS_OPTION,
+    FILTER_OPTION,
+    ORDERING_OPTION,
+    SEARCH_OPTION,
+    query_params,
+)
 
 propertymapping_app = typer.Typer()
 console = Console()
 
 @propertymapping_app.command("list")
-def list_propertymappings(output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")):
+def list_propertymappings(
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    filters: list[str] = FILTER_OPTION,
+    search: str = SEARCH_OPTION,
+    ordering: str = ORDERING_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
     """
     List all property mappings.
     """
     client = get_client()
     propertymappings_api = api.PropertymappingsApi(client)
+    params = query_params(propertymappings_api.propertymappings_all_list, filters, search, ordering)
     try:
-        propertymappings = propertymappings_api.propertymappings_all_list()
-        if output == "json":
-            console.print(json.dumps([p.to_dict() for p in propertymappings.results], indent=2))
-        else:
-            table = Table(title="Property Mappings")
-            table.add_column("UUID", style="cyan")
-            table.add_column("Name", style="magenta")
-            table.add_column("Managed", style="green")
-            for propertymapping in propertymappings.results:
-                table.add_row(
-                    propertymapping.pk,
-                    propertymapping.name,
-                    str(propertymapping.managed)
-                )
-            console.print(table)
+        propertymappings = paginate(cached(propertymappings_api.propertymappings_all_list, "propertymappings", no_cache, refresh), page_size=page_size, limit=limit, concurrency=concurrency, **params)
+        print_items(console, propertymappings, output, "Property Mappings", [
+            ("UUID", "cyan", lambda p: p.pk),
+            ("Name", "magenta", lambda p: p.name),
+            ("Managed", "green", lambda p: str(p.managed)),
+        ], fields, output_file)
     except ApiException as e:
         console.print(f"[bold red]Error listing property mappings: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @propertymapping_app.command("get")
 def get_propertymapping(uuid: str = typer.Argument(..., help="The UUID of the property mapping to get.")):
@@ -50,6 +63,7 @@ def get_propertymapping(uuid: str = typer.Argument(..., help="The UUID of the pr
         console.print(propertymapping.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error getting property mapping: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @propertymapping_app.command("delete")
 def delete_propertymapping(uuid: str = typer.Argument(..., help="The UUID of the property mapping to delete.")):
@@ -60,8 +74,8 @@ def delete_propertymapping(uuid: str = typer.Argument(..., help="The UUID of the
     propertymappings_api = api.PropertymappingsApi(client)
     try:
         propertymappings_api.propertymappings_all_destroy(pm_uuid=uuid)
+        invalidate("propertymappings")
         console.print(f"[bold green]Property mapping '{uuid}' deleted successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error deleting property mapping: {e.body}[/bold red]")
-
-app.add_typer(propertymapping_app, name="propertymapping")
+        raise typer.Exit(1)
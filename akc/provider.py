@@ -1,14 +1,24 @@
-import json
+import pathlib
 
 import typer
-from rich.console import Console
-from rich.table import Table
-
 from authentik_client import api
 from authentik_client.exceptions import ApiException
 from authentik_client.models import OAuth2ProviderRequest
+from rich.console import Console
 
-from .main import get_client, app
+from .aio import FAN_OUT_OPTION, usage_rows
+from .cache import NO_CACHE_OPTION, REFRESH_OPTION, cached, invalidate
+from .main import get_client
+from .output import OUTPUT_FILE_OPTION, OUTPUT_OPTION, USAGE_COLUMNS, print_items
+from .pagination import CONCURRENCY_OPTION, LIMIT_OPTION, PAGE_SIZE_OPTION, paginate
+from .query import (
+    FIELDS_OPTION,
+    FILTER_OPTION,
+    ORDERING_OPTION,
+    SEARCH_OPTION,
+    query_params,
+)
+from .resolve import forget, resolve
 
 provider_app = typer.Typer()
 console = Console()
@@ -24,14 +34,8 @@ def create_oauth2_provider(
     """Create a new OAuth2 provider."""
     client = get_client()
     providers_api = api.ProvidersApi(client)
-    flows_api = api.FlowsApi(client)
     try:
-        # Find the authorization flow by slug to get its UUID
-        flows = flows_api.flows_instances_list(slug=authorization_flow_slug)
-        if not flows.results:
-            console.print(f"[bold red]Authorization flow with slug '{authorization_flow_slug}' not found.[/bold red]")
-            raise typer.Exit(1)
-        authorization_flow_uuid = flows.results[0].pk
+        authorization_flow_uuid = resolve(client, "flow", authorization_flow_slug)
 
         provider_request = OAuth2ProviderRequest(
             name=name,
@@ -40,6 +44,7 @@ def create_oauth2_provider(
             redirect_uris=redirect_uris,
         )
         new_provider = providers_api.providers_oauth2_create(oauth2_provider_request=provider_request)
+        invalidate("providers")
         console.print(f"[bold green]OAuth2 provider '{new_provider.name}' created successfully with ID {new_provider.pk}.[/bold green]")
         console.print(f"Client ID: {new_provider.client_id}")
         if new_provider.client_secret:
@@ -47,59 +52,70 @@ def create_oauth2_provider(
 
     except ApiException as e:
         console.print(f"[bold red]Error creating OAuth2 provider: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 
 @provider_app.command("list")
-def list_providers(output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")):
+def list_providers(
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    filters: list[str] = FILTER_OPTION,
+    search: str = SEARCH_OPTION,
+    ordering: str = ORDERING_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
     """
     List all providers.
     """
     client = get_client()
     providers_api = api.ProvidersApi(client)
+    params = query_params(providers_api.providers_all_list, filters, search, ordering)
     try:
-        providers = providers_api.providers_all_list()
-        if output == "json":
-            console.print(json.dumps([p.to_dict() for p in providers.results], indent=2))
-        else:
-            table = Table(title="Providers")
-            table.add_column("ID", style="cyan")
-            table.add_column("Name", style="magenta")
-            table.add_column("Component", style="green")
-            for provider in providers.results:
-                table.add_row(
-                    str(provider.pk),
-                    provider.name,
-                    provider.component,
-                )
-            console.print(table)
+        providers = paginate(cached(providers_api.providers_all_list, "providers", no_cache, refresh), page_size=page_size, limit=limit, concurrency=concurrency, **params)
+        print_items(console, providers, output, "Providers", [
+            ("ID", "cyan", lambda p: str(p.pk)),
+            ("Name", "magenta", lambda p: p.name),
+            ("Component", "green", lambda p: p.component),
+        ], fields, output_file)
     except ApiException as e:
         console.print(f"[bold red]Error listing providers: {e.body}[/bold red]")
-
+        raise typer.Exit(1)
 
 @provider_app.command("get")
-def get_provider(provider_id: int = typer.Argument(..., help="The ID of the provider to get.")):
+def get_provider(provider_id: str = typer.Argument(..., help="The ID or name of the provider to get.")):
     """Get a single provider."""
     client = get_client()
     providers_api = api.ProvidersApi(client)
     try:
+        provider_id = resolve(client, "provider", provider_id)
         provider = providers_api.providers_all_retrieve(provider_id=provider_id)
         console.print(provider.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error getting provider: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 
 @provider_app.command("delete")
-def delete_provider(provider_id: int = typer.Argument(..., help="The ID of the provider to delete.")):
+def delete_provider(provider_id: str = typer.Argument(..., help="The ID or name of the provider to delete.")):
     """
     Delete a provider.
     """
     client = get_client()
     providers_api = api.ProvidersApi(client)
     try:
+        provider_id = resolve(client, "provider", provider_id)
         providers_api.providers_all_destroy(provider_id=provider_id)
+        invalidate("providers")
+        forget(client, "provider", provider_id)
         console.print(f"[bold green]Provider with ID {provider_id} deleted successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error deleting provider: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 
 @provider_app.command("list-types")
@@ -112,18 +128,39 @@ def list_provider_types():
         console.print([t.to_dict() for t in types])
     except ApiException as e:
         console.print(f"[bold red]Error listing provider types: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 
 @provider_app.command("use")
-def get_provider_use(provider_id: int = typer.Argument(..., help="The ID of the provider to check.")):
+def get_provider_use(provider_id: str = typer.Argument(..., help="The ID or name of the provider to check.")):
     """Check which objects are using a provider."""
     client = get_client()
     providers_api = api.ProvidersApi(client)
     try:
+        provider_id = resolve(client, "provider", provider_id)
         used_by = providers_api.providers_all_used_by_list(provider_id=provider_id)
         console.print([item.to_dict() for item in used_by])
     except ApiException as e:
         console.print(f"[bold red]Error getting provider usage: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 
-app.add_typer(provider_app, name="provider")
+@provider_app.command("use-all")
+def get_all_provider_use(
+    output: str = OUTPUT_OPTION,
+    concurrency: int = FAN_OUT_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
+    """Check which objects are using each provider, fetching usage concurrently."""
+    client = get_client()
+    providers_api = api.ProvidersApi(client)
+    try:
+        providers = list(paginate(providers_api.providers_all_list))
+    except ApiException as e:
+        console.print(f"[bold red]Error listing providers: {e.body}[/bold red]")
+        raise typer.Exit(1)
+    rows, failed = usage_rows(providers, lambda pk: providers_api.providers_all_used_by_list(provider_id=pk), concurrency)
+    print_items(console, rows, output, "Provider Usage", USAGE_COLUMNS, fields, output_file)
+    if failed:
+        raise typer.Exit(1)
@@ -0,0 +1,96 @@
+import inspect
+import types
+import typing
+
+import typer
+
+FILTER_OPTION = typer.Option(None, "--filter", help="Server-side filter as key=value. May be repeated.")
+SEARCH_OPTION = typer.Option(None, "--search", help="Server-side search term.")
+ORDERING_OPTION = typer.Option(None, "--ordering", help="Field to order by, prefixed with '-' for descending.")
+FIELDS_OPTION = typer.Option(None, "--fields", help="Comma-separated fields to show, e.g. pk,username,is_active.")
+
+# Parameters that are managed by akc itself rather than exposed as filters.
+RESERVED_PARAMS = {"self", "page", "page_size", "search", "ordering"}
+
+
+def _base_type(annotation):
+    """Return ``(type, is_list)`` for a generated client parameter annotation."""
+    is_list = False
+    while True:
+        origin = typing.get_origin(annotation)
+        args = typing.get_args(annotation)
+        if origin is typing.Annotated:
+            annotation = args[0]
+        elif origin in (typing.Union, types.UnionType):
+            non_null = [a for a in args if a is not type(None)]
+            if len(non_null) != 1:
+                return str, is_list
+            annotation = non_null[0]
+        elif origin is list:
+            is_list = True
+            annotation = args[0] if args else str
+        else:
+            return annotation, is_list
+
+
+def _coerce(key, value, annotation):
+    """Convert a command line string to the type the list parameter expects."""
+    base, _ = _base_type(annotation)
+    if base is bool:
+        lowered = value.strip().lower()
+        if lowered in ("1", "true", "yes", "y", "on"):
+            return True
+        if lowered in ("0", "false", "no", "n", "off"):
+            return False
+        raise typer.BadParameter(f"'{key}' expects true or false, got '{value}'.", param_hint="--filter")
+    if base in (int, float):
+        try:
+            return base(value)
+        except ValueError:
+            raise typer.BadParameter(f"'{key}' expects a number, got '{value}'.", param_hint="--filter")
+    # Strings, UUIDs, dates and enums are validated by the generated client.
+    return value
+
+
+def filter_names(list_method):
+    """Return the filter parameters accepted by a generated ``*_list`` method."""
+    return sorted(
+        name
+        for name in inspect.signature(list_method).parameters
+        if name not in RESERVED_PARAMS and not name.startswith("_")
+    )
+
+
+def query_params(list_method, filters: list[str] | None = None, search=None, ordering=None):
+    """
+    Turn ``--filter``, ``--search`` and ``--ordering`` values into ``list_method`` keyword arguments.
+
+    Filter keys are checked against the method's signature and values are
+    coerced to the parameter's type, so mistakes are reported before any
+    request is sent. List parameters accept comma-separated values and may
+    be repeated.
+    """
+    parameters = inspect.signature(list_method).parameters
+    params = {}
+    for item in filters or []:
+        key, sep, value = item.partition("=")
+        key = key.strip()
+        if not sep or not key:
+            raise typer.BadParameter(f"Expected key=value, got '{item}'.", param_hint="--filter")
+        if key in RESERVED_PARAMS or key.startswith("_") or key not in parameters:
+            raise typer.BadParameter(
+                f"Unknown filter '{key}'. Available filters: {', '.join(filter_names(list_method))}.",
+                param_hint="--filter",
+            )
+        annotation = parameters[key].annotation
+        if _base_type(annotation)[1]:
+            params.setdefault(key, []).extend(_coerce(key, v, annotation) for v in value.split(",") if v)
+        else:
+            params[key] = _coerce(key, value, annotation)
+    for name, value in (("search", search), ("ordering", ordering)):
+        if value is None:
+            continue
+        if name not in parameters:
+            raise typer.BadParameter(f"This list does not support {name}.", param_hint=f"--{name}")
+        params[name] = value
+    return params
@@ -0,0 +1,301 @@
+import collections
+import datetime
+import itertools
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import typer
+from authentik_client import api
+from authentik_client.exceptions import ApiException
+from rich.console import Console
+
+from .cache import CACHE_DIR
+from .main import get_client
+from .pagination import paginate
+
+index_app = typer.Typer()
+console = Console()
+
+INDEX_PATH = os.path.join(CACHE_DIR, "index.sqlite")
+
+# Entries older than this are looked up again before they are trusted, so
+# renames and deletions made outside akc are picked up within a day.
+INDEX_TTL = 24 * 60 * 60
+
+# How each kind is listed and looked up. ``filters`` maps every field that
+# can name an object to the list query parameter that finds it. Kinds marked
+# ``incremental`` can refresh only the objects changed since the last sync.
+Kind = collections.namedtuple("Kind", ["api", "list_method", "pk_type", "filters", "incremental"])
+
+KINDS = {
+    "user": Kind("CoreApi", "core_users_list", int, {"username": "username"}, True),
+    "group": Kind("CoreApi", "core_groups_list", uuid.UUID, {"name": "name"}, False),
+    "role": Kind("RbacApi", "rbac_roles_list", uuid.UUID, {"name": "name"}, False),
+    "application": Kind("CoreApi", "core_applications_list", uuid.UUID, {"slug": "slug", "name": "name"}, False),
+    "flow": Kind("FlowsApi", "flows_instances_list", uuid.UUID, {"slug": "slug"}, False),
+    "stage": Kind("StagesApi", "stages_all_list", uuid.UUID, {"name": "name"}, False),
+    "provider": Kind("ProvidersApi", "providers_all_list", int, {"name": "search"}, False),
+}
+
+_lock = threading.Lock()
+_connection = None
+# (host, kind) -> {name: (pk, stored)}, loaded from the index on first use.
+_names = {}
+
+
+def _connect():
+    global _connection
+    if _connection is None:
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+        _connection = sqlite3.connect(INDEX_PATH, check_same_thread=False)
+        with _connection:
+            _connection.execute(
+                "CREATE TABLE IF NOT EXISTS names ("
+                "host TEXT NOT NULL, kind TEXT NOT NULL, name TEXT NOT NULL, pk TEXT NOT NULL, stored REAL NOT NULL, "
+                "PRIMARY KEY (host, kind, name))"
+            )
+            _connection.execute(
+                "CREATE TABLE IF NOT EXISTS syncs ("
+                "host TEXT NOT NULL, kind TEXT NOT NULL, synced REAL NOT NULL, PRIMARY KEY (host, kind))"
+            )
+    return _connection
+
+
+def _host(client):
+    return getattr(getattr(client, "configuration", None), "host", "") or ""
+
+
+def _list_method(client, kind):
+    spec = KINDS[kind]
+    return getattr(getattr(api, spec.api)(client), spec.list_method)
+
+
+def _load(host, kind):
+    """Return the in-memory names of ``kind``, reading them from the index on first use."""
+    key = (host, kind)
+    if key not in _names:
+        try:
+            with _lock:
+                rows = _connect().execute(
+                    "SELECT name, pk, stored FROM names WHERE host = ? AND kind = ?", (host, kind)
+                ).fetchall()
+        except sqlite3.Error:
+            rows = []
+        _names[key] = {name: (pk, stored) for name, pk, stored in rows}
+    return _names[key]
+
+
+def remember(host, kind, objects):
+    """
+    Index every name of ``objects``.
+
+    Names an object no longer has are dropped first, so a renamed object
+    cannot be found under its old name.
+    """
+    names = _load(host, kind)
+    now = time.time()
+    entries = {}
+    pks = set()
+    for obj in objects:
+        pks.add(str(obj.pk))
+        for field in KINDS[kind].filters:
+            name = getattr(obj, field, None)
+            if name:
+                entries[name] = (str(obj.pk), now)
+    for name in [name for name, (pk, _) in names.items() if pk in pks]:
+        del names[name]
+    names.update(entries)
+    try:
+        with _lock:
+            connection = _connect()
+            with connection:
+                connection.executemany(
+                    "DELETE FROM names WHERE host = ? AND kind = ? AND pk = ?",
+                    [(host, kind, pk) for pk in pks],
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO names (host, kind, name, pk, stored) VALUES (?, ?, ?, ?, ?)",
+                    [(host, kind, name, pk, stored) for name, (pk, stored) in entries.items()],
+                )
+    except sqlite3.Error:
+        pass
+
+
+def _settle(host, kind, started, drop):
+    """
+    Finish a sweep of ``kind`` that started at ``started``.
+
+    With ``drop`` the names the sweep did not store again are deleted, which
+    is how a full sweep removes deleted objects. Otherwise every name is
+    marked as confirmed at ``started``, since an incremental sweep only
+    stores the objects that changed.
+    """
+    names = _load(host, kind)
+    for name, (pk, stored) in list(names.items()):
+        if stored < started:
+            if drop:
+                del names[name]
+            else:
+                names[name] = (pk, started)
+    try:
+        with _lock:
+            connection = _connect()
+            with connection:
+                if drop:
+                    connection.execute(
+                        "DELETE FROM names WHERE host = ? AND kind = ? AND stored < ?", (host, kind, started)
+                    )
+                else:
+                    connection.execute(
+                        "UPDATE names SET stored = ? WHERE host = ? AND kind = ? AND stored < ?",
+                        (started, host, kind, started),
+                    )
+    except sqlite3.Error:
+        pass
+
+
+def reindex(client, kind, obj):
+    """Index ``obj`` under its current names only, e.g. after it was renamed."""
+    remember(_host(client), kind, [obj])
+
+
+def forget(client, kind, pk):
+    """Drop every name pointing at ``pk``, e.g. after deleting the object."""
+    host = _host(client)
+    names = _load(host, kind)
+    for name in [name for name, (value, _) in names.items() if value == str(pk)]:
+        del names[name]
+    try:
+        with _lock:
+            connection = _connect()
+            with connection:
+                connection.execute("DELETE FROM names WHERE host = ? AND kind = ? AND pk = ?", (host, kind, str(pk)))
+    except sqlite3.Error:
+        pass
+
+
+def _is_pk(spec, value):
+    try:
+        spec.pk_type(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _pk(spec, value):
+    return int(value) if spec.pk_type is int else str(value)
+
+
+def _lookup(client, kind, value):
+    """Find ``value`` with one filtered list call per name field, indexing every result."""
+    spec = KINDS[kind]
+    list_method = _list_method(client, kind)
+    for field, param in spec.filters.items():
+        results = list_method(**{param: value}).results
+        remember(_host(client), kind, results)
+        for obj in results:
+            if getattr(obj, field, None) == value:
+                return obj.pk
+    return None
+
+
+def resolve(client, kind, value):
+    """
+    Return the primary key of the ``kind`` object named ``value``.
+
+    Primary keys are returned as they are. Names, slugs and usernames are
+    answered from the local index, and only unknown or stale names cost a
+    lookup request. Raises ``typer.BadParameter`` if nothing matches.
+    """
+    spec = KINDS[kind]
+    if _is_pk(spec, value):
+        return _pk(spec, value)
+    hit = _load(_host(client), kind).get(value)
+    if hit is not None and time.time() - hit[1] < INDEX_TTL:
+        return _pk(spec, hit[0])
+    pk = _lookup(client, kind, value)
+    if pk is None:
+        raise typer.BadParameter(f"No {kind} named '{value}' was found.")
+    return _pk(spec, pk)
+
+
+def refresh(client, kind, full=False, page_size=100, concurrency=1):
+    """
+    Bring the index of ``kind`` up to date and return the number of objects fetched.
+
+    Incremental kinds only fetch the objects updated since their last sync.
+    Other kinds, or ``full``, sweep every object and drop names that are gone.
+    Objects are indexed a page at a time, so the kind is never held in memory.
+    """
+    host = _host(client)
+    started = time.time()
+    with _lock:
+        row = _connect().execute("SELECT synced FROM syncs WHERE host = ? AND kind = ?", (host, kind)).fetchone()
+    params = {}
+    incremental = KINDS[kind].incremental and row is not None and not full
+    if incremental:
+        params["last_updated__gt"] = datetime.datetime.fromtimestamp(row[0], datetime.UTC)
+    objects = paginate(_list_method(client, kind), page_size=page_size, concurrency=concurrency, **params)
+    count = 0
+    while True:
+        batch = list(itertools.islice(objects, page_size))
+        if not batch:
+            break
+        remember(host, kind, batch)
+        count += len(batch)
+    _settle(host, kind, started, drop=not incremental)
+    with _lock:
+        connection = _connect()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO syncs (host, kind, synced) VALUES (?, ?, ?)", (host, kind, started)
+            )
+    return count
+
+
+def clear():
+    """Drop the whole index."""
+    _names.clear()
+    with _lock:
+        connection = _connect()
+        with connection:
+            connection.execute("DELETE FROM names")
+            connection.execute("DELETE FROM syncs")
+
+
+KINDS_ARGUMENT = typer.Argument(None, help=f"Kinds to refresh: {', '.join(KINDS)}. Defaults to all.")
+
+
+@index_app.command("refresh")
+def refresh_index(
+    kinds: list[str] = KINDS_ARGUMENT,
+    full: bool = typer.Option(False, "--full", help="Sweep every object, even for kinds that support incremental refresh."),
+    page_size: int = typer.Option(100, "--page-size", min=1, help="Number of results to fetch per request."),
+    concurrency: int = typer.Option(1, "--concurrency", min=1, help="Number of pages to fetch in parallel."),
+):
+    """
+    Refresh the local index that resolves names, slugs and usernames to IDs.
+    """
+    unknown = [kind for kind in kinds or [] if kind not in KINDS]
+    if unknown:
+        raise typer.BadParameter(f"Unknown kind {', '.join(unknown)}; choose from {', '.join(KINDS)}.")
+    client = get_client()
+    try:
+        for kind in kinds or KINDS:
+            count = refresh(client, kind, full, page_size, concurrency)
+            console.print(f"[bold green]Indexed {count} {kind} objects.[/bold green]")
+    except ApiException as e:
+        console.print(f"[bold red]Error refreshing index: {e.body}[/bold red]")
+        raise typer.Exit(1)
+
+
+@index_app.command("clear")
+def clear_index():
+    """
+    Remove every entry from the local name index.
+    """
+    clear()
+    console.print("[bold green]Name index cleared.[/bold green]")
@@ -0,0 +1,45 @@
+import random
+import time
+
+from authentik_client.exceptions import ApiException
+
+# Responses worth retrying: rate limiting and transient server errors.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# The statuses for which the server did not process the request, so even a
+# request that is not idempotent, such as a create, is safe to resend.
+NOT_PROCESSED_STATUSES = {429, 503}
+DEFAULT_ATTEMPTS = 5
+# Set by the request governor on failed responses it will not retry again.
+EXHAUSTED_HEADER = "X-Akc-Retries-Exhausted"
+
+
+def is_retryable(error, idempotent=True):
+    """Return True if ``error`` is an API error that may succeed when retried."""
+    statuses = RETRY_STATUSES if idempotent else NOT_PROCESSED_STATUSES
+    return isinstance(error, ApiException) and error.status in statuses
+
+
+def retries_exhausted(error):
+    """Return True if the request governor already settled ``error`` and it must not be resent."""
+    return bool((getattr(error, "headers", None) or {}).get(EXHAUSTED_HEADER))
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    """Return an exponential backoff delay with full jitter for a zero-based ``attempt``."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def call_with_retry(func, *args, attempts=DEFAULT_ATTEMPTS, idempotent=True, **kwargs):
+    """
+    Call ``func``, retrying rate-limited and transient server errors with backoff.
+
+    Pass ``idempotent=False`` for calls such as creates, which may have taken
+    effect despite a 500, 502 or 504; those are only retried on 429 and 503.
+    """
+    for attempt in range(attempts):
+        try:
+            return func(*args, **kwargs)
+        except ApiException as e:
+            if attempt == attempts - 1 or not is_retryable(e, idempotent) or retries_exhausted(e):
+                raise
+            time.sleep(backoff_delay(attempt))
@@ -1,11 +1,23 @@
+import pathlib
+
 import typer
-from rich.console import Console
-from rich.table import Table
-import json
 from authentik_client import api
 from authentik_client.exceptions import ApiException
-from authentik_client.models import PatchedRoleRequest, Role, Group, User
-from .main import get_client, app
+from authentik_client.models import Group, PatchedRoleRequest, Role, User
+from rich.console import Console
+
+from .cache import NO_CACHE_OPTION, REFRESH_OPTION, cached, invalidate
+from .main import get_client
+from .output import OUTPUT_FILE_OPTION, OUTPUT_OPTION, print_items
+from .pagination import CONCURRENCY_OPTION, LIMIT_OPTION, PAGE_SIZE_OPTION, paginate
+from .query import (
+    FIELDS_OPTION,
+    FILTER_OPTION,
+    ORDERING_OPTION,
+    SEARCH_OPTION,
+    query_params,
+)
+from .resolve import forget, reindex, resolve
 
 role_app = typer.Typer()
 console = Console()
@@ -20,45 +32,58 @@ def create_role(name: str):
     role = Role(name=name)
     try:
         new_role = core_api.core_roles_create(role)
+        invalidate("roles")
         console.print(f"[bold green]Role '{new_role.name}' created successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error creating role: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @role_app.command("list")
-def list_roles(output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")):
+def list_roles(
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    filters: list[str] = FILTER_OPTION,
+    search: str = SEARCH_OPTION,
+    ordering: str = ORDERING_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
     """
     List all roles.
     """
     client = get_client()
     core_api = api.CoreApi(client)
+    params = query_params(core_api.core_roles_list, filters, search, ordering)
     try:
-        roles = core_api.core_roles_list()
-        if output == "json":
-            console.print(json.dumps([r.to_dict() for r in roles.results], indent=2))
-        else:
-            table = Table(title="Roles")
-            table.add_column("ID", style="cyan")
-            table.add_column("Name", style="magenta")
-            for role in roles.results:
-                table.add_row(role.pk, role.name)
-            console.print(table)
+        roles = paginate(cached(core_api.core_roles_list, "roles", no_cache, refresh), page_size=page_size, limit=limit, concurrency=concurrency, **params)
+        print_items(console, roles, output, "Roles", [
+            ("ID", "cyan", lambda r: r.pk),
+            ("Name", "magenta", lambda r: r.name),
+        ], fields, output_file)
     except ApiException as e:
         console.print(f"[bold red]Error listing roles: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @role_app.command("get")
-def get_role(role_id: str = typer.Argument(..., help="The ID or UUID of the role.")):
+def get_role(role_id: str = typer.Argument(..., help="The UUID or name of the role.")):
     """Get a single role."""
     client = get_client()
     core_api = api.CoreApi(client)
     try:
+        role_id = resolve(client, "role", role_id)
         role = core_api.core_roles_retrieve(role_uuid=role_id)
         console.print(role.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error getting role: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @role_app.command("update")
 def update_role(
-    role_id: str = typer.Argument(..., help="The ID of the role to update."),
+    role_id: str = typer.Argument(..., help="The UUID or name of the role to update."),
     name: str = typer.Option(None, "--name", help="New name for the role."),
 ):
     """
@@ -67,6 +92,7 @@ def update_role(
     client = get_client()
     core_api = api.CoreApi(client)
     try:
+        role_id = resolve(client, "role", role_id)
         update_data = PatchedRoleRequest()
         if name is not None:
             update_data.name = name
@@ -76,66 +102,71 @@ def update_role(
             return
 
         updated_role = core_api.core_roles_partial_update(role_uuid=role_id, patched_role_request=update_data)
+        invalidate("roles")
+        reindex(client, "role", updated_role)
         console.print(f"[bold green]Role '{updated_role.name}' (ID: {updated_role.pk}) updated successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error updating role: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @role_app.command("delete")
-def delete_role(role_id: str = typer.Argument(..., help="The ID of the role to delete.")):
+def delete_role(role_id: str = typer.Argument(..., help="The UUID or name of the role to delete.")):
     """
     Delete a role.
     """
     client = get_client()
     core_api = api.CoreApi(client)
     try:
+        role_id = resolve(client, "role", role_id)
         core_api.core_roles_destroy(role_uuid=role_id)
+        invalidate("roles")
+        forget(client, "role", role_id)
         console.print(f"[bold green]Role with ID {role_id} deleted successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error deleting role: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @role_app.command("list-users")
 def list_role_users(
-    role_id: str = typer.Argument(..., help="The ID or UUID of the role."),
-    output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")
+    role_id: str = typer.Argument(..., help="The UUID or name of the role."),
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
 ):
     """List users with a role."""
     client = get_client()
     core_api = api.CoreApi(client)
     try:
-        users = core_api.core_roles_users_list(role_uuid=role_id)
-        if output == "json":
-            console.print(json.dumps([u.to_dict() for u in users.results], indent=2))
-        else:
-            table = Table(title=f"Users with role {role_id}")
-            table.add_column("ID", style="cyan")
-            table.add_column("Username", style="magenta")
-            table.add_column("Email", style="green")
-            for user in users.results:
-                table.add_row(str(user.pk), user.username, user.email)
-            console.print(table)
+        role_id = resolve(client, "role", role_id)
+        users = paginate(core_api.core_roles_users_list, page_size=page_size, limit=limit, concurrency=concurrency, role_uuid=role_id)
+        print_items(console, users, output, f"Users with role {role_id}", [
+            ("ID", "cyan", lambda u: str(u.pk)),
+            ("Username", "magenta", lambda u: u.username),
+            ("Email", "green", lambda u: u.email),
+        ])
     except ApiException as e:
         console.print(f"[bold red]Error listing users with role: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @role_app.command("list-groups")
 def list_role_groups(
-    role_id: str = typer.Argument(..., help="The ID or UUID of the role."),
-    output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")
+    role_id: str = typer.Argument(..., help="The UUID or name of the role."),
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
 ):
     """List groups with a role."""
     client = get_client()
     core_api = api.CoreApi(client)
     try:
-        groups = core_api.core_roles_groups_list(role_uuid=role_id)
-        if output == "json":
-            console.print(json.dumps([g.to_dict() for g in groups.results], indent=2))
-        else:
-            table = Table(title=f"Groups with role {role_id}")
-            table.add_column("ID", style="cyan")
-            table.add_column("Name", style="magenta")
-            for group in groups.results:
-                table.add_row(group.pk, group.name)
-            console.print(table)
+        role_id = resolve(client, "role", role_id)
+        groups = paginate(core_api.core_roles_groups_list, page_size=page_size, limit=limit, concurrency=concurrency, role_uuid=role_id)
+        print_items(console, groups, output, f"Groups with role {role_id}", [
+            ("ID", "cyan", lambda g: g.pk),
+            ("Name", "magenta", lambda g: g.name),
+        ])
     except ApiException as e:
         console.print(f"[bold red]Error listing groups with role: {e.body}[/bold red]")
-
-app.add_typer(role_app, name="role")
+        raise typer.Exit(1)
@@ -0,0 +1,127 @@
+import os
+import shlex
+
+import typer
+from rich.console import Console
+from rich.markup import escape
+
+from .main import app
+
+shell_app = typer.Typer()
+console = Console()
+
+HISTORY_PATH = os.path.expanduser("~/.akc_history")
+HISTORY_LENGTH = 1000
+EXIT_WORDS = ("exit", "quit")
+
+
+def completions(root, words, prefix):
+    """
+    Return the completions of ``prefix`` after the already typed ``words``.
+
+    Subcommand names are completed while the words name a group, and the
+    options of the command once they name a command.
+    """
+    command = root
+    for word in words:
+        if not hasattr(command, "list_commands") or word.startswith("-"):
+            break
+        subcommand = command.get_command(typer.Context(command), word)
+        if subcommand is None:
+            break
+        command = subcommand
+    if hasattr(command, "list_commands"):
+        names = list(command.list_commands(typer.Context(command)))
+    else:
+        names = [opt for param in command.params for opt in (*param.opts, *param.secondary_opts) if opt.startswith("-")]
+        names.append("--help")
+    return sorted(name for name in names if name.startswith(prefix))
+
+
+def _setup_readline(root):
+    """Enable history and tab completion when readline is available."""
+    try:
+        import readline
+    except ImportError:
+        return None
+
+    def complete(text, state):
+        line = readline.get_line_buffer()[: readline.get_endidx()]
+        try:
+            words = shlex.split(line)
+        except ValueError:
+            return None
+        if text and words:
+            words = words[:-1]
+        matches = completions(root, words, text)
+        return matches[state] + " " if state < len(matches) else None
+
+    readline.set_completer(complete)
+    readline.set_completer_delims(" \t")
+    readline.parse_and_bind("tab: complete")
+    try:
+        readline.read_history_file(HISTORY_PATH)
+    except OSError:
+        pass
+    readline.set_history_length(HISTORY_LENGTH)
+    return readline
+
+
+def run_line(root, line):
+    """
+    Run one shell line through the command tree and return its exit code.
+
+    Errors a command does not handle itself, such as a dropped connection,
+    are printed and give exit code 1, so the session goes on.
+    """
+    try:
+        args = shlex.split(line)
+    except ValueError as e:
+        console.print(f"[bold red]Error: {e}[/bold red]")
+        return 2
+    if not args:
+        return 0
+    if args[0] == "help":
+        args = [*args[1:], "--help"]
+    if args[0] == "shell":
+        console.print("[bold yellow]Already in the akc shell.[/bold yellow]")
+        return 0
+    try:
+        root.main(args=args, prog_name="akc")
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception as e:  # noqa: BLE001
+        console.print(f"[bold red]Error: {escape(str(e))}[/bold red]")
+        return 1
+    return 0
+
+
+@shell_app.command()
+def shell():
+    """
+    Start an interactive shell that runs akc commands in one process.
+    """
+    # One command tree for the whole session: subcommand modules stay
+    # imported, and the shared API client keeps its pooled connections.
+    root = typer.main.get_command(app)
+    readline = _setup_readline(root)
+    console.print("akc shell. Type 'help' for commands, 'exit' or Ctrl-D to leave.")
+    try:
+        while True:
+            try:
+                line = input("akc> ")
+            except KeyboardInterrupt:
+                console.print()
+                continue
+            except EOFError:
+                console.print()
+                break
+            if line.strip() in EXIT_WORDS:
+                break
+            run_line(root, line)
+    finally:
+        if readline is not None:
+            try:
+                readline.write_history_file(HISTORY_PATH)
+            except OSError:
+                pass
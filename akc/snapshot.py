@@ -0,0 +1,447 @@
+import collections
+import datetime
+import glob
+import gzip
+import hashlib
+import heapq
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+import uuid
+
+import typer
+from authentik_client import api
+from authentik_client.exceptions import ApiException
+from rich.console import Console
+
+from .bulk import describe_error
+from .concurrency import ordered_map
+from .flow import export_blueprint
+from .main import get_client
+from .pagination import PAGE_SIZE_OPTION, paginate
+
+snapshot_app = typer.Typer()
+console = Console()
+
+OUT_OPTION = typer.Option(..., "--out", file_okay=False, help="Snapshot directory. Created if missing.")
+
+MANIFEST_FILE = "manifest.json"
+INDEX_FILE = "index.sqlite"
+SNAPSHOT_VERSION = 1
+EXTENSION = ".ndjson.gz"
+
+# Delta segments are folded back into the base file rather than reaching
+# this many, or once they hold more lines than this share of the base file.
+MAX_SEGMENTS = 30
+COMPACT_RATIO = 0.5
+# Changes fetched by modification time reach back this many seconds before
+# the previous run, so clock skew with the server cannot skip any.
+SYNC_OVERLAP = 300
+
+# Every resource type a snapshot contains, in manifest order. Types marked
+# ``incremental`` can be listed by modification time.
+Resource = collections.namedtuple("Resource", ["api", "list_method", "incremental"])
+
+RESOURCES = {
+    "users": Resource("CoreApi", "core_users_list", True),
+    "groups": Resource("CoreApi", "core_groups_list", False),
+    "roles": Resource("RbacApi", "rbac_roles_list", False),
+    "applications": Resource("CoreApi", "core_applications_list", False),
+    "providers": Resource("ProvidersApi", "providers_all_list", False),
+    "flows": Resource("FlowsApi", "flows_instances_list", False),
+    "stages": Resource("StagesApi", "stages_all_list", False),
+    "policies": Resource("PoliciesApi", "policies_all_list", False),
+    "policy_bindings": Resource("PoliciesApi", "policies_bindings_list", False),
+    "property_mappings": Resource("PropertymappingsApi", "propertymappings_all_list", False),
+    "sources": Resource("SourcesApi", "sources_all_list", False),
+    "outposts": Resource("OutpostsApi", "outposts_instances_list", False),
+}
+
+# Hash changes of one resource type, applied to the index once a run is published.
+IndexUpdate = collections.namedtuple("IndexUpdate", ["resource", "hashes", "deleted", "replace", "synced"])
+
+
+def record_line(record):
+    """Serialize ``record`` canonically, so that equal records always give equal lines."""
+    return json.dumps(record, default=str, sort_keys=True, separators=(",", ":"))
+
+
+def record_hash(line):
+    return hashlib.sha256(line.encode("utf-8")).digest()
+
+
+def _list_method(client, name):
+    spec = RESOURCES[name]
+    api_instance = getattr(api, spec.api)(client)
+    return api_instance, getattr(api_instance, spec.list_method)
+
+
+def _with_blueprint(flows_api, flow):
+    """Return the record of ``flow`` with its exported blueprint under ``blueprint``."""
+    record = flow.to_dict()
+    record["blueprint"] = export_blueprint(flows_api, flow.slug)
+    return record
+
+
+def fetch(client, name, page_size=100, concurrency=1, **params):
+    """
+    Return the records of resource ``name`` as ``(key, line)`` pairs sorted by key.
+
+    The key is the primary key as a string. Records are serialized as they
+    arrive, so only their compact lines are held until they are sorted.
+    Extra keyword arguments are passed to the list call as query parameters.
+    """
+    api_instance, list_method = _list_method(client, name)
+    objects = paginate(list_method, page_size=page_size, concurrency=concurrency, **params)
+    if name == "flows":
+        records = ordered_map(lambda flow: _with_blueprint(api_instance, flow), objects, concurrency)
+    else:
+        records = (obj.to_dict() for obj in objects)
+    return sorted((str(record["pk"]), record_line(record)) for record in records)
+
+
+def _total(client, name):
+    """Return how many records of ``name`` the server holds, from a one-result page."""
+    _, list_method = _list_method(client, name)
+    return list_method(page=1, page_size=1).pagination.count
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+def read_lines(directory, entry):
+    """Yield the lines of one file of a snapshot."""
+    with gzip.open(os.path.join(directory, entry["file"]), "rt", encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
+def _base_records(directory, entry):
+    for line in read_lines(directory, entry):
+        yield str(json.loads(line)["pk"]), 0, line
+
+
+def _segment_records(directory, segment, priority):
+    for line in read_lines(directory, segment):
+        change = json.loads(line)
+        record = change.get("record")
+        yield change["key"], -priority, None if record is None else record_line(record)
+
+
+def _merge(streams):
+    """
+    Merge key-sorted ``(key, -priority, line)`` streams into ``(key, line)`` pairs.
+
+    For keys present in several streams the highest priority wins, and a
+    line of None marks the record as deleted.
+    """
+    last = None
+    for key, _, line in heapq.merge(*streams):
+        if key == last:
+            continue
+        last = key
+        if line is not None:
+            yield key, line
+
+
+def read_records(directory, entry, delta=None):
+    """
+    Yield the current ``(key, line)`` pairs of one resource type in key order.
+
+    The base file and its delta segments are merged in one streaming pass,
+    newer segments overriding older ones. ``delta`` is an optional extra,
+    newest segment as sorted ``(key, -priority, line)`` tuples.
+    """
+    segments = entry.get("segments", [])
+    streams = [_base_records(directory, entry)]
+    streams += [_segment_records(directory, segment, i + 1) for i, segment in enumerate(segments)]
+    if delta is not None:
+        streams.append(delta)
+    return _merge(streams)
+
+
+def _tmp_path(directory, file_name):
+    return os.path.join(directory, f".{file_name}.tmp")
+
+
+def clean_incomplete(directory):
+    """Remove temporary files left behind by an interrupted snapshot."""
+    for path in glob.glob(os.path.join(directory, ".*.tmp")):
+        os.remove(path)
+
+
+def write_file(directory, file_name, lines):
+    """
+    Write ``lines`` to a hidden temporary file and return its manifest entry.
+
+    The gzip header carries no name or timestamp, so unchanged data always
+    compresses to identical bytes. ``sha256`` covers the uncompressed lines.
+    """
+    digest = hashlib.sha256()
+    count = 0
+    with open(_tmp_path(directory, file_name), "wb") as raw, gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as f:
+        for line in lines:
+            data = (line + "\n").encode("utf-8")
+            digest.update(data)
+            f.write(data)
+            count += 1
+    return {"file": file_name, "count": count, "sha256": digest.hexdigest()}
+
+
+def write_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST_FILE)
+    tmp_path = _tmp_path(directory, MANIFEST_FILE)
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class HashIndex:
+    """
+    Content hash of every record of a snapshot, kept in ``index.sqlite`` inside it.
+
+    Incremental runs compare fetched records against it instead of reading
+    the snapshot files back. It also records when each resource type was
+    last fetched.
+    """
+
+    def __init__(self, directory):
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(os.path.join(directory, INDEX_FILE), check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                "resource TEXT NOT NULL, key TEXT NOT NULL, hash BLOB NOT NULL, "
+                "PRIMARY KEY (resource, key)) WITHOUT ROWID"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS syncs (resource TEXT PRIMARY KEY, synced REAL NOT NULL)"
+            )
+
+    def hashes(self, resource):
+        """Return ``{key: hash}`` for every indexed record of ``resource``."""
+        with self._lock:
+            return dict(self.connection.execute("SELECT key, hash FROM records WHERE resource = ?", (resource,)))
+
+    def synced(self, resource):
+        with self._lock:
+            row = self.connection.execute("SELECT synced FROM syncs WHERE resource = ?", (resource,)).fetchone()
+        return row[0] if row else None
+
+    def update(self, updates):
+        """Apply the ``IndexUpdate`` of every resource type of a run in one transaction."""
+        with self._lock, self.connection:
+            for update in updates:
+                if update.replace:
+                    self.connection.execute("DELETE FROM records WHERE resource = ?", (update.resource,))
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO records (resource, key, hash) VALUES (?, ?, ?)",
+                    [(update.resource, key, digest) for key, digest in update.hashes],
+                )
+                self.connection.executemany(
+                    "DELETE FROM records WHERE resource = ? AND key = ?",
+                    [(update.resource, key) for key in update.deleted],
+                )
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO syncs (resource, synced) VALUES (?, ?)", (update.resource, update.synced)
+                )
+
+    def close(self):
+        self.connection.close()
+
+
+def _full(client, directory, name, started, page_size, concurrency):
+    """Fetch every record of ``name`` into a new base file."""
+    lines = fetch(client, name, page_size, concurrency)
+    entry = write_file(directory, name + EXTENSION, (line for _, line in lines))
+    update = IndexUpdate(name, [(key, record_hash(line)) for key, line in lines], [], True, started)
+    return entry, update
+
+
+def _differing(lines, known):
+    hashed = ((key, line, record_hash(line)) for key, line in lines)
+    return [(key, line, digest) for key, line, digest in hashed if known.get(key) != digest]
+
+
+def _changes(client, name, known, since, page_size, concurrency):
+    """
+    Return the ``(key, line, hash)`` of records of ``name`` that differ from ``known``, and the deleted keys.
+
+    Types listed by modification time only fetch records updated ``since``.
+    A record count that does not add up then means records were deleted,
+    and a full sweep finds them.
+    """
+    if RESOURCES[name].incremental and since is not None:
+        updated_since = datetime.datetime.fromtimestamp(since - SYNC_OVERLAP, datetime.UTC)
+        lines = fetch(client, name, page_size, concurrency, last_updated__gt=updated_since, ordering="last_updated")
+        added = sum(key not in known for key, _ in lines)
+        if _total(client, name) == len(known) + added:
+            return _differing(lines, known), []
+    lines = fetch(client, name, page_size, concurrency)
+    return _differing(lines, known), sorted(set(known).difference(key for key, _ in lines))
+
+
+def _incremental(client, directory, name, entry, index, run_id, started, page_size, concurrency, compact):
+    """
+    Write only the records of ``name`` changed since the previous run.
+
+    Changes go to a new delta segment, or, once compaction is due, are
+    merged with the base file and its segments into a new base file.
+    """
+    known = index.hashes(name)
+    changed, deleted = _changes(client, name, known, index.synced(name), page_size, concurrency)
+    update = IndexUpdate(name, [(key, digest) for key, _, digest in changed], deleted, False, started)
+    entry = dict(entry, changed=len(changed), deleted=len(deleted))
+    segments = entry.get("segments", [])
+    if not changed and not deleted and not (compact and segments):
+        return entry, update
+
+    entry["count"] = len(known) + sum(key not in known for key, _, _ in changed) - len(deleted)
+    delta = sorted(
+        [(key, -(len(segments) + 1), line) for key, line, _ in changed]
+        + [(key, -(len(segments) + 1), None) for key in deleted]
+    )
+    pending = sum(segment["count"] for segment in segments) + len(delta)
+    if compact or len(segments) + 1 >= MAX_SEGMENTS or pending > COMPACT_RATIO * entry["count"]:
+        merged = read_records(directory, entry, iter(delta))
+        base = write_file(directory, f"{name}.{run_id}{EXTENSION}", (line for _, line in merged))
+        entry.update(base, segments=[])
+        return entry, update
+
+    lines = (
+        json.dumps({"key": key, "deleted": True}) if line is None else f'{{"key":{json.dumps(key)},"record":{line}}}'
+        for key, _, line in delta
+    )
+    segment = write_file(directory, f"{name}.{run_id}.delta{EXTENSION}", lines)
+    segment["created"] = run_id
+    entry["segments"] = segments + [segment]
+    return entry, update
+
+
+def _files(entry):
+    return [entry["file"]] + [segment["file"] for segment in entry.get("segments", [])]
+
+
+def _load_previous(directory):
+    """Return the manifest and hash index of an existing snapshot, or ``(None, None)``."""
+    if not os.path.exists(os.path.join(directory, MANIFEST_FILE)) or not os.path.exists(os.path.join(directory, INDEX_FILE)):
+        return None, None
+    return read_manifest(directory), HashIndex(directory)
+
+
+def take_snapshot(client, directory, page_size=100, concurrency=4, incremental=False, compact=False):
+    """
+    Fetch every resource type into ``directory`` and return the manifest.
+
+    Up to ``concurrency`` resource types are fetched at once, each with up
+    to ``concurrency`` pages in flight. With ``incremental`` and an existing
+    snapshot, only changed and deleted records are written.
+
+    New files are only renamed into place once every type has been fetched,
+    and the manifest is replaced last, so a failed run leaves the previous
+    snapshot intact. The hash index is updated after the manifest, so a
+    crash in between makes the next run write the same changes again.
+
+    A resource type that cannot be fetched does not stop the others. Its
+    error is listed under ``errors`` in the manifest, and the data of the
+    previous snapshot, if any, is kept for it.
+    """
+    os.makedirs(directory, exist_ok=True)
+    clean_incomplete(directory)
+    previous, index = _load_previous(directory)
+    if index is None:
+        index = HashIndex(directory)
+    kept = (previous or {}).get("resources", {})
+    if not incremental:
+        previous = None
+    run_id = datetime.datetime.now(datetime.UTC).strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:8]
+    started = time.time()
+
+    def job(name):
+        job_started = time.monotonic()
+        entry = (previous or {}).get("resources", {}).get(name)
+        try:
+            if entry is None:
+                entry, update = _full(client, directory, name, started, page_size, concurrency)
+            else:
+                entry, update = _incremental(client, directory, name, entry, index, run_id, started, page_size, concurrency, compact)
+        except Exception as e:  # noqa: BLE001
+            return name, None, describe_error(e)
+        entry["duration_ms"] = round((time.monotonic() - job_started) * 1000)
+        return name, entry, update
+
+    try:
+        try:
+            results = list(ordered_map(job, RESOURCES, concurrency))
+        except BaseException:
+            clean_incomplete(directory)
+            raise
+        resources = {}
+        errors = {}
+        for name, entry, update in results:
+            if entry is not None:
+                resources[name] = entry
+            else:
+                errors[name] = update
+                if name in kept:
+                    resources[name] = {field: value for field, value in kept[name].items() if field not in ("changed", "deleted")}
+        referenced = {file_name for entry in resources.values() for file_name in _files(entry)}
+        for file_name in referenced:
+            if os.path.exists(_tmp_path(directory, file_name)):
+                os.replace(_tmp_path(directory, file_name), os.path.join(directory, file_name))
+        clean_incomplete(directory)
+        manifest = {
+            "version": SNAPSHOT_VERSION,
+            "host": getattr(getattr(client, "configuration", None), "host", None),
+            "created": datetime.datetime.now(datetime.UTC).isoformat(),
+            "resources": resources,
+        }
+        if errors:
+            manifest["errors"] = errors
+        write_manifest(directory, manifest)
+        for path in glob.glob(os.path.join(directory, f"*{EXTENSION}")):
+            if os.path.basename(path) not in referenced:
+                os.remove(path)
+        index.update([update for _, entry, update in results if entry is not None])
+    finally:
+        index.close()
+    return manifest
+
+
+@snapshot_app.command()
+def snapshot(
+    out: pathlib.Path = OUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    concurrency: int = typer.Option(4, "--concurrency", min=1, help="Number of resource types, and of pages per type, to fetch at once."),
+    incremental: bool = typer.Option(False, "--incremental", help="Only write records changed since the previous snapshot in --out."),
+    compact: bool = typer.Option(False, "--compact", help="With --incremental, fold every delta segment back into the base files."),
+):
+    """
+    Export users, groups, roles, applications, providers, flows, stages, policies,
+    bindings, property mappings, sources and outposts to a snapshot directory.
+    """
+    client = get_client()
+    started = time.monotonic()
+    try:
+        manifest = take_snapshot(client, out, page_size, concurrency, incremental, compact)
+    except (ApiException, KeyboardInterrupt) as e:
+        message = e.body if isinstance(e, ApiException) else "interrupted"
+        console.print(f"[bold red]Error taking snapshot: {message}. No snapshot was written.[/bold red]")
+        raise typer.Exit(1)
+    entries = manifest["resources"].values()
+    total = sum(entry["count"] for entry in entries)
+    summary = f"{total} records of {len(manifest['resources'])} resource types"
+    if any("changed" in entry for entry in entries):
+        changed = sum(entry.get("changed", 0) for entry in entries)
+        deleted = sum(entry.get("deleted", 0) for entry in entries)
+        summary += f" ({changed} changed, {deleted} deleted)"
+    console.print(f"[bold green]Saved {summary} to {out} in {time.monotonic() - started:.1f}s.[/bold green]")
+    for name, message in manifest.get("errors", {}).items():
+        console.print(f"[bold red]Error fetching {name}: {message}[/bold red]")
+    if manifest.get("errors"):
+        raise typer.Exit(1)
@@ -1,44 +1,57 @@
-import json
+import pathlib
 
 import typer
-from rich.console import Console
-from rich.table import Table
-
 from authentik_client import api
 from authentik_client.exceptions import ApiException
+from rich.console import Console
 
-from .main import get_client, app
+from .aio import FAN_OUT_OPTION, usage_rows
+from .cache import NO_CACHE_OPTION, REFRESH_OPTION, cached, invalidate
+from .main import get_client
+from .output import OUTPUT_FILE_OPTION, OUTPUT_OPTION, USAGE_COLUMNS, print_items
+from .pagination import CONCURRENCY_OPTION, LIMIT_OPTION, PAGE_SIZE_OPTION, paginate
+from .query import (
+    FIELDS_OPTION,
+    FILTER_OPTION,
+    ORDERING_OPTION,
+    SEARCH_OPTION,
+    query_params,
+)
 
 source_app = typer.Typer()
 console = Console()
 
 @source_app.command("list")
-def list_sources(output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")):
+def list_sources(
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    filters: list[str] = FILTER_OPTION,
+    search: str = SEARCH_OPTION,
+    ordering: str = ORDERING_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
     """
     List all sources.
     """
     client = get_client()
     sources_api = api.SourcesApi(client)
+    params = query_params(sources_api.sources_all_list, filters, search, ordering)
     try:
-        sources = sources_api.sources_all_list()
-        if output == "json":
-            console.print(json.dumps([s.to_dict() for s in sources.results], indent=2))
-        else:
-            table = Table(title="Sources")
-            table.add_column("UUID", style="cyan")
-            table.add_column("Name", style="magenta")
-            table.add_column("Slug", style="green")
-            table.add_column("Enabled", style="yellow")
-            for source in sources.results:
-                table.add_row(
-                    source.pk,
-                    source.name,
-                    source.slug,
-                    str(source.enabled)
-                )
-            console.print(table)
+        sources = paginate(cached(sources_api.sources_all_list, "sources", no_cache, refresh), page_size=page_size, limit=limit, concurrency=concurrency, **params)
+        print_items(console, sources, output, "Sources", [
+            ("UUID", "cyan", lambda s: s.pk),
+            ("Name", "magenta", lambda s: s.name),
+            ("Slug", "green", lambda s: s.slug),
+            ("Enabled", "yellow", lambda s: str(s.enabled)),
+        ], fields, output_file)
     except ApiException as e:
         console.print(f"[bold red]Error listing sources: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @source_app.command("get")
 def get_source(slug: str = typer.Argument(..., help="The slug of the source to get.")):
@@ -52,6 +65,7 @@ def get_source(slug: str = typer.Argument(..., help="The slug of the source to g
         console.print(source.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error getting source: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @source_app.command("delete")
 def delete_source(slug: str = typer.Argument(..., help="The slug of the source to delete.")):
@@ -62,9 +76,11 @@ def delete_source(slug: str = typer.Argument(..., help="The slug of the source t
     sources_api = api.SourcesApi(client)
     try:
         sources_api.sources_all_destroy(slug=slug)
+        invalidate("sources")
         console.print(f"[bold green]Source '{slug}' deleted successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error deleting source: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @source_app.command("list-types")
 def list_source_types():
@@ -76,6 +92,7 @@ def list_source_types():
         console.print([t.to_dict() for t in types])
     except ApiException as e:
         console.print(f"[bold red]Error listing source types: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @source_app.command("use")
 def get_source_use(slug: str = typer.Argument(..., help="The slug of the source to check.")):
@@ -87,5 +104,24 @@ def get_source_use(slug: str = typer.Argument(..., help="The slug of the source
         console.print([item.to_dict() for item in used_by])
     except ApiException as e:
         console.print(f"[bold red]Error getting source usage: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
-app.add_typer(source_app, name="source")
+@source_app.command("use-all")
+def get_all_source_use(
+    output: str = OUTPUT_OPTION,
+    concurrency: int = FAN_OUT_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
+    """Check which objects are using each source, fetching usage concurrently."""
+    client = get_client()
+    sources_api = api.SourcesApi(client)
+    try:
+        sources = list(paginate(sources_api.sources_all_list))
+    except ApiException as e:
+        console.print(f"[bold red]Error listing sources: {e.body}[/bold red]")
+        raise typer.Exit(1)
+    rows, failed = usage_rows(sources, lambda slug: sources_api.sources_all_used_by_list(slug=slug), concurrency, key=lambda s: s.slug)
+    print_items(console, rows, output, "Source Usage", USAGE_COLUMNS, fields, output_file)
+    if failed:
+        raise typer.Exit(1)
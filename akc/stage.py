@@ -1,68 +1,89 @@
-import json
+import pathlib
 
 import typer
-from rich.console import Console
-from rich.table import Table
-
 from authentik_client import api
 from authentik_client.exceptions import ApiException
+from rich.console import Console
 
-from .main import get_client, app
+from .aio import FAN_OUT_OPTION, usage_rows
+from .cache import NO_CACHE_OPTION, REFRESH_OPTION, cached, invalidate
+from .main import get_client
+from .output import OUTPUT_FILE_OPTION, OUTPUT_OPTION, USAGE_COLUMNS, print_items
+from .pagination import CONCURRENCY_OPTION, LIMIT_OPTION, PAGE_SIZE_OPTION, paginate
+from .query import (
+    FIELDS_OPTION,
+    FILTER_OPTION,
+    ORDERING_OPTION,
+    SEARCH_OPTION,
+    query_params,
+)
+from .resolve import forget, resolve
 
 stage_app = typer.Typer()
 console = Console()
 
 @stage_app.command("list")
-def list_stages(output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")):
+def list_stages(
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    filters: list[str] = FILTER_OPTION,
+    search: str = SEARCH_OPTION,
+    ordering: str = ORDERING_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
     """
     List all stages.
     """
     client = get_client()
     stages_api = api.StagesApi(client)
+    params = query_params(stages_api.stages_all_list, filters, search, ordering)
     try:
-        stages = stages_api.stages_all_list()
-        if output == "json":
-            console.print(json.dumps([s.to_dict() for s in stages.results], indent=2))
-        else:
-            table = Table(title="Stages")
-            table.add_column("UUID", style="cyan")
-            table.add_column("Name", style="magenta")
-            table.add_column("Component", style="green")
-            for stage in stages.results:
-                table.add_row(
-                    stage.pk,
-                    stage.name,
-                    stage.component
-                )
-            console.print(table)
+        stages = paginate(cached(stages_api.stages_all_list, "stages", no_cache, refresh), page_size=page_size, limit=limit, concurrency=concurrency, **params)
+        print_items(console, stages, output, "Stages", [
+            ("UUID", "cyan", lambda s: s.pk),
+            ("Name", "magenta", lambda s: s.name),
+            ("Component", "green", lambda s: s.component),
+        ], fields, output_file)
     except ApiException as e:
         console.print(f"[bold red]Error listing stages: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @stage_app.command("get")
-def get_stage(uuid: str = typer.Argument(..., help="The UUID of the stage to get.")):
+def get_stage(uuid: str = typer.Argument(..., help="The UUID or name of the stage to get.")):
     """
     Get a stage.
     """
     client = get_client()
     stages_api = api.StagesApi(client)
     try:
+        uuid = resolve(client, "stage", uuid)
         stage = stages_api.stages_all_retrieve(stage_uuid=uuid)
         console.print(stage.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error getting stage: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @stage_app.command("delete")
-def delete_stage(uuid: str = typer.Argument(..., help="The UUID of the stage to delete.")):
+def delete_stage(uuid: str = typer.Argument(..., help="The UUID or name of the stage to delete.")):
     """
     Delete a stage.
     """
     client = get_client()
     stages_api = api.StagesApi(client)
     try:
+        uuid = resolve(client, "stage", uuid)
         stages_api.stages_all_destroy(stage_uuid=uuid)
+        invalidate("stages")
+        forget(client, "stage", uuid)
         console.print(f"[bold green]Stage '{uuid}' deleted successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error deleting stage: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @stage_app.command("list-types")
 def list_stage_types():
@@ -74,16 +95,37 @@ def list_stage_types():
         console.print([t.to_dict() for t in types])
     except ApiException as e:
         console.print(f"[bold red]Error listing stage types: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @stage_app.command("use")
-def get_stage_use(uuid: str = typer.Argument(..., help="The UUID of the stage to check.")):
+def get_stage_use(uuid: str = typer.Argument(..., help="The UUID or name of the stage to check.")):
     """Check which objects are using a stage."""
     client = get_client()
     stages_api = api.StagesApi(client)
     try:
+        uuid = resolve(client, "stage", uuid)
         used_by = stages_api.stages_all_used_by_list(stage_uuid=uuid)
         console.print([item.to_dict() for item in used_by])
     except ApiException as e:
         console.print(f"[bold red]Error getting stage usage: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
-app.add_typer(stage_app, name="stage")
+@stage_app.command("use-all")
+def get_all_stage_use(
+    output: str = OUTPUT_OPTION,
+    concurrency: int = FAN_OUT_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
+    """Check which objects are using each stage, fetching usage concurrently."""
+    client = get_client()
+    stages_api = api.StagesApi(client)
+    try:
+        stages = list(paginate(stages_api.stages_all_list))
+    except ApiException as e:
+        console.print(f"[bold red]Error listing stages: {e.body}[/bold red]")
+        raise typer.Exit(1)
+    rows, failed = usage_rows(stages, lambda pk: stages_api.stages_all_used_by_list(stage_uuid=pk), concurrency)
+    print_items(console, rows, output, "Stage Usage", USAGE_COLUMNS, fields, output_file)
+    if failed:
+        raise typer.Exit(1)
@@ -0,0 +1,414 @@
+import enum
+import pathlib
+import uuid
+
+import typer
+import yaml
+from authentik_client import api
+from authentik_client.exceptions import ApiException
+from authentik_client.models import (
+    ApplicationRequest,
+    GroupRequest,
+    OAuth2ProviderRequest,
+    PatchedApplicationRequest,
+    PatchedGroupRequest,
+    PatchedOAuth2ProviderRequest,
+    PatchedPolicyBindingRequest,
+    PatchedProxyProviderRequest,
+    PatchedRoleRequest,
+    PolicyBindingRequest,
+    ProxyProviderRequest,
+    RoleRequest,
+)
+from rich.console import Console
+from rich.markup import escape
+
+from .bulk import process_rows
+from .cache import invalidate
+from .concurrency import ordered_map
+from .main import get_client
+from .pagination import paginate
+from .retry import call_with_retry
+from .yamlio import safe_load
+
+apply_app = typer.Typer()
+console = Console()
+
+STATE_FILE_ARGUMENT = typer.Argument(..., exists=True, dir_okay=False, help="YAML file describing the desired state.")
+
+# Resource kinds a state file may declare, with the field that identifies an
+# entry. Policy bindings are identified by their policy name and target slug.
+KEY_FIELDS = {
+    "groups": "name",
+    "roles": "name",
+    "providers": "name",
+    "applications": "slug",
+    "policy_bindings": ("policy", "target"),
+}
+
+# Kinds in dependency order: later phases may reference objects created by
+# earlier ones. Deletes run through the phases in reverse.
+PHASES = (("groups", "roles", "providers"), ("applications",), ("policy_bindings",))
+
+# Cache resources to drop after changing each kind.
+CACHE_RESOURCES = {
+    "groups": "groups",
+    "roles": "roles",
+    "providers": "providers",
+    "applications": "applications",
+    "policy_bindings": "policies",
+}
+
+PROVIDER_TYPES = ("oauth2", "proxy")
+FLOW_FIELDS = ("authentication_flow", "authorization_flow", "invalidation_flow")
+
+
+class StateError(Exception):
+    """Raised when a state file cannot be planned."""
+
+
+class Ref:
+    """A reference by name or slug to another object, resolved to its primary key when needed."""
+
+    def __init__(self, kind, key, attribute="pk"):
+        self.kind = kind
+        self.key = key
+        self.attribute = attribute
+
+    def resolve(self, index):
+        obj = index.get(self.kind, {}).get(self.key)
+        if obj is None:
+            return None
+        return getattr(obj, self.attribute, None) or obj.pk
+
+    def __str__(self):
+        return str(self.key)
+
+
+def _normalize(value):
+    """Reduce API model values to plain data so they compare equal to YAML values."""
+    if hasattr(value, "to_dict"):
+        value = value.to_dict()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    return value
+
+
+def _same(desired, current, index):
+    if isinstance(desired, Ref):
+        desired = desired.resolve(index)
+        if desired is None:
+            return False
+    return _normalize(desired) == _normalize(current)
+
+
+def _resolve_fields(fields, index):
+    resolved = {}
+    for field, value in fields.items():
+        if isinstance(value, Ref):
+            pk = value.resolve(index)
+            if pk is None:
+                raise LookupError(f"{value.kind[:-1].replace('_', ' ')} '{value.key}' not found.")
+            value = pk
+        resolved[field] = value
+    return resolved
+
+
+def load_state(path):
+    """Read a state file and return its entries grouped by kind."""
+    with open(path) as f:
+        state = safe_load(f) or {}
+    if not isinstance(state, dict):
+        raise StateError("The state file must be a mapping of resource kinds to lists.")
+    unknown = sorted(set(state) - set(KEY_FIELDS))
+    if unknown:
+        raise StateError(f"Unknown resource kinds: {', '.join(unknown)}.")
+    for kind, entries in state.items():
+        if not isinstance(entries or [], list):
+            raise StateError(f"'{kind}' must be a list.")
+    return {kind: state.get(kind) or [] for kind in KEY_FIELDS}
+
+
+def _desired(kind, entry):
+    """Split a state entry into its key, desired state, provider type and fields."""
+    fields = dict(entry)
+    state = fields.pop("state", "present")
+    if state not in ("present", "absent"):
+        raise StateError(f"{kind}: unknown state '{state}', expected 'present' or 'absent'.")
+    provider_type = None
+    if kind == "providers":
+        provider_type = fields.pop("type", "oauth2")
+        if provider_type not in PROVIDER_TYPES:
+            raise StateError(f"providers: unsupported type '{provider_type}', expected one of {', '.join(PROVIDER_TYPES)}.")
+        for field in FLOW_FIELDS:
+            if field in fields:
+                fields[field] = Ref("flows", fields[field])
+    elif kind == "applications" and "provider" in fields:
+        fields["provider"] = Ref("providers", fields["provider"])
+    elif kind == "policy_bindings":
+        if "policy" not in fields or "target" not in fields:
+            raise StateError("policy_bindings: every entry needs a 'policy' and a 'target'.")
+        key = (fields["policy"], fields["target"])
+        fields["policy"] = Ref("policies", fields["policy"])
+        fields["target"] = Ref("applications", fields["target"], attribute="pbm_uuid")
+        fields.setdefault("order", 0)
+        return key, state, provider_type, fields
+
+    key_field = KEY_FIELDS[kind]
+    if not fields.get(key_field):
+        raise StateError(f"{kind}: every entry needs a '{key_field}'.")
+    return fields[key_field], state, provider_type, fields
+
+
+def fetch_current(client, state):
+    """
+    Fetch the objects a state file refers to with one paginated sweep per resource type.
+
+    Returns ``(index, provider_types)``. ``index`` maps each kind, plus the
+    read-only ``flows`` and ``policies``, to its objects keyed the way the
+    state file names them. ``provider_types`` maps provider names to their
+    type. Sweeps of different types run concurrently. Only the APIs of the
+    kinds the state file declares are used.
+    """
+    sweeps = {}
+    if state["groups"]:
+        sweeps["groups"] = api.CoreApi(client).core_groups_list
+    if state["roles"]:
+        sweeps["roles"] = api.RbacApi(client).rbac_roles_list
+    provider_types = {entry.get("type", "oauth2") for entry in state["providers"]}
+    if "oauth2" in provider_types:
+        sweeps["providers:oauth2"] = api.ProvidersApi(client).providers_oauth2_list
+    if "proxy" in provider_types:
+        sweeps["providers:proxy"] = api.ProvidersApi(client).providers_proxy_list
+    if state["applications"] or state["policy_bindings"]:
+        sweeps["applications"] = api.CoreApi(client).core_applications_list
+    if state["policy_bindings"]:
+        policies_api = api.PoliciesApi(client)
+        sweeps["policies"] = policies_api.policies_all_list
+        sweeps["policy_bindings"] = policies_api.policies_bindings_list
+    if any(field in entry for entry in state["providers"] for field in FLOW_FIELDS):
+        sweeps["flows"] = api.FlowsApi(client).flows_instances_list
+
+    results = ordered_map(lambda name: (name, list(paginate(sweeps[name]))), list(sweeps), len(sweeps))
+    fetched = dict(results)
+
+    index = {kind: {} for kind in (*KEY_FIELDS, "flows", "policies")}
+    types = {}
+    for kind in ("groups", "roles", "policies"):
+        index[kind] = {obj.name: obj for obj in fetched.get(kind, [])}
+    for provider_type in PROVIDER_TYPES:
+        for provider in fetched.get(f"providers:{provider_type}", []):
+            index["providers"][provider.name] = provider
+            types[provider.name] = provider_type
+    index["applications"] = {obj.slug: obj for obj in fetched.get("applications", [])}
+    index["flows"] = {obj.slug: obj for obj in fetched.get("flows", [])}
+
+    # Only bindings of a known policy to an application can be matched by name.
+    policy_names = {str(p.pk): p.name for p in index["policies"].values()}
+    app_slugs = {str(getattr(a, "pbm_uuid", None) or a.pk): a.slug for a in index["applications"].values()}
+    for binding in fetched.get("policy_bindings", []):
+        policy_name = policy_names.get(str(binding.policy))
+        app_slug = app_slugs.get(str(binding.target))
+        if policy_name and app_slug:
+            index["policy_bindings"][(policy_name, app_slug)] = binding
+    return index, types
+
+
+def plan_changes(state, index, provider_types):
+    """
+    Compute the creates, updates and deletes needed to reach ``state``.
+
+    Each change is a dict with ``kind``, ``action``, ``key``, ``fields``,
+    ``existing`` and ``type``. Updates carry only the fields that differ, and
+    entries that already match produce no change at all.
+    """
+    changes = []
+    for kind in KEY_FIELDS:
+        for entry in state[kind]:
+            key, desired_state, provider_type, fields = _desired(kind, entry)
+            existing = index[kind].get(key)
+            change = {"kind": kind, "key": key, "existing": existing, "type": provider_type}
+            if kind == "providers" and existing is not None and provider_types.get(key) != provider_type:
+                raise StateError(f"providers: '{key}' is a {provider_types.get(key)} provider and cannot become {provider_type}.")
+            if desired_state == "absent":
+                if existing is not None:
+                    changes.append({**change, "action": "delete", "fields": {}})
+            elif existing is None:
+                changes.append({**change, "action": "create", "fields": fields})
+            else:
+                if kind == "policy_bindings":
+                    fields = {f: v for f, v in fields.items() if f not in ("policy", "target")}
+                changed = {f: v for f, v in fields.items() if not _same(v, getattr(existing, f, None), index)}
+                if changed:
+                    changes.append({**change, "action": "update", "fields": changed})
+    return changes
+
+
+def _operations(client, kinds):
+    """Return the create, update and delete calls for each of ``kinds``, each taking a change."""
+    operations = {}
+    if "groups" in kinds:
+        core_api = api.CoreApi(client)
+        operations["groups"] = (
+            lambda c: core_api.core_groups_create(GroupRequest.from_dict(c["fields"])),
+            lambda c: core_api.core_groups_partial_update(
+                group_uuid=c["existing"].pk, patched_group_request=PatchedGroupRequest.from_dict(c["fields"])
+            ),
+            lambda c: core_api.core_groups_destroy(group_uuid=c["existing"].pk),
+        )
+    if "roles" in kinds:
+        rbac_api = api.RbacApi(client)
+        operations["roles"] = (
+            lambda c: rbac_api.rbac_roles_create(RoleRequest.from_dict(c["fields"])),
+            lambda c: rbac_api.rbac_roles_partial_update(
+                uuid=c["existing"].pk, patched_role_request=PatchedRoleRequest.from_dict(c["fields"])
+            ),
+            lambda c: rbac_api.rbac_roles_destroy(uuid=c["existing"].pk),
+        )
+    if "providers" in kinds:
+        providers_api = api.ProvidersApi(client)
+
+        def create_provider(change):
+            if change["type"] == "proxy":
+                return providers_api.providers_proxy_create(proxy_provider_request=ProxyProviderRequest.from_dict(change["fields"]))
+            return providers_api.providers_oauth2_create(o_auth2_provider_request=OAuth2ProviderRequest.from_dict(change["fields"]))
+
+        def update_provider(change):
+            if change["type"] == "proxy":
+                return providers_api.providers_proxy_partial_update(
+                    id=change["existing"].pk,
+                    patched_proxy_provider_request=PatchedProxyProviderRequest.from_dict(change["fields"]),
+                )
+            return providers_api.providers_oauth2_partial_update(
+                id=change["existing"].pk,
+                patched_o_auth2_provider_request=PatchedOAuth2ProviderRequest.from_dict(change["fields"]),
+            )
+
+        operations["providers"] = (
+            create_provider,
+            update_provider,
+            lambda c: providers_api.providers_all_destroy(id=c["existing"].pk),
+        )
+    if "applications" in kinds:
+        core_api = api.CoreApi(client)
+        operations["applications"] = (
+            lambda c: core_api.core_applications_create(ApplicationRequest.from_dict(c["fields"])),
+            lambda c: core_api.core_applications_partial_update(
+                slug=c["existing"].slug,
+                patched_application_request=PatchedApplicationRequest.from_dict(c["fields"]),
+            ),
+            lambda c: core_api.core_applications_destroy(slug=c["existing"].slug),
+        )
+    if "policy_bindings" in kinds:
+        policies_api = api.PoliciesApi(client)
+        operations["policy_bindings"] = (
+            lambda c: policies_api.policies_bindings_create(policy_binding_request=PolicyBindingRequest.from_dict(c["fields"])),
+            lambda c: policies_api.policies_bindings_partial_update(
+                policy_binding_uuid=c["existing"].pk,
+                patched_policy_binding_request=PatchedPolicyBindingRequest.from_dict(c["fields"]),
+            ),
+            lambda c: policies_api.policies_bindings_destroy(policy_binding_uuid=c["existing"].pk),
+        )
+    return operations
+
+
+def apply_changes(client, changes, index, concurrency):
+    """
+    Apply planned changes phase by phase, yielding one result per change.
+
+    Deletes run first, dependents before the objects they reference. Creates
+    and updates follow in dependency order. Changes within a phase are
+    independent and run on a bounded worker pool. Objects created in one
+    phase are added to ``index`` so later phases can reference them.
+    """
+    operations = _operations(client, {change["kind"] for change in changes})
+    actions = {"create": 0, "update": 1, "delete": 2}
+
+    def run(change):
+        call = operations[change["kind"]][actions[change["action"]]]
+        resolved = {**change, "fields": _resolve_fields(change["fields"], index)}
+        # A create that failed with a 500 may still have created the object.
+        result = call_with_retry(call, resolved, idempotent=change["action"] != "create")
+        if change["action"] == "create":
+            index[change["kind"]][change["key"]] = result
+        return {}
+
+    def label(change):
+        return {"kind": change["kind"], "key": change["key"], "action": change["action"]}
+
+    delete_phases = [[c for c in changes if c["kind"] in kinds and c["action"] == "delete"] for kinds in reversed(PHASES)]
+    upsert_phases = [[c for c in changes if c["kind"] in kinds and c["action"] != "delete"] for kinds in PHASES]
+    for phase in delete_phases + upsert_phases:
+        if phase:
+            yield from process_rows(run, phase, concurrency, label=label)
+
+
+def _describe(change):
+    key = change["key"]
+    name = f"{key[0]} -> {key[1]}" if isinstance(key, tuple) else key
+    kind = change["kind"][:-1].replace("_", " ")
+    if change["action"] == "create":
+        return f"[green]+ {kind} {escape(str(name))}[/green]"
+    if change["action"] == "delete":
+        return f"[red]- {kind} {escape(str(name))}[/red]"
+    existing = change["existing"]
+    diffs = ", ".join(
+        f"{field}: {_normalize(getattr(existing, field, None))!r} -> {value if isinstance(value, Ref) else _normalize(value)!r}"
+        for field, value in change["fields"].items()
+    )
+    return f"[yellow]~ {kind} {escape(str(name))}[/yellow] ({escape(diffs)})"
+
+
+@apply_app.command()
+def apply(
+    state_file: pathlib.Path = STATE_FILE_ARGUMENT,
+    plan: bool = typer.Option(False, "--plan", help="Show the changes without applying them."),
+    concurrency: int = typer.Option(4, "--concurrency", min=1, help="Number of independent changes to apply in parallel."),
+):
+    """
+    Reconcile groups, roles, providers, applications and policy bindings with a state file.
+    """
+    client = get_client()
+    try:
+        state = load_state(state_file)
+        index, provider_types = fetch_current(client, state)
+        changes = plan_changes(state, index, provider_types)
+    except (StateError, yaml.YAMLError) as e:
+        console.print(f"[bold red]Error reading state file: {escape(str(e))}[/bold red]")
+        raise typer.Exit(1)
+    except ApiException as e:
+        console.print(f"[bold red]Error fetching current state: {e.body}[/bold red]")
+        raise typer.Exit(1)
+
+    for change in changes:
+        console.print(_describe(change))
+    counts = {action: sum(c["action"] == action for c in changes) for action in ("create", "update", "delete")}
+    if plan or not changes:
+        console.print(
+            f"[bold yellow]Plan: {counts['create']} to create, {counts['update']} to update, "
+            f"{counts['delete']} to delete.[/bold yellow]"
+        )
+        return
+
+    failed = 0
+    touched = set()
+    for result in apply_changes(client, changes, index, concurrency):
+        if result["status"] == "ok":
+            touched.add(CACHE_RESOURCES[result["kind"]])
+        else:
+            failed += 1
+            console.print(f"[bold red]Error applying {result['action']} of {result['kind']} '{result['key']}': {result['error']}[/bold red]")
+    if touched:
+        invalidate(*sorted(touched))
+    console.print(
+        f"[bold green]Applied {len(changes) - failed} changes "
+        f"({counts['create']} create, {counts['update']} update, {counts['delete']} delete), {failed} failed.[/bold green]"
+    )
+    if failed:
+        raise typer.Exit(1)
@@ -0,0 +1,169 @@
+import collections
+import datetime
+import glob
+import gzip
+import itertools
+import json
+import os
+import re
+
+GROUP_FIELDS = ("action", "user", "app", "client_ip", "bucket")
+# Records are counted in batches of this size, the unit NumPy vectorizes over.
+BATCH_SIZE = 5000
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+EventRecord = collections.namedtuple("EventRecord", ["created", "action", "user", "app", "client_ip"])
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def parse_duration(text):
+    """Parse a duration such as ``90s``, ``5m``, ``1h`` or ``7d`` into seconds."""
+    match = re.fullmatch(r"\s*(\d+)\s*([smhdw])\s*", text or "")
+    if not match:
+        raise ValueError(f"Invalid duration '{text}', expected a number followed by s, m, h, d or w.")
+    seconds = int(match.group(1)) * DURATION_UNITS[match.group(2)]
+    if seconds <= 0:
+        raise ValueError(f"Duration '{text}' must be positive.")
+    return seconds
+
+
+def _utc(created):
+    if created.tzinfo is None:
+        return created.replace(tzinfo=datetime.UTC)
+    return created
+
+
+def event_records(events, since=None):
+    """
+    Turn a stream of API events, newest first, into records.
+
+    The stream is abandoned at the first event older than ``since``, so
+    no further pages are requested.
+    """
+    for event in events:
+        created = _utc(event.created)
+        if since is not None and created < since:
+            return
+        user = event.user or {}
+        yield EventRecord(created, event.action, user.get("username"), event.app, event.client_ip)
+
+
+def _record_from_dict(data):
+    created = data["created"]
+    if isinstance(created, str):
+        created = datetime.datetime.fromisoformat(created)
+    user = data.get("user") or {}
+    return EventRecord(_utc(created), data.get("action"), user.get("username"), data.get("app"), data.get("client_ip"))
+
+
+def _archive_file_dicts(path):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(columns=["data"]):
+            for data in batch.column(0).to_pylist():
+                yield json.loads(data)
+    else:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def archive_records(directory, since=None):
+    """
+    Stream records from an ``event archive`` directory, one file at a time.
+
+    Day partitions entirely before ``since`` are skipped without being read.
+    """
+    first_day = since.astimezone(datetime.UTC).date().isoformat() if since else None
+    for partition in sorted(glob.glob(os.path.join(directory, "date=*"))):
+        if first_day and os.path.basename(partition)[len("date="):] < first_day:
+            continue
+        for path in sorted(glob.glob(os.path.join(partition, "part-*"))):
+            for data in _archive_file_dicts(path):
+                record = _record_from_dict(data)
+                if since is None or record.created >= since:
+                    yield record
+
+
+class EventCounter:
+    """
+    Count records grouped by any of ``GROUP_FIELDS`` in one streaming pass.
+
+    Memory grows with the number of distinct groups, not with the number of
+    records. When NumPy is installed each batch is counted with vectorized
+    ``numpy.unique`` calls. Otherwise a ``collections.Counter`` is used.
+    """
+
+    def __init__(self, group_by, bucket_seconds=3600, use_numpy=None):
+        unknown = [field for field in group_by if field not in GROUP_FIELDS]
+        if unknown or not group_by:
+            raise ValueError(f"Cannot group by {', '.join(unknown) or 'nothing'}; choose from {', '.join(GROUP_FIELDS)}.")
+        self.group_by = list(group_by)
+        self.bucket_seconds = bucket_seconds
+        self.numpy = _numpy() if use_numpy is not False else None
+        self.counts = collections.Counter()
+        self.total = 0
+
+    def _columns(self, batch):
+        columns = []
+        for field in self.group_by:
+            if field == "bucket":
+                timestamps = [int(record.created.timestamp()) for record in batch]
+                if self.numpy is not None:
+                    stamps = self.numpy.asarray(timestamps, dtype=self.numpy.int64)
+                    columns.append(stamps - stamps % self.bucket_seconds)
+                else:
+                    columns.append([t - t % self.bucket_seconds for t in timestamps])
+            else:
+                columns.append([getattr(record, field) or "" for record in batch])
+        return columns
+
+    def _count_numpy(self, columns):
+        np = self.numpy
+        key = np.zeros(len(columns[0]), dtype=np.int64)
+        values = []
+        for column in columns:
+            uniques, inverse = np.unique(np.asarray(column), return_inverse=True)
+            key = key * len(uniques) + inverse.reshape(-1)
+            values.append(uniques)
+        keys, counts = np.unique(key, return_counts=True)
+        for code, count in zip(keys.tolist(), counts.tolist()):
+            group = []
+            for uniques in reversed(values):
+                code, index = divmod(code, len(uniques))
+                group.append(uniques[index].item())
+            self.counts[tuple(reversed(group))] += count
+
+    def add(self, records):
+        """Count every record of a stream, one batch at a time."""
+        records = iter(records)
+        while True:
+            batch = list(itertools.islice(records, BATCH_SIZE))
+            if not batch:
+                return
+            self.total += len(batch)
+            columns = self._columns(batch)
+            if self.numpy is not None:
+                self._count_numpy(columns)
+            else:
+                self.counts.update(zip(*columns))
+
+    def top(self, n):
+        """Return the ``n`` largest groups as dicts, with buckets as ISO timestamps."""
+        rows = []
+        for group, count in self.counts.most_common(n):
+            row = dict(zip(self.group_by, group))
+            if "bucket" in row:
+                row["bucket"] = datetime.datetime.fromtimestamp(row["bucket"], datetime.UTC).isoformat()
+            row["count"] = count
+            rows.append(row)
+        return rows
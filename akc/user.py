@@ -1,15 +1,39 @@
+import pathlib
+
 import typer
-from rich.console import Console
-from rich.table import Table
-import json
 from authentik_client import api
 from authentik_client.exceptions import ApiException
-from authentik_client.models import User, PatchedUserRequest, UserRequest, Role, Group, PasswordRequest
-from .main import get_client, app
+from authentik_client.models import (
+    Group,
+    PasswordRequest,
+    PatchedUserRequest,
+    Role,
+    User,
+    UserRequest,
+)
+from rich.console import Console
+
+from .bulk import Checkpoint, parse_bool, process_rows, read_rows
+from .cache import NO_CACHE_OPTION, REFRESH_OPTION, cached, invalidate
+from .main import get_client
+from .output import OUTPUT_FILE_OPTION, OUTPUT_OPTION, print_items
+from .pagination import CONCURRENCY_OPTION, LIMIT_OPTION, PAGE_SIZE_OPTION, paginate
+from .query import (
+    FIELDS_OPTION,
+    FILTER_OPTION,
+    ORDERING_OPTION,
+    SEARCH_OPTION,
+    query_params,
+)
+from .resolve import forget, reindex, resolve
+from .retry import call_with_retry
 
 user_app = typer.Typer()
 console = Console()
 
+IMPORT_FILE_ARGUMENT = typer.Argument(..., exists=True, dir_okay=False, help="CSV or JSON Lines file with one user per row.")
+IMPORT_LOG_OPTION = typer.Option(None, "--log-file", help="Where to write per-row results. Defaults to <file>.results.jsonl.")
+
 @user_app.command("create")
 def create_user(
     username: str,
@@ -32,39 +56,96 @@ def create_user(
     )
     try:
         new_user = core_api.core_users_create(user_request=user_request)
+        invalidate("users")
         console.print(f"[bold green]User '{new_user.username}' created successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error creating user: {e.body}[/bold red]")
+        raise typer.Exit(1)
+
+def _user_request(row):
+    """Build a UserRequest from one row of an import file."""
+    return UserRequest(
+        username=row["username"],
+        email=row.get("email") or None,
+        name=row.get("name") or row["username"],
+        path=row.get("path") or None,
+        attributes=row.get("attributes") if isinstance(row.get("attributes"), dict) else None,
+        is_active=parse_bool(row.get("is_active"), True),
+        is_superuser=parse_bool(row.get("is_superuser"), False),
+    )
+
+@user_app.command("import")
+def import_users(
+    file: pathlib.Path = IMPORT_FILE_ARGUMENT,
+    concurrency: int = typer.Option(4, "--concurrency", min=1, help="Number of users to create in parallel."),
+    log_file: pathlib.Path = IMPORT_LOG_OPTION,
+    resume: bool = typer.Option(True, "--resume/--restart", help="Continue after the last checkpointed row, or start over."),
+):
+    """
+    Create users in bulk from a CSV or JSON Lines file.
+
+    Each row needs a username and may set email, name, path, is_active,
+    is_superuser and (JSON Lines only) attributes. Progress is checkpointed
+    to <file>.checkpoint so an interrupted import can be resumed, and a
+    rerun tries the failed rows again.
+    """
+    client = get_client()
+    core_api = api.CoreApi(client)
+    checkpoint = Checkpoint(f"{file}.checkpoint")
+    if not resume:
+        checkpoint.clear()
+    log_path = log_file or pathlib.Path(f"{file}.results.jsonl")
+
+    def create(row):
+        # A create that failed with a 500 may still have created the user.
+        new_user = call_with_retry(core_api.core_users_create, idempotent=False, user_request=_user_request(row))
+        return {"pk": new_user.pk}
+
+    created = failed = 0
+    with open(log_path, "a" if resume else "w") as log:
+        rows = process_rows(create, read_rows(file), concurrency, checkpoint, log, label=lambda row: {"username": row.get("username")})
+        for result in rows:
+            if result["status"] == "ok":
+                created += 1
+            else:
+                failed += 1
+                console.print(f"[bold red]Row {result['row']} ({result['username']}): {result['error']}[/bold red]")
+    if created:
+        invalidate("users")
+    console.print(f"[bold green]{created} users created, {failed} failed. Results written to {log_path}.[/bold green]")
 
 @user_app.command("list")
-def list_users(output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")):
+def list_users(
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    refresh: bool = REFRESH_OPTION,
+    filters: list[str] = FILTER_OPTION,
+    search: str = SEARCH_OPTION,
+    ordering: str = ORDERING_OPTION,
+    fields: str = FIELDS_OPTION,
+    output_file: pathlib.Path = OUTPUT_FILE_OPTION,
+):
     """
     List all users.
     """
     client = get_client()
     core_api = api.CoreApi(client)
+    params = query_params(core_api.core_users_list, filters, search, ordering)
     try:
-        users = core_api.core_users_list()
-        if output == "json":
-            console.print(json.dumps([u.to_dict() for u in users.results], indent=2))
-        else:
-            table = Table(title="Users")
-            table.add_column("ID", style="cyan")
-            table.add_column("Username", style="magenta")
-            table.add_column("Email", style="green")
-            table.add_column("Active", style="yellow")
-            table.add_column("Superuser", style="blue")
-            for user in users.results:
-                table.add_row(
-                    str(user.pk),
-                    user.username,
-                    user.email,
-                    str(user.is_active),
-                    str(user.is_superuser),
-                )
-            console.print(table)
+        users = paginate(cached(core_api.core_users_list, "users", no_cache, refresh), page_size=page_size, limit=limit, concurrency=concurrency, **params)
+        print_items(console, users, output, "Users", [
+            ("ID", "cyan", lambda u: str(u.pk)),
+            ("Username", "magenta", lambda u: u.username),
+            ("Email", "green", lambda u: u.email),
+            ("Active", "yellow", lambda u: str(u.is_active)),
+            ("Superuser", "blue", lambda u: str(u.is_superuser)),
+        ], fields, output_file)
     except ApiException as e:
         console.print(f"[bold red]Error listing users: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @user_app.command("get")
 def get_user(user_id: str = typer.Argument(..., help="The ID or username of the user.")):
@@ -72,21 +153,15 @@ def get_user(user_id: str = typer.Argument(..., help="The ID or username of the
     client = get_client()
     core_api = api.CoreApi(client)
     try:
-        try:
-            user = core_api.core_users_retrieve(user_pk=int(user_id))
-            console.print(user.to_dict())
-        except ValueError:
-            users = core_api.core_users_list(username=user_id)
-            if users.results:
-                console.print(users.results[0].to_dict())
-            else:
-                console.print(f"[bold red]User '{user_id}' not found.[/bold red]")
+        user = core_api.core_users_retrieve(user_pk=resolve(client, "user", user_id))
+        console.print(user.to_dict())
     except ApiException as e:
         console.print(f"[bold red]Error getting user: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @user_app.command("update")
 def update_user(
-    user_id: int = typer.Argument(..., help="The ID of the user to update."),
+    user_id: str = typer.Argument(..., help="The ID or username of the user to update."),
     username: str = typer.Option(None, "--username", help="New username."),
     email: str = typer.Option(None, "--email", help="New email."),
     name: str = typer.Option(None, "--name", help="New name."),
@@ -99,6 +174,7 @@ def update_user(
     client = get_client()
     core_api = api.CoreApi(client)
     try:
+        user_id = resolve(client, "user", user_id)
         update_data = PatchedUserRequest()
         if username is not None:
             update_data.username = username
@@ -116,26 +192,33 @@ def update_user(
             return
 
         updated_user = core_api.core_users_partial_update(user_pk=user_id, patched_user_request=update_data)
+        invalidate("users")
+        reindex(client, "user", updated_user)
         console.print(f"[bold green]User '{updated_user.username}' (ID: {updated_user.pk}) updated successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error updating user: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @user_app.command("delete")
-def delete_user(user_id: int = typer.Argument(..., help="The ID of the user to delete.")):
+def delete_user(user_id: str = typer.Argument(..., help="The ID or username of the user to delete.")):
     """
     Delete a user.
     """
     client = get_client()
     core_api = api.CoreApi(client)
     try:
+        user_id = resolve(client, "user", user_id)
         core_api.core_users_destroy(user_pk=user_id)
+        invalidate("users")
+        forget(client, "user", user_id)
         console.print(f"[bold green]User with ID {user_id} deleted successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error deleting user: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @user_app.command("set-password")
 def set_password(
-    user_id: int = typer.Argument(..., help="The ID of the user."),
+    user_id: str = typer.Argument(..., help="The ID or username of the user."),
     password: str = typer.Argument(..., help="The new password."),
 ):
     """
@@ -144,54 +227,54 @@ def set_password(
     client = get_client()
     core_api = api.CoreApi(client)
     try:
+        user_id = resolve(client, "user", user_id)
         password_request = PasswordRequest(password=password)
         core_api.core_users_set_password_create(user_pk=user_id, password_request=password_request)
         console.print(f"[bold green]Password for user with ID {user_id} set successfully.[/bold green]")
     except ApiException as e:
         console.print(f"[bold red]Error setting password: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @user_app.command("list-roles")
 def list_user_roles(
-    user_id: int = typer.Argument(..., help="The ID of the user."),
-    output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")
+    user_id: str = typer.Argument(..., help="The ID or username of the user."),
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
 ):
     """List roles for a user."""
     client = get_client()
     core_api = api.CoreApi(client)
     try:
-        roles = core_api.core_users_roles_list(user_pk=user_id)
-        if output == "json":
-            console.print(json.dumps([r.to_dict() for r in roles.results], indent=2))
-        else:
-            table = Table(title=f"Roles for user {user_id}")
-            table.add_column("ID", style="cyan")
-            table.add_column("Name", style="magenta")
-            for role in roles.results:
-                table.add_row(role.pk, role.name)
-            console.print(table)
+        user_id = resolve(client, "user", user_id)
+        roles = paginate(core_api.core_users_roles_list, page_size=page_size, limit=limit, concurrency=concurrency, user_pk=user_id)
+        print_items(console, roles, output, f"Roles for user {user_id}", [
+            ("ID", "cyan", lambda r: r.pk),
+            ("Name", "magenta", lambda r: r.name),
+        ])
     except ApiException as e:
         console.print(f"[bold red]Error listing roles for user: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 @user_app.command("list-groups")
 def list_user_groups(
-    user_id: int = typer.Argument(..., help="The ID of the user."),
-    output: str = typer.Option("table", "--output", "-o", help="Output format (table or json)")
+    user_id: str = typer.Argument(..., help="The ID or username of the user."),
+    output: str = OUTPUT_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    limit: int = LIMIT_OPTION,
+    concurrency: int = CONCURRENCY_OPTION,
 ):
     """List groups for a user."""
     client = get_client()
     core_api = api.CoreApi(client)
     try:
-        groups = core_api.core_users_groups_list(user_pk=user_id)
-        if output == "json":
-            console.print(json.dumps([g.to_dict() for g in groups.results], indent=2))
-        else:
-            table = Table(title=f"Groups for user {user_id}")
-            table.add_column("ID", style="cyan")
-            table.add_column("Name", style="magenta")
-            for group in groups.results:
-                table.add_row(group.pk, group.name)
-            console.print(table)
+        user_id = resolve(client, "user", user_id)
+        groups = paginate(core_api.core_users_groups_list, page_size=page_size, limit=limit, concurrency=concurrency, user_pk=user_id)
+        print_items(console, groups, output, f"Groups for user {user_id}", [
+            ("ID", "cyan", lambda g: g.pk),
+            ("Name", "magenta", lambda g: g.name),
+        ])
     except ApiException as e:
         console.print(f"[bold red]Error listing groups for user: {e.body}[/bold red]")
-
-app.add_typer(user_app, name="user")
+        raise typer.Exit(1)
@@ -1,19 +1,27 @@
-import typer
-from rich.console import Console
+import pathlib
 
+import typer
 from authentik_client import api
 from authentik_client.exceptions import ApiException
-from authentik_client.models import PatchedUserRequest
+from authentik_client.models import PatchedUserRequest, UserAccountRequest
+from rich.console import Console
 
-from .main import get_client, app
+from .bulk import process_rows, read_names, unique
+from .cache import invalidate
+from .main import get_client
+from .pagination import paginate
+from .resolve import resolve
+from .retry import call_with_retry
 
 user_group_app = typer.Typer()
 console = Console()
 
+USERS_FILE_OPTION = typer.Option(..., "--users-file", exists=True, dir_okay=False, help="File with one user ID or username per line.")
+
 @user_group_app.command("add")
 def add_user_to_group(
     user_id: str = typer.Argument(..., help="The ID or username of the user."),
-    group_id: str = typer.Argument(..., help="The ID or name of the group."),
+    group_id: str = typer.Argument(..., help="The UUID or name of the group."),
 ):
     """
     Add a user to a group.
@@ -21,8 +29,8 @@ def add_user_to_group(
     client = get_client()
     core_api = api.CoreApi(client)
     try:
-        group = core_api.core_groups_retrieve(group_pk=group_id)
-        user = core_api.core_users_retrieve(user_pk=int(user_id))
+        group = core_api.core_groups_retrieve(group_pk=resolve(client, "group", group_id))
+        user = core_api.core_users_retrieve(user_pk=resolve(client, "user", user_id))
         user_groups = user.groups or []
 
         if group.pk in user_groups:
@@ -33,17 +41,19 @@ def add_user_to_group(
 
         update_request = PatchedUserRequest(groups=user_groups)
         core_api.core_users_partial_update(user_pk=user.pk, patched_user_request=update_request)
+        invalidate("users", "groups")
 
         console.print(f"[bold green]User '{user.username}' added to group '{group.name}' successfully.[/bold green]")
 
     except ApiException as e:
         console.print(f"[bold red]Error adding user to group: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 
 @user_group_app.command("remove")
 def remove_user_from_group(
     user_id: str = typer.Argument(..., help="The ID or username of the user."),
-    group_id: str = typer.Argument(..., help="The ID or name of the group."),
+    group_id: str = typer.Argument(..., help="The UUID or name of the group."),
 ):
     """
     Remove a user from a group.
@@ -51,8 +61,8 @@ def remove_user_from_group(
     client = get_client()
     core_api = api.CoreApi(client)
     try:
-        group = core_api.core_groups_retrieve(group_pk=group_id)
-        user = core_api.core_users_retrieve(user_pk=int(user_id))
+        group = core_api.core_groups_retrieve(group_pk=resolve(client, "group", group_id))
+        user = core_api.core_users_retrieve(user_pk=resolve(client, "user", user_id))
         user_groups = user.groups or []
 
         if group.pk not in user_groups:
@@ -63,11 +73,81 @@ def remove_user_from_group(
 
         update_request = PatchedUserRequest(groups=user_groups)
         core_api.core_users_partial_update(user_pk=user.pk, patched_user_request=update_request)
+        invalidate("users", "groups")
 
         console.print(f"[bold green]User '{user.username}' removed from group '{group.name}' successfully.[/bold green]")
 
     except ApiException as e:
         console.print(f"[bold red]Error removing user from group: {e.body}[/bold red]")
+        raise typer.Exit(1)
+
+
+def _change_memberships(group_id, users_file, concurrency, add):
+    """
+    Add or remove every user listed in ``users_file`` to or from one group.
+
+    The group is resolved once and its current members are fetched in a
+    single paginated sweep. Users whose membership already matches are then
+    skipped without a request. The rest are applied through the group's
+    add_user/remove_user actions on a bounded worker pool. Usernames that
+    are not members are resolved through the name index when adding.
+    """
+    client = get_client()
+    core_api = api.CoreApi(client)
+    try:
+        group = core_api.core_groups_retrieve(group_pk=resolve(client, "group", group_id))
+        member_pks = {}
+        for member in paginate(core_api.core_users_list, groups_by_pk=[group.pk]):
+            member_pks[str(member.pk)] = member.pk
+            member_pks[member.username] = member.pk
+    except ApiException as e:
+        console.print(f"[bold red]Error fetching group members: {e.body}[/bold red]")
+        raise typer.Exit(1)
+
+    action = core_api.core_groups_add_user_create if add else core_api.core_groups_remove_user_create
+
+    def apply(user):
+        if (user in member_pks) == add:
+            return {"action": "skipped"}
+        user_pk = member_pks[user] if user in member_pks else resolve(client, "user", user)
+        call_with_retry(action, group_uuid=group.pk, user_account_request=UserAccountRequest(pk=user_pk))
+        return {"action": "added" if add else "removed"}
+
+    counts = {"added": 0, "removed": 0, "skipped": 0, "failed": 0}
+    for result in process_rows(apply, unique(read_names(users_file)), concurrency, label=lambda user: {"user": user}):
+        if result["status"] == "ok":
+            counts[result["action"]] += 1
+        else:
+            counts["failed"] += 1
+            console.print(f"[bold red]Error for user '{result['user']}': {result['error']}[/bold red]")
+    if counts["added"] or counts["removed"]:
+        invalidate("users", "groups")
+    changed = counts["added"] if add else counts["removed"]
+    console.print(
+        f"[bold green]{changed} users {'added to' if add else 'removed from'} group '{group.name}', "
+        f"{counts['skipped']} skipped, {counts['failed']} failed.[/bold green]"
+    )
+
+
+@user_group_app.command("add-many")
+def add_users_to_group(
+    group_id: str = typer.Argument(..., help="The UUID or name of the group."),
+    users_file: pathlib.Path = USERS_FILE_OPTION,
+    concurrency: int = typer.Option(4, "--concurrency", min=1, help="Number of membership changes to apply in parallel."),
+):
+    """
+    Add many users to a group.
+    """
+    _change_memberships(group_id, users_file, concurrency, add=True)
 
 
-app.add_typer(user_group_app, name="user-group")
+@user_group_app.command("remove-many")
+def remove_users_from_group(
+    group_id: str = typer.Argument(..., help="The UUID or name of the group."),
+    users_file: pathlib.Path = USERS_FILE_OPTION,
+    concurrency: int = typer.Option(4, "--concurrency", min=1, help="Number of membership changes to apply in parallel."),
+):
+    """
+    Remove many users from a group.
+    """
+    _change_memberships(group_id, users_file, concurrency, add=False)
@@ -1,29 +1,38 @@
-import typer
-from rich.console import Console
+import pathlib
 
+import typer
 from authentik_client import api
 from authentik_client.exceptions import ApiException
 from authentik_client.models import PatchedUserRequest
+from rich.console import Console
 
-from .main import get_client, app
+from .bulk import process_rows, read_rows
+from .cache import invalidate
+from .main import get_client
+from .pagination import paginate
+from .resolve import resolve
+from .retry import call_with_retry
 
 user_role_app = typer.Typer()
 console = Console()
 
+MAPPING_FILE_OPTION = typer.Option(..., "--mapping-file", exists=True, dir_okay=False, help="CSV or JSON Lines file with username, role and optional state (present/absent) columns.")
+
 
 @user_role_app.command("add")
 def add_user_to_role(
     user_id: str = typer.Argument(..., help="The ID or username of the user."),
-    role_id: str = typer.Argument(..., help="The ID or name of the role."),
+    role_id: str = typer.Argument(..., help="The UUID or name of the role."),
 ):
     """
     Add a role to a user.
     """
     client = get_client()
     core_api = api.CoreApi(client)
+    rbac_api = api.RbacApi(client)
     try:
-        role = core_api.core_roles_retrieve(role_uuid=role_id)
-        user = core_api.core_users_retrieve(user_pk=int(user_id))
+        role = rbac_api.rbac_roles_retrieve(uuid=resolve(client, "role", role_id))
+        user = core_api.core_users_retrieve(id=resolve(client, "user", user_id))
         user_roles = user.roles or []
 
         if role.pk in user_roles:
@@ -33,27 +42,30 @@ def add_user_to_role(
         user_roles.append(role.pk)
 
         update_request = PatchedUserRequest(roles=user_roles)
-        core_api.core_users_partial_update(user_pk=user.pk, patched_user_request=update_request)
+        core_api.core_users_partial_update(id=user.pk, patched_user_request=update_request)
+        invalidate("users", "roles")
 
         console.print(f"[bold green]Role '{role.name}' added to user '{user.username}' successfully.[/bold green]")
 
     except ApiException as e:
         console.print(f"[bold red]Error adding role to user: {e.body}[/bold red]")
+        raise typer.Exit(1)
 
 
 @user_role_app.command("remove")
 def remove_user_from_role(
     user_id: str = typer.Argument(..., help="The ID or username of the user."),
-    role_id: str = typer.Argument(..., help="The ID or name of the role."),
+    role_id: str = typer.Argument(..., help="The UUID or name of the role."),
 ):
     """
     Remove a role from a user.
     """
     client = get_client()
     core_api = api.CoreApi(client)
+    rbac_api = api.RbacApi(client)
     try:
-        role = core_api.core_roles_retrieve(role_uuid=role_id)
-        user = core_api.core_users_retrieve(user_pk=int(user_id))
+        role = rbac_api.rbac_roles_retrieve(uuid=resolve(client, "role", role_id))
+        user = core_api.core_users_retrieve(id=resolve(client, "user", user_id))
         user_roles = user.roles or []
 
         if role.pk not in user_roles:
@@ -63,12 +75,105 @@ def remove_user_from_role(
         user_roles.remove(role.pk)
 
         update_request = PatchedUserRequest(roles=user_roles)
-        core_api.core_users_partial_update(user_pk=user.pk, patched_user_request=update_request)
+        core_api.core_users_partial_update(id=user.pk, patched_user_request=update_request)
+        invalidate("users", "roles")
 
         console.print(f"[bold green]Role '{role.name}' removed from user '{user.username}' successfully.[/bold green]")
 
     except ApiException as e:
         console.print(f"[bold red]Error removing role from user: {e.body}[/bold red]")
+        raise typer.Exit(1)
+
 
+def _plan_role_changes(rows, roles_by_name, users_by_name):
+    """
+    Compute the minimal set of role updates described by mapping ``rows``.
 
-app.add_typer(user_role_app, name="user-role")
+    Returns ``(changes, errors)``. ``changes`` maps each user that needs an
+    update to ``(user, roles)``, where ``roles`` is the user's full new role
+    list. ``errors`` lists rows that name an unknown user, role or state.
+    """
+    desired = {}
+    errors = []
+    for number, row in enumerate(rows, 1):
+        username = (row.get("username") or row.get("user") or "").strip()
+        role_name = (row.get("role") or "").strip()
+        state = (row.get("state") or "present").strip().lower()
+        user = users_by_name.get(username)
+        role = roles_by_name.get(role_name)
+        if user is None:
+            errors.append(f"Row {number}: user '{username}' not found.")
+        elif role is None:
+            errors.append(f"Row {number}: role '{role_name}' not found.")
+        elif state not in ("present", "absent"):
+            errors.append(f"Row {number}: unknown state '{state}', expected 'present' or 'absent'.")
+        else:
+            roles = desired.setdefault(user.pk, list(user.roles or []))
+            if state == "present" and role.pk not in roles:
+                roles.append(role.pk)
+            elif state == "absent" and role.pk in roles:
+                roles.remove(role.pk)
+
+    changes = {}
+    for user_pk, roles in desired.items():
+        user = users_by_name[str(user_pk)]
+        if set(roles) != set(user.roles or []):
+            changes[user_pk] = (user, roles)
+    return changes, errors
+
+
+@user_role_app.command("apply")
+def apply_role_mapping(
+    mapping_file: pathlib.Path = MAPPING_FILE_OPTION,
+    concurrency: int = typer.Option(4, "--concurrency", min=1, help="Number of users to update in parallel."),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Show the changes without applying them."),
+):
+    """
+    Grant and revoke roles for many users from a mapping file.
+    """
+    client = get_client()
+    core_api = api.CoreApi(client)
+    rbac_api = api.RbacApi(client)
+    try:
+        roles_by_name = {}
+        for role in paginate(rbac_api.rbac_roles_list):
+            roles_by_name[role.name] = role
+            roles_by_name[str(role.pk)] = role
+        users_by_name = {}
+        for user in paginate(core_api.core_users_list):
+            users_by_name[user.username] = user
+            users_by_name[str(user.pk)] = user
+    except ApiException as e:
+        console.print(f"[bold red]Error fetching users and roles: {e.body}[/bold red]")
+        raise typer.Exit(1)
+
+    changes, errors = _plan_role_changes(read_rows(mapping_file), roles_by_name, users_by_name)
+    for error in errors:
+        console.print(f"[bold red]{error}[/bold red]")
+
+    role_names = {role.pk: role.name for role in roles_by_name.values()}
+    if dry_run:
+        for user, roles in changes.values():
+            current = set(user.roles or [])
+            added = sorted(role_names.get(pk, str(pk)) for pk in set(roles) - current)
+            removed = sorted(role_names.get(pk, str(pk)) for pk in current - set(roles))
+            console.print(f"{user.username}: +{', '.join(added) or '-'} -{', '.join(removed) or '-'}")
+        console.print(f"[bold yellow]{len(changes)} users would be updated.[/bold yellow]")
+        return
+
+    def update(change):
+        user, roles = change
+        call_with_retry(
+            core_api.core_users_partial_update, id=user.pk, patched_user_request=PatchedUserRequest(roles=roles)
+        )
+
+    updated = failed = 0
+    for result in process_rows(update, changes.values(), concurrency, label=lambda change: {"user": change[0].username}):
+        if result["status"] == "ok":
+            updated += 1
+        else:
+            failed += 1
+            console.print(f"[bold red]Error updating user '{result['user']}': {result['error']}[/bold red]")
+    if updated:
+        invalidate("users", "roles")
+    console.print(f"[bold green]{updated} users updated, {failed} failed, {len(errors)} invalid rows.[/bold green]")
@@ -0,0 +1,26 @@
+import yaml
+
+# libyaml's C parser when PyYAML was built with it, the pure-Python parser
+# otherwise. Both accept the same documents and raise the same errors.
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+LIBYAML = SafeLoader is not yaml.SafeLoader
+
+
+def safe_load(stream):
+    """Parse the single YAML document in ``stream``, a string or an open file."""
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def safe_load_all(stream):
+    """
+    Lazily yield each YAML document in ``stream``, a string or an open file.
+
+    Files are read in chunks and every document is built only when it is
+    reached, so a long multi-document file is never parsed as a whole. An
+    invalid document raises ``yaml.YAMLError`` once it is reached.
+    """
+    return yaml.load_all(stream, Loader=SafeLoader)
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from akc.aio import fan_out, gather_bounded, usage_rows
+
+
+class TestGatherBounded(unittest.TestCase):
+    def test_limits_calls_in_flight_and_keeps_order(self):
+        running = []
+        peak = []
+
+        async def work(n):
+            running.append(n)
+            peak.append(len(running))
+            await asyncio.sleep(0.01 * (5 - n))
+            running.remove(n)
+            if n == 3:
+                raise ValueError("three")
+            return n * 10
+
+        results = asyncio.run(gather_bounded([lambda n=n: work(n) for n in range(5)], 2))
+
+        self.assertEqual(results[:3], [0, 10, 20])
+        self.assertIsInstance(results[3], ValueError)
+        self.assertEqual(results[4], 40)
+        self.assertLessEqual(max(peak), 2)
+
+
+class TestFanOut(unittest.TestCase):
+    def test_runs_blocking_calls_concurrently(self):
+        barrier = threading.Barrier(4, timeout=5)
+
+        def call(item):
+            # Only passes if all four calls are in flight at once.
+            barrier.wait()
+            return item.upper()
+
+        started = time.perf_counter()
+        results = fan_out(call, ["a", "b", "c", "d"], 4)
+
+        self.assertEqual(results, [("a", "A", None), ("b", "B", None), ("c", "C", None), ("d", "D", None)])
+        self.assertLess(time.perf_counter() - started, 5)
+
+    def test_errors_are_returned_per_item(self):
+        def call(item):
+            raise KeyError(item)
+
+        [(item, result, error)] = fan_out(call, ["x"], 2)
+
+        self.assertEqual(item, "x")
+        self.assertIsNone(result)
+        self.assertIsInstance(error, KeyError)
+        self.assertEqual(fan_out(call, [], 2), [])
+
+
+class TestUsageRows(unittest.TestCase):
+    def test_collects_usage_and_failures(self):
+        class Obj:
+            def __init__(self, pk, name):
+                self.pk, self.name = pk, name
+
+        class Used:
+            def to_dict(self):
+                return {"model_name": "application", "name": "portal"}
+
+        def used_by(pk):
+            if pk == 2:
+                raise RuntimeError("down")
+            return [Used()] if pk == 1 else []
+
+        rows, failed = usage_rows([Obj(1, "a"), Obj(2, "b"), Obj(3, "c")], used_by, 3)
+
+        self.assertEqual(failed, 1)
+        self.assertEqual([len(r["used_by"]) for r in rows], [1, 0, 0])
+        self.assertEqual(rows[1]["error"], "down")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from typer.testing import CliRunner
+
+from akc.main import app
+
+
+def retrieve(event_uuid):
+    event = MagicMock()
+    event.to_dict.return_value = {"pk": event_uuid}
+    return event
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner(env={"NO_COLOR": "1"})
+
+    def invoke(self, commands, *args):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "commands.txt")
+            with open(path, "w") as f:
+                f.write(commands)
+            result = self.runner.invoke(app, ["batch", path, *args])
+        return result, [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+
+    @patch("akc.event.EventsApi")
+    @patch("akc.event.get_client")
+    def test_reports_each_line_in_order(self, mock_get_client, MockEventsApi):
+        MockEventsApi.return_value.events_events_retrieve.side_effect = retrieve
+
+        result, report = self.invoke("# comment\nevent get e1\n\nevent get e2\n", "--parallel", "2")
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertEqual([(r["line"], r["command"], r["status"]) for r in report], [
+            (2, "event get e1", "ok"),
+            (4, "event get e2", "ok"),
+        ])
+        self.assertIn("'e1'", report[0]["output"])
+        self.assertNotIn("'e2'", report[0]["output"])
+        self.assertIn("'e2'", report[1]["output"])
+        mock_get_client.assert_called()
+
+    @patch("akc.event.EventsApi")
+    @patch("akc.event.get_client")
+    def test_failures_set_the_exit_code(self, mock_get_client, MockEventsApi):
+        MockEventsApi.return_value.events_events_retrieve.side_effect = retrieve
+
+        result, report = self.invoke("no-such-command\nshell\nevent get e1\n")
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual([r["exit_code"] for r in report], [2, 2, 0])
+        self.assertIn("3 commands run", result.stderr)
+
+    @patch("akc.event.EventsApi")
+    @patch("akc.event.get_client")
+    def test_fail_fast_stops_at_the_first_failure(self, mock_get_client, MockEventsApi):
+        result, report = self.invoke("no-such-command\nevent get e1\n", "--fail-fast")
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual([r["line"] for r in report], [1])
+        MockEventsApi.return_value.events_events_retrieve.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
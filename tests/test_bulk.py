@@ -0,0 +1,104 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from akc.bulk import Checkpoint, parse_bool, process_rows, read_rows
+
+
+class TestReadRows(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_csv(self):
+        path = self.write("users.csv", "username,email\nalice,a@example.com\nbob,\n")
+
+        self.assertEqual(list(read_rows(path)), [
+            {"username": "alice", "email": "a@example.com"},
+            {"username": "bob", "email": ""},
+        ])
+
+    def test_jsonl_skips_blank_lines(self):
+        path = self.write("users.jsonl", '{"username": "alice"}\n\n{"username": "bob"}\n')
+
+        self.assertEqual([r["username"] for r in read_rows(path)], ["alice", "bob"])
+
+    def test_parse_bool(self):
+        self.assertTrue(parse_bool("True"))
+        self.assertFalse(parse_bool("no", True))
+        self.assertTrue(parse_bool("", True))
+        self.assertFalse(parse_bool(False, True))
+
+
+class TestProcessRows(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.checkpoint = Checkpoint(os.path.join(self.tmp.name, "users.csv.checkpoint"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reports_errors_per_row_and_logs(self):
+        def create(row):
+            if row == "bad":
+                raise ValueError("duplicate")
+            return {"pk": row}
+
+        log = io.StringIO()
+        results = list(process_rows(create, ["a", "bad", "c"], 2, self.checkpoint, log, label=lambda row: {"name": row}))
+
+        self.assertEqual([r["status"] for r in results], ["ok", "error", "ok"])
+        self.assertEqual(results[1], {"row": 2, "name": "bad", "status": "error", "error": "duplicate"})
+        self.assertEqual([json.loads(line)["row"] for line in log.getvalue().splitlines()], [1, 2, 3])
+        self.assertEqual(self.checkpoint.load(), 3)
+
+    def test_resumes_after_checkpoint(self):
+        self.checkpoint.save(2)
+        seen = []
+
+        results = list(process_rows(seen.append, ["a", "b", "c", "d"], 1, self.checkpoint))
+
+        self.assertEqual(seen, ["c", "d"])
+        self.assertEqual([r["row"] for r in results], [3, 4])
+
+    def test_rerun_retries_failed_rows(self):
+        failing = {"b", "d"}
+        attempts = []
+
+        def create(row):
+            attempts.append(row)
+            if row in failing:
+                raise ValueError("server error")
+
+        results = list(process_rows(create, ["a", "b", "c", "d"], 2, self.checkpoint))
+        self.assertEqual([r["status"] for r in results], ["ok", "error", "ok", "error"])
+        self.assertEqual((self.checkpoint.load(), self.checkpoint.failed()), (4, {2, 4}))
+
+        failing.clear()
+        attempts.clear()
+        results = list(process_rows(create, ["a", "b", "c", "d", "e"], 1, self.checkpoint))
+
+        self.assertEqual(attempts, ["b", "d", "e"])
+        self.assertEqual([(r["row"], r["status"]) for r in results], [(2, "ok"), (4, "ok"), (5, "ok")])
+        self.assertEqual((self.checkpoint.load(), self.checkpoint.failed()), (5, set()))
+
+    def test_checkpoint_clear(self):
+        self.checkpoint.save(5)
+        self.checkpoint.clear()
+        self.checkpoint.clear()
+
+        self.assertEqual(self.checkpoint.load(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from akc import cache
+
+
+class FakePage:
+    def __init__(self, results):
+        self.results = results
+
+    def to_json(self):
+        return json.dumps({"results": self.results})
+
+    @classmethod
+    def from_json(cls, body):
+        return cls(json.loads(body)["results"])
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patches = [
+            patch("akc.cache.CACHE_DIR", self.tmp.name),
+            patch("akc.cache.CACHE_PATH", os.path.join(self.tmp.name, "cache.sqlite")),
+            patch("akc.cache._connection", None),
+            patch("akc.cache.ttl_for", return_value=60),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        if cache._connection is not None:
+            cache._connection.close()
+        for p in reversed(self.patches):
+            p.stop()
+        self.tmp.cleanup()
+
+    def make_list_method(self, *results):
+        list_method = MagicMock(side_effect=[FakePage(r) for r in results])
+        list_method.__name__ = "core_groups_list"
+        return list_method
+
+    def test_second_call_is_served_from_cache(self):
+        list_method = self.make_list_method(["a"], ["b"])
+
+        first = cache.cached(list_method, "groups")(page=1, page_size=10)
+        second = cache.cached(list_method, "groups")(page=1, page_size=10)
+
+        self.assertEqual(first.results, ["a"])
+        self.assertEqual(second.results, ["a"])
+        list_method.assert_called_once_with(page=1, page_size=10)
+
+    def test_query_is_part_of_the_key(self):
+        list_method = self.make_list_method(["a"], ["b"])
+
+        cache.cached(list_method, "groups")(page=1, page_size=10)
+        second = cache.cached(list_method, "groups")(page=2, page_size=10)
+
+        self.assertEqual(second.results, ["b"])
+        self.assertEqual(list_method.call_count, 2)
+
+    def bind(self, list_method, token):
+        list_method.__self__ = MagicMock()
+        list_method.__self__.api_client.configuration.host = "https://auth.example.com/api/v3"
+        list_method.__self__.api_client.configuration.access_token = token
+        return list_method
+
+    def test_tokens_do_not_share_pages(self):
+        admin = self.bind(self.make_list_method(["secret"]), "admin-token")
+        reader = self.bind(self.make_list_method(["public"]), "reader-token")
+
+        cache.cached(admin, "groups")(page=1)
+
+        self.assertEqual(cache.cached(reader, "groups")(page=1).results, ["public"])
+        keys = [key for key, in cache._connect().execute("SELECT key FROM entries")]
+        self.assertFalse(any("admin-token" in key for key in keys))
+
+    def test_refresh_refetches_and_stores(self):
+        list_method = self.make_list_method(["a"], ["b"])
+
+        cache.cached(list_method, "groups")(page=1)
+        refreshed = cache.cached(list_method, "groups", refresh=True)(page=1)
+        cached_again = cache.cached(list_method, "groups")(page=1)
+
+        self.assertEqual(refreshed.results, ["b"])
+        self.assertEqual(cached_again.results, ["b"])
+
+    def test_no_cache_returns_method_untouched(self):
+        list_method = self.make_list_method(["a"])
+
+        self.assertIs(cache.cached(list_method, "groups", no_cache=True), list_method)
+
+    def test_expired_entries_are_refetched(self):
+        list_method = self.make_list_method(["a"], ["b"])
+
+        cache.cached(list_method, "groups")(page=1)
+        with patch("akc.cache.time.time", return_value=10 ** 12):
+            second = cache.cached(list_method, "groups")(page=1)
+
+        self.assertEqual(second.results, ["b"])
+
+    def test_invalidate_drops_only_that_resource(self):
+        groups = self.make_list_method(["g1"], ["g2"])
+        roles = self.make_list_method(["r1"], ["r2"])
+        roles.__name__ = "core_roles_list"
+
+        cache.cached(groups, "groups")(page=1)
+        cache.cached(roles, "roles")(page=1)
+        cache.invalidate("groups")
+
+        self.assertEqual(cache.cached(groups, "groups")(page=1).results, ["g2"])
+        self.assertEqual(cache.cached(roles, "roles")(page=1).results, ["r1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import threading
+import time
+import unittest
+
+from akc.concurrency import ordered_map
+
+
+class TestOrderedMap(unittest.TestCase):
+    def test_preserves_input_order(self):
+        def slow_for_small(n):
+            time.sleep(0.01 * (5 - n))
+            return n * 10
+
+        self.assertEqual(list(ordered_map(slow_for_small, range(5), 5)), [0, 10, 20, 30, 40])
+
+    def test_bounds_in_flight_calls(self):
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def track(n):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.005)
+            with lock:
+                active[0] -= 1
+            return n
+
+        self.assertEqual(list(ordered_map(track, range(20), 3)), list(range(20)))
+        self.assertLessEqual(peak[0], 3)
+
+    def test_consumes_input_lazily(self):
+        consumed = []
+
+        def source():
+            for n in range(100):
+                consumed.append(n)
+                yield n
+
+        results = ordered_map(lambda n: n, source(), 2)
+        self.assertEqual(next(results), 0)
+        results.close()
+        self.assertLess(len(consumed), 5)
+
+    def test_reraises_errors_in_order(self):
+        def fail_on_two(n):
+            if n == 2:
+                raise ValueError(n)
+            return n
+
+        results = ordered_map(fail_on_two, range(4), 2)
+        self.assertEqual([next(results), next(results)], [0, 1])
+        with self.assertRaises(ValueError):
+            next(results)
+
+    def test_sequential_when_concurrency_is_one(self):
+        self.assertEqual(list(ordered_map(str, [1, 2], 1)), ["1", "2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+import unittest
+
+from typer.testing import CliRunner
+
+from akc.diff import diff_snapshots, field_changes
+from akc.main import app
+from akc.snapshot import record_line, write_file, write_manifest
+
+
+def make_snapshot(directory, **resources):
+    os.makedirs(directory)
+    entries = {}
+    for name, items in resources.items():
+        lines = sorted((str(item["pk"]), record_line(item)) for item in items)
+        entries[name] = write_file(directory, f"{name}.ndjson.gz", (line for _, line in lines))
+        os.replace(os.path.join(directory, f".{entries[name]['file']}.tmp"), os.path.join(directory, entries[name]["file"]))
+    write_manifest(directory, {"version": 1, "resources": entries})
+    return directory
+
+
+class TestDiff(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner(env={"NO_COLOR": "1"})
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.old = make_snapshot(
+            os.path.join(self.tmp.name, "old"),
+            users=[
+                {"pk": 1, "username": "alice", "attributes": {"team": "a"}},
+                {"pk": 2, "username": "bob", "attributes": {}},
+                {"pk": 3, "username": "carol", "attributes": {}},
+            ],
+            groups=[{"pk": "g1", "name": "admins"}],
+        )
+        self.new = make_snapshot(
+            os.path.join(self.tmp.name, "new"),
+            users=[
+                {"pk": 1, "username": "alice", "attributes": {"team": "b"}},
+                {"pk": 3, "username": "carol", "attributes": {}},
+                {"pk": 4, "username": "dave", "attributes": {}},
+            ],
+            groups=[{"pk": "g1", "name": "admins"}],
+        )
+
+    def test_lists_added_removed_and_changed_records(self):
+        changes = list(diff_snapshots(self.old, self.new))
+
+        self.assertEqual([(c["resource"], c["key"], c["change"]) for c in changes], [
+            ("users", "1", "changed"),
+            ("users", "2", "removed"),
+            ("users", "4", "added"),
+        ])
+        self.assertEqual(changes[0]["fields"], [{"field": "attributes.team", "old": "a", "new": "b"}])
+        self.assertEqual(changes[1]["record"]["username"], "bob")
+
+    def test_natural_keys_ignore_primary_keys(self):
+        other = make_snapshot(
+            os.path.join(self.tmp.name, "other"),
+            users=[
+                {"pk": 11, "username": "alice", "attributes": {"team": "a"}},
+                {"pk": 12, "username": "bob", "attributes": {"team": "x"}},
+                {"pk": 13, "username": "carol", "attributes": {}},
+            ],
+        )
+
+        changes = list(diff_snapshots(self.old, other, natural=True, ignore={"pk"}))
+
+        self.assertEqual([(c["resource"], c["key"], c["change"]) for c in changes], [
+            ("users", "bob", "changed"),
+            ("groups", "admins", "removed"),
+        ])
+
+    def test_command_writes_ndjson_and_exit_code(self):
+        result = self.runner.invoke(app, ["diff", self.old, self.new, "--resource", "users", "--exit-code"])
+
+        self.assertEqual(result.exit_code, 1)
+        lines = [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+        self.assertEqual([line["change"] for line in lines], ["changed", "removed", "added"])
+        self.assertIn("1 added, 1 removed, 1 changed.", result.stderr)
+
+        result = self.runner.invoke(app, ["diff", self.old, self.old, "--exit-code"])
+        self.assertEqual(result.exit_code, 0)
+
+    def test_field_changes_reports_missing_fields(self):
+        self.assertEqual(field_changes({"a": 1, "b": None}, {"a": 1}), [{"field": "b", "old": None, "new": None}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,12 @@
+import datetime
+import glob
+import gzip
+import json
+import os
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock, patch
+
 from typer.testing import CliRunner
 
 from akc.main import app
@@ -46,3 +53,195 @@ class TestEvent(unittest.TestCase):
         self.assertEqual(result.exit_code, 0, result.stdout)
         self.assertIn("'pk': 'test-uuid'", result.stdout)
         self.assertIn("'action': 'login'", result.stdout)
+
+
+class FakeEventServer:
+    """Serves stored events newest first, like events_events_list with ordering=-created."""
+
+    def __init__(self):
+        self.events = []
+        self.calls = []
+
+    def add(self, pk, second, day=19):
+        event = MagicMock(pk=pk, created=datetime.datetime(2025, 6, day, 12, 0, second, tzinfo=datetime.UTC))
+        event.to_dict.return_value = {"pk": pk, "action": "login_failed"}
+        self.events.append(event)
+
+    def list(self, page=1, page_size=100, ordering=None, **kwargs):
+        self.calls.append(dict(page=page, page_size=page_size, ordering=ordering, **kwargs))
+        ordered = sorted(self.events, key=lambda e: e.created, reverse=True)
+        response = MagicMock()
+        response.results = ordered[(page - 1) * page_size:page * page_size]
+        response.pagination.next = page + 1 if page * page_size < len(ordered) else 0
+        response.pagination.total_pages = -(-len(ordered) // page_size)
+        return response
+
+
+class TestEventTail(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner(env={"NO_COLOR": "1"})
+        self.server = FakeEventServer()
+
+    def invoke(self, args, on_sleep):
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            if not on_sleep:
+                raise KeyboardInterrupt
+            on_sleep.pop(0)()
+
+        with patch("akc.event.get_client"), patch("akc.event.EventsApi", autospec=True) as MockEventsApi, patch("akc.event.time.sleep", side_effect=sleep):
+            MockEventsApi.return_value.events_events_list.side_effect = self.server.list
+            result = self.runner.invoke(app, ["event", "tail", *args])
+        return result, sleeps
+
+    def pks(self, result):
+        return [json.loads(line)["pk"] for line in result.stdout.splitlines()]
+
+    def test_prints_recent_events_oldest_first(self):
+        for second in range(5):
+            self.server.add(f"e{second}", second)
+
+        result, _ = self.invoke(["-n", "3"], [])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertEqual(self.pks(result), ["e2", "e3", "e4"])
+        self.assertEqual(self.server.calls, [{"page": 1, "page_size": 3, "ordering": "-created"}])
+
+    def test_follow_emits_only_new_events_and_backs_off_when_idle(self):
+        self.server.add("e0", 0)
+        self.server.add("e1", 1)
+
+        def burst():
+            # Same timestamp as the cursor plus a burst larger than one page.
+            self.server.add("e1b", 1)
+            for second in range(2, 6):
+                self.server.add(f"e{second}", second)
+
+        result, sleeps = self.invoke(
+            ["--follow", "-n", "1", "--page-size", "2", "--filter", "action=login_failed"],
+            [lambda: None, burst, lambda: None, lambda: None],
+        )
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertEqual(self.pks(result), ["e1", "e1b", "e2", "e3", "e4", "e5"])
+        self.assertEqual(sleeps, [2.0, 4.0, 2.0, 4.0, 8.0])
+        self.assertTrue(all(c["action"] == "login_failed" and c["ordering"] == "-created" for c in self.server.calls))
+        idle_polls = [c for c in self.server.calls[1:] if c["page"] == 1]
+        self.assertEqual(len(idle_polls), 4)
+
+
+class TestEventArchive(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner(env={"NO_COLOR": "1"})
+        self.server = FakeEventServer()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def archive(self):
+        with patch("akc.event.get_client"), patch("akc.event.EventsApi") as MockEventsApi:
+            MockEventsApi.return_value.events_events_list.side_effect = self.server.list
+            return self.runner.invoke(app, [
+                "event", "archive", "--dir", self.tmp.name, "--format", "ndjson", "--page-size", "2", "--concurrency", "2",
+            ])
+
+    def archived(self):
+        pks = {}
+        for path in sorted(glob.glob(os.path.join(self.tmp.name, "date=*", "*.ndjson.gz"))):
+            day = os.path.basename(os.path.dirname(path))
+            with gzip.open(path, "rt") as f:
+                pks.setdefault(day, []).extend(json.loads(line)["pk"] for line in f)
+        return {day: sorted(day_pks) for day, day_pks in pks.items()}
+
+    def test_archives_incrementally_by_day(self):
+        for second in range(3):
+            self.server.add(f"a{second}", second, day=18)
+        for second in range(2):
+            self.server.add(f"b{second}", second, day=19)
+
+        result = self.archive()
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertIn("Archived 5 events into 2 ndjson files", result.stdout)
+        self.assertEqual(self.archived(), {"date=2025-06-18": ["a0", "a1", "a2"], "date=2025-06-19": ["b0", "b1"]})
+        self.assertTrue(all(c["ordering"] == "-created" for c in self.server.calls))
+
+        self.server.add("b1x", 1, day=19)
+        self.server.add("c0", 0, day=20)
+        self.server.calls.clear()
+
+        result = self.archive()
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertIn("Archived 2 events into 2 ndjson files", result.stdout)
+        self.assertEqual(self.archived(), {
+            "date=2025-06-18": ["a0", "a1", "a2"],
+            "date=2025-06-19": ["b0", "b1", "b1x"],
+            "date=2025-06-20": ["c0"],
+        })
+
+        result = self.archive()
+
+        self.assertIn("Archived 0 events into 0 ndjson files", result.stdout)
+
+    def test_failed_run_leaves_no_partial_files(self):
+        from authentik_client.exceptions import ApiException
+
+        for second in range(5):
+            self.server.add(f"a{second}", second)
+        pages = iter([self.server.list(page=1, page_size=2)])
+
+        def list_events(page, page_size, ordering):
+            if page == 1:
+                return next(pages)
+            raise ApiException(status=400, reason="Bad Request")
+
+        with patch("akc.event.get_client"), patch("akc.event.EventsApi") as MockEventsApi:
+            MockEventsApi.return_value.events_events_list.side_effect = list_events
+            result = self.runner.invoke(app, ["event", "archive", "--dir", self.tmp.name, "--format", "ndjson", "--page-size", "2"])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual([files for _, _, files in os.walk(self.tmp.name) if files], [])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "_state.json")))
+
+
+class TestEventStats(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner(env={"NO_COLOR": "1"})
+
+    def test_counts_live_events_since_cutoff(self):
+        now = datetime.datetime.now(datetime.UTC)
+        server = FakeEventServer()
+        for pk, minutes, action, ip in (
+            ("e1", 5, "login_failed", "10.0.0.1"),
+            ("e2", 10, "login_failed", "10.0.0.1"),
+            ("e3", 20, "login_failed", "10.0.0.2"),
+            ("e4", 30, "login_failed", "10.0.0.1"),
+            ("e5", 120, "login_failed", "10.0.0.1"),
+        ):
+            event = MagicMock(pk=pk, created=now - datetime.timedelta(minutes=minutes), action=action, client_ip=ip, app="", user={"username": "alice"})
+            server.events.append(event)
+
+        with patch("akc.event.get_client"), patch("akc.event.EventsApi", autospec=True) as MockEventsApi:
+            MockEventsApi.return_value.events_events_list.side_effect = server.list
+            result = self.runner.invoke(app, [
+                "event", "stats", "--group-by", "client_ip", "--since", "1h", "--top", "5",
+                "--filter", "action=login_failed", "-o", "json", "--page-size", "2",
+            ])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertEqual(json.loads(result.stdout), [
+            {"client_ip": "10.0.0.1", "count": 3},
+            {"client_ip": "10.0.0.2", "count": 1},
+        ])
+        self.assertTrue(all(c["ordering"] == "-created" and c["action"] == "login_failed" for c in server.calls))
+
+    def test_rejects_bad_group_by(self):
+        result = self.runner.invoke(app, ["event", "stats", "--group-by", "colour"])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("Cannot group by colour", result.output)
+
@@ -30,33 +30,33 @@ class TestFlowCommands(unittest.TestCase):
     @patch("akc.flow.FlowsApi")
     def test_export_flow_to_stdout(self, MockFlowsApi):
         mock_api = MockFlowsApi.return_value
-        mock_api.flows_instances_export_retrieve.return_value = "exported flow data"
+        mock_api.flows_instances_export_retrieve.return_value = b"exported flow data"
 
         result = self.runner.invoke(app, ["flow", "export", "flow-slug"])
 
         self.assertEqual(result.exit_code, 0)
-        mock_api.flows_instances_export_retrieve.assert_called_with(fs_slug="flow-slug")
+        mock_api.flows_instances_export_retrieve.assert_called_with(slug="flow-slug")
         self.assertIn("exported flow data", result.stdout)
 
     @patch("builtins.open", new_callable=unittest.mock.mock_open)
     @patch("akc.flow.FlowsApi")
     def test_export_flow_to_file(self, MockFlowsApi, mock_file):
         mock_api = MockFlowsApi.return_value
-        mock_api.flows_instances_export_retrieve.return_value = "exported flow data"
+        mock_api.flows_instances_export_retrieve.return_value = b"exported flow data"
 
         result = self.runner.invoke(app, ["flow", "export", "flow-slug", "-o", "flow.yaml"])
 
         self.assertEqual(result.exit_code, 0)
-        mock_api.flows_instances_export_retrieve.assert_called_with(fs_slug="flow-slug")
+        mock_api.flows_instances_export_retrieve.assert_called_with(slug="flow-slug")
         mock_file.assert_called_with("flow.yaml", "w")
         mock_file().write.assert_called_with("exported flow data")
         self.assertIn("Flow 'flow-slug' exported to flow.yaml.", result.stdout)
 
-    @patch("akc.flow.yaml.safe_load")
+    @patch("akc.flow.safe_load_all")
     @patch("akc.flow.FlowsApi")
-    def test_import_flow(self, MockFlowsApi, mock_safe_load):
+    def test_import_flow(self, MockFlowsApi, mock_safe_load_all):
         mock_api = MockFlowsApi.return_value
-        mock_safe_load.return_value = {"key": "value"}
+        mock_safe_load_all.side_effect = lambda stream: iter([{"key": "value"}] if stream.read() == "some yaml data" else [])
 
         with self.runner.isolated_filesystem():
             with open("flow.yaml", "w") as f:
@@ -65,9 +65,10 @@ class TestFlowCommands(unittest.TestCase):
             result = self.runner.invoke(app, ["flow", "import", "flow.yaml"])
 
             self.assertEqual(result.exit_code, 0)
-            mock_safe_load.assert_called_with("some yaml data")
+            mock_safe_load_all.assert_called_once()
             mock_api.flows_instances_import_create.assert_called_with(flow_set_request=FlowSetRequest(key="value"))
             self.assertIn("Flow from 'flow.yaml' imported successfully.", result.stdout)
 
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,105 @@
+import hashlib
+import io
+import json
+import pathlib
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from authentik_client.exceptions import ApiException
+from rich.console import Console
+from typer.testing import CliRunner
+
+from akc.flow import TIMING_COLUMNS
+from akc.main import app
+
+
+def flow(slug):
+    item = MagicMock(slug=slug)
+    return item
+
+
+@patch("akc.flow.invalidate")
+@patch("akc.flow.get_client")
+@patch("akc.flow.api.FlowsApi")
+class TestBulkFlowCommands(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner(env={"NO_COLOR": "1"})
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = pathlib.Path(self.tmp.name)
+
+    def rows(self, result):
+        return {row["flow"]: row for row in json.loads(result.stdout)}
+
+    def test_export_all_skips_unchanged_flows(self, MockFlowsApi, mock_get_client, mock_invalidate):
+        mock_api = MockFlowsApi.return_value
+        mock_api.flows_instances_list.return_value = MagicMock(results=[flow("login"), flow("logout")], pagination=MagicMock(next=0))
+        mock_api.flows_instances_export_retrieve.side_effect = lambda slug: f"slug: {slug}\n".encode()
+
+        result = self.runner.invoke(app, ["flow", "export-all", "--dir", str(self.dir), "-o", "json"])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertEqual({slug: row["status"] for slug, row in self.rows(result).items()}, {"login": "exported", "logout": "exported"})
+        self.assertEqual((self.dir / "login.yaml").read_bytes(), b"slug: login\n")
+        with open(self.dir / "_state.json") as f:
+            self.assertEqual(json.load(f)["exported"]["login"], hashlib.sha256(b"slug: login\n").hexdigest())
+        self.assertIsInstance(self.rows(result)["login"]["duration_ms"], int)
+
+        mock_api.flows_instances_export_retrieve.side_effect = lambda slug: f"slug: {slug}\nchanged: {slug == 'logout'}\n".encode()
+        result = self.runner.invoke(app, ["flow", "export-all", "--dir", str(self.dir), "-o", "json"])
+
+        self.assertEqual({slug: row["status"] for slug, row in self.rows(result).items()}, {"login": "exported", "logout": "exported"})
+        result = self.runner.invoke(app, ["flow", "export-all", "--dir", str(self.dir), "-o", "json"])
+        self.assertEqual({slug: row["status"] for slug, row in self.rows(result).items()}, {"login": "unchanged", "logout": "unchanged"})
+
+    def test_export_all_reports_failed_flows(self, MockFlowsApi, mock_get_client, mock_invalidate):
+        mock_api = MockFlowsApi.return_value
+        mock_api.flows_instances_list.return_value = MagicMock(results=[flow("login"), flow("broken")], pagination=MagicMock(next=0))
+
+        def export(slug):
+            if slug == "broken":
+                raise ApiException(status=500, reason="boom")
+            return b"slug: login\n"
+
+        mock_api.flows_instances_export_retrieve.side_effect = export
+
+        result = self.runner.invoke(app, ["flow", "export-all", "--dir", str(self.dir), "-o", "json"])
+
+        self.assertEqual(result.exit_code, 1)
+        rows = self.rows(result)
+        self.assertEqual(rows["login"]["status"], "exported")
+        self.assertTrue(rows["broken"]["status"].startswith("error"))
+        self.assertFalse((self.dir / "broken.yaml").exists())
+
+        with patch("akc.flow.console", Console(file=io.StringIO(), force_terminal=True, width=160)) as console:
+            result = self.runner.invoke(app, ["flow", "export-all", "--dir", str(self.dir)])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("unchanged", console.file.getvalue())
+        self.assertEqual([getter(rows["broken"]) for _, _, getter in TIMING_COLUMNS][-1], "")
+
+    @patch("akc.flow.FlowSetRequest")
+    def test_import_dir_skips_files_imported_before(self, MockFlowSetRequest, MockFlowsApi, mock_get_client, mock_invalidate):
+        mock_api = MockFlowsApi.return_value
+        mock_get_client.return_value.configuration.host = "https://auth.example.com/api/v3"
+        (self.dir / "login.yaml").write_text("slug: login\n")
+        (self.dir / "logout.yml").write_text("slug: logout\n")
+
+        result = self.runner.invoke(app, ["flow", "import-dir", str(self.dir), "-o", "json"])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertEqual({slug: row["status"] for slug, row in self.rows(result).items()}, {"login": "imported", "logout": "imported"})
+        self.assertEqual(mock_api.flows_instances_import_create.call_count, 2)
+        mock_invalidate.assert_called_once_with("flows")
+
+        (self.dir / "logout.yml").write_text("slug: logout\ntitle: Bye\n")
+        result = self.runner.invoke(app, ["flow", "import-dir", str(self.dir), "-o", "json"])
+
+        self.assertEqual({slug: row["status"] for slug, row in self.rows(result).items()}, {"login": "unchanged", "logout": "imported"})
+        self.assertEqual(mock_api.flows_instances_import_create.call_count, 3)
+        MockFlowSetRequest.assert_called_with(slug="logout", title="Bye")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from authentik_client.exceptions import ApiException
+
+from akc.governor import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Governor,
+    TokenBucket,
+    retry_after,
+)
+from akc.retry import EXHAUSTED_HEADER, call_with_retry
+
+
+class FakeResponse:
+    def __init__(self, status, **headers):
+        self.status = status
+        self.reason = ""
+        self.data = b"{}"
+        self.headers = {name.replace("_", "-"): value for name, value in headers.items()}
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+
+@patch("akc.governor.time.sleep")
+class TestGovernor(unittest.TestCase):
+    def governor(self, *responses, **kwargs):
+        request = MagicMock(side_effect=list(responses))
+        return Governor(request, **kwargs), request
+
+    def test_retries_transient_errors(self, mock_sleep):
+        governor, request = self.governor(FakeResponse(502), FakeResponse(429), FakeResponse(200))
+
+        self.assertEqual(governor("GET", "/core/users/", headers={}).status, 200)
+        self.assertEqual(request.call_count, 3)
+        request.assert_called_with("GET", "/core/users/", headers={})
+
+    @patch("akc.governor.time.monotonic")
+    def test_honours_retry_after_for_every_worker(self, mock_monotonic, mock_sleep):
+        now = [100.0]
+        mock_monotonic.side_effect = lambda: now[0]
+        mock_sleep.side_effect = lambda seconds: now.__setitem__(0, now[0] + seconds)
+        bucket = TokenBucket()
+        governor, request = self.governor(FakeResponse(429, Retry_After="3"), FakeResponse(200), bucket=bucket)
+
+        governor("GET", "/core/users/")
+
+        self.assertEqual(request.call_count, 2)
+        self.assertEqual(bucket.paused_until, 103.0)
+        self.assertEqual(now[0], 103.0)
+
+    def test_only_resends_unprocessed_writes(self, mock_sleep):
+        governor, request = self.governor(FakeResponse(502), FakeResponse(201))
+
+        response = governor("POST", "/core/users/")
+
+        self.assertEqual(response.status, 502)
+        self.assertEqual(response.headers[EXHAUSTED_HEADER], "1")
+        request.assert_called_once()
+
+        governor, request = self.governor(FakeResponse(503), FakeResponse(201))
+        self.assertEqual(governor("POST", "/core/users/").status, 201)
+
+    def test_gives_up_and_marks_the_response(self, mock_sleep):
+        governor, request = self.governor(*[FakeResponse(503)] * 3, attempts=3)
+
+        response = governor("GET", "/core/users/")
+
+        self.assertEqual(response.status, 503)
+        self.assertEqual(response.headers[EXHAUSTED_HEADER], "1")
+        self.assertEqual(request.call_count, 3)
+
+    def test_circuit_opens_after_consecutive_failures(self, mock_sleep):
+        breaker = CircuitBreaker(threshold=2, cooldown=60)
+        governor, request = self.governor(*[FakeResponse(500)] * 2, breaker=breaker, attempts=5)
+
+        with self.assertRaises(CircuitOpenError) as raised:
+            governor("GET", "/core/users/")
+
+        self.assertEqual(request.call_count, 2)
+        self.assertEqual(raised.exception.status, 503)
+        self.assertIn("not sending requests", raised.exception.body)
+
+    def test_circuit_closes_after_a_successful_trial(self, mock_sleep):
+        breaker = CircuitBreaker(threshold=1, cooldown=0)
+        governor, _request = self.governor(FakeResponse(500), FakeResponse(200), FakeResponse(200), breaker=breaker, attempts=1)
+
+        self.assertEqual(governor("GET", "/").status, 500)
+        self.assertEqual(governor("GET", "/").status, 200)
+        self.assertEqual(governor("GET", "/").status, 200)
+        self.assertIsNone(breaker.opened_at)
+
+
+class TestTokenBucket(unittest.TestCase):
+    @patch("akc.governor.time.sleep")
+    @patch("akc.governor.time.monotonic")
+    def test_limits_the_request_rate(self, mock_monotonic, mock_sleep):
+        now = [100.0]
+        mock_monotonic.side_effect = lambda: now[0]
+        mock_sleep.side_effect = lambda seconds: now.__setitem__(0, now[0] + seconds)
+        bucket = TokenBucket(rate=10, burst=2)
+
+        for _ in range(5):
+            bucket.acquire()
+
+        self.assertAlmostEqual(now[0], 100.3)
+
+
+class TestRetryAfter(unittest.TestCase):
+    def test_parses_seconds_and_dates(self):
+        self.assertEqual(retry_after(FakeResponse(429, Retry_After="2")), 2)
+        self.assertEqual(retry_after(FakeResponse(429, Retry_After="Wed, 21 Oct 2015 07:28:00 GMT")), 0)
+        self.assertIsNone(retry_after(FakeResponse(429)))
+        self.assertIsNone(retry_after(FakeResponse(429, Retry_After="soon")))
+
+
+class TestCallWithRetry(unittest.TestCase):
+    @patch("akc.retry.time.sleep")
+    def test_does_not_resend_what_the_governor_settled(self, mock_sleep):
+        error = ApiException(status=503)
+        error.headers = {EXHAUSTED_HEADER: "1"}
+        func = MagicMock(side_effect=error)
+
+        with self.assertRaises(ApiException):
+            call_with_retry(func)
+        func.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,15 @@
+import os
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
-from typer.testing import CliRunner
-from akc.main import app
-from rich.console import Console
+from unittest.mock import MagicMock, patch
+
 from authentik_client.models.group import Group
 from authentik_client.models.paginated_group_list import PaginatedGroupList
+from rich.console import Console
+from typer.testing import CliRunner
+
+from akc.main import app
+
 
 class TestGroupCommands(unittest.TestCase):
     def setUp(self):
@@ -63,5 +68,44 @@ class TestGroupCommands(unittest.TestCase):
         mock_api.groups_destroy.assert_called_with(group_pk="group-pk")
         self.assertIn("Group with ID group-pk deleted successfully.", result.stdout)
 
+GROUP = "6f1c2b9e-3a4d-4e5f-8a7b-9c0d1e2f3a4b"
+
+
+@patch("akc.group.invalidate")
+@patch("akc.group.get_client")
+@patch("akc.group.api.CoreApi")
+class TestRenameGroup(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner(env={"NO_COLOR": "1"})
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = patch.multiple("akc.resolve", INDEX_PATH=os.path.join(self.tmp.name, "index.sqlite"), _connection=None, _names={})
+        self.index.start()
+
+    def tearDown(self):
+        self.index.stop()
+        self.tmp.cleanup()
+
+    def test_old_name_no_longer_resolves_after_rename(self, MockCoreApi, mock_get_client, mock_invalidate):
+        mock_get_client.return_value.configuration.host = "https://auth.example.com/api/v3"
+        mock_api = MockCoreApi.return_value
+        admins, renamed = MagicMock(pk=GROUP), MagicMock(pk=GROUP)
+        # ``name`` is a MagicMock constructor argument, so it is set afterwards.
+        admins.name, renamed.name = "admins", "operators"
+        mock_api.core_groups_list.return_value = MagicMock(results=[admins], pagination=MagicMock(next=0))
+        mock_api.core_groups_partial_update.return_value = renamed
+
+        result = self.runner.invoke(app, ["group", "update", "admins", "--name", "operators"])
+        self.assertEqual(result.exit_code, 0, result.stdout)
+
+        mock_api.core_groups_list.return_value = MagicMock(results=[], pagination=MagicMock(next=0))
+        result = self.runner.invoke(app, ["group", "delete", "admins"])
+
+        self.assertNotEqual(result.exit_code, 0)
+        mock_api.core_groups_destroy.assert_not_called()
+
+        result = self.runner.invoke(app, ["group", "delete", "operators"])
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        mock_api.core_groups_destroy.assert_called_once_with(group_pk=GROUP)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,112 @@
+import os
+import socket
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+from typer.testing import CliRunner
+
+from akc import main
+
+# Cold-start budget for `import akc.main`, in milliseconds.
+IMPORT_BUDGET_MS = int(os.environ.get("AKC_IMPORT_BUDGET_MS", "500"))
+
+
+def import_times(code):
+    """Run ``code`` under ``python -X importtime`` and return cumulative microseconds per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestClient(unittest.TestCase):
+    def setUp(self):
+        main.reset_client()
+
+    def tearDown(self):
+        main.reset_client()
+
+    @patch("akc.main.build_client")
+    @patch("akc.main.load_config")
+    def test_get_client_is_memoized(self, mock_load_config, mock_build_client):
+        mock_load_config.return_value = {"base_url": "https://ak.example.com", "api_token": "token"}
+
+        first = main.get_client()
+        second = main.get_client()
+
+        self.assertIs(first, second)
+        mock_load_config.assert_called_once()
+        mock_build_client.assert_called_once_with(mock_load_config.return_value)
+
+    @patch("akc.main.build_client")
+    @patch("akc.main.load_config")
+    def test_reset_client_rebuilds(self, mock_load_config, mock_build_client):
+        mock_load_config.return_value = {"base_url": "https://ak.example.com", "api_token": "token"}
+
+        main.get_client()
+        main.reset_client()
+        main.get_client()
+
+        self.assertEqual(mock_build_client.call_count, 2)
+
+    def test_build_client_configures_pool(self):
+        client = main.build_client({"base_url": "https://ak.example.com/", "api_token": "token", "pool_size": 32})
+        configuration = client.configuration
+
+        self.assertEqual(configuration.host, "https://ak.example.com/api/v3")
+        self.assertEqual(configuration.access_token, "token")
+        self.assertEqual(configuration.connection_pool_maxsize, 32)
+        self.assertIn((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1), configuration.socket_options)
+
+    def test_build_client_keeps_api_path(self):
+        client = main.build_client({"base_url": "https://ak.example.com/api/v3", "api_token": "token", "keep_alive": False})
+        configuration = client.configuration
+
+        self.assertEqual(configuration.host, "https://ak.example.com/api/v3")
+        self.assertEqual(configuration.connection_pool_maxsize, main.DEFAULT_POOL_SIZE)
+        self.assertNotIn((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1), configuration.socket_options)
+
+
+class TestLazyCommands(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner(env={"NO_COLOR": "1"})
+
+    def test_import_stays_within_budget(self):
+        times = import_times("import akc.main")
+
+        self.assertLess(times["akc.main"] / 1000, IMPORT_BUDGET_MS)
+        self.assertNotIn("authentik_client", times)
+
+    def test_help_does_not_import_subcommands(self):
+        times = import_times("import sys; from akc.main import app; sys.argv = ['akc', '--help']; app()")
+
+        self.assertNotIn("authentik_client", times)
+        self.assertNotIn("akc.user", times)
+
+    def test_help_lists_every_subcommand(self):
+        result = self.runner.invoke(main.app, ["--help"])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        for name in main.COMMANDS:
+            self.assertIn(name, result.stdout)
+
+    def test_subcommand_is_loaded_on_use(self):
+        result = self.runner.invoke(main.app, ["core", "--help"])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertIn("list-tenants", result.stdout)
+        self.assertNotIn("--install-completion", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
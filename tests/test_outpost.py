@@ -1,5 +1,11 @@
+import datetime
+import io
+import json
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock, patch
+
+from authentik_client.exceptions import ApiException
+from rich.console import Console
 from typer.testing import CliRunner
 
 from akc.main import app
@@ -73,3 +79,38 @@ class TestOutpost(unittest.TestCase):
 
         self.assertEqual(result.exit_code, 0, result.stdout)
         self.assertIn("'version': 'test-version'", result.stdout)
+
+    @patch("akc.outpost.api.OutpostsApi")
+    @patch("akc.outpost.get_client")
+    def test_health_all_checks_every_outpost(self, mock_get_client, MockOutpostsApi):
+        outposts_api = MockOutpostsApi.return_value
+        outposts = [MagicMock(pk=f"o{i}") for i in range(3)]
+        for i, outpost in enumerate(outposts):
+            outpost.name = f"outpost-{i}"
+        outposts_api.outposts_instances_list.return_value = MagicMock(results=outposts, pagination=MagicMock(next=0))
+        instance = MagicMock(hostname="host-a", version="2025.6", version_outdated=False, last_seen=None)
+
+        def health(uuid):
+            if uuid == "o2":
+                raise ApiException(status=500, body="boom")
+            return [instance] if uuid == "o0" else []
+
+        outposts_api.outposts_instances_health_list.side_effect = health
+
+        result = self.runner.invoke(app, ["outpost", "health-all", "-o", "json"])
+
+        self.assertEqual(result.exit_code, 1, result.stdout)
+        rows = json.loads(result.stdout)
+        self.assertEqual([(r["outpost"], r["status"]) for r in rows], [
+            ("outpost-0", "ok"),
+            ("outpost-1", "no instances"),
+            ("outpost-2", "error: boom"),
+        ])
+        self.assertEqual(rows[0]["hostname"], "host-a")
+
+        instance.last_seen = datetime.datetime(2026, 1, 2, 3, 4, 5)
+        with patch("akc.outpost.console", Console(file=io.StringIO(), force_terminal=True, width=160)) as console:
+            result = self.runner.invoke(app, ["outpost", "health-all"])
+
+        self.assertEqual(result.exit_code, 1, result.stdout)
+        self.assertIn("2026-01-02 03:04:05", console.file.getvalue())
@@ -0,0 +1,154 @@
+import csv
+import datetime
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from rich.console import Console
+
+from akc import output
+from akc.output import print_items, print_table, write_csv, write_ndjson
+
+
+def make_item(data):
+    item = MagicMock()
+    item.to_dict.return_value = data
+    return item
+
+
+COLUMNS = [("ID", "cyan", lambda i: str(i.to_dict()["pk"]))]
+
+
+class TestStreamingWriters(unittest.TestCase):
+    def test_ndjson_writes_one_object_per_line(self):
+        stream = io.StringIO()
+        write_ndjson(stream, iter([make_item({"pk": 1, "name": "a"}), make_item({"pk": 2, "name": "[b]"})]))
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [{"pk": 1, "name": "a"}, {"pk": 2, "name": "[b]"}])
+
+    def test_ndjson_consumes_items_lazily(self):
+        stream = io.StringIO()
+        seen = []
+
+        def items():
+            for i in range(3):
+                seen.append(i)
+                self.assertEqual(len(stream.getvalue().splitlines()), i)
+                yield make_item({"pk": i})
+
+        write_ndjson(stream, items())
+        self.assertEqual(seen, [0, 1, 2])
+
+    def test_csv_uses_first_item_header_and_encodes_nested_values(self):
+        stream = io.StringIO()
+        write_csv(stream, iter([
+            make_item({"pk": 1, "username": "alice", "groups": ["a", "b"], "email": None}),
+            make_item({"pk": 2, "username": "bob", "groups": [], "email": "bob@example.com"}),
+        ]))
+
+        rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+        self.assertEqual(rows[0], {"pk": "1", "username": "alice", "groups": '["a", "b"]', "email": ""})
+        self.assertEqual(rows[1]["email"], "bob@example.com")
+
+    def test_csv_writes_nothing_for_no_items(self):
+        stream = io.StringIO()
+        write_csv(stream, iter([]))
+        self.assertEqual(stream.getvalue(), "")
+
+
+class TestPrintItems(unittest.TestCase):
+    def test_ndjson_bypasses_rich(self):
+        stream = io.StringIO()
+        console = Console(file=stream, width=20)
+
+        print_items(console, iter([make_item({"pk": 1, "name": "a very long name that would wrap"})]), "ndjson", "T", COLUMNS)
+
+        self.assertEqual(stream.getvalue(), '{"pk": 1, "name": "a very long name that would wrap"}\n')
+
+    def test_output_file_with_fields(self):
+        console = Console(file=io.StringIO())
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "users.csv")
+
+            print_items(console, iter([make_item({"pk": 1, "username": "alice", "email": "a@example.com"})]), "csv", "T", COLUMNS, "username,pk", path)
+
+            with open(path, newline="") as f:
+                self.assertEqual(list(csv.reader(f)), [["username", "pk"], ["alice", "1"]])
+        self.assertEqual(console.file.getvalue(), "")
+
+
+class TestPrintTable(unittest.TestCase):
+    columns = (
+        ("ID", None, lambda i: str(i["pk"])),
+        ("Name", None, lambda i: i["name"]),
+        ("Note", None, lambda i: i["note"]),
+    )
+
+    def test_plain_table_when_not_a_terminal(self):
+        stream = io.StringIO()
+        items = [{"pk": 1, "name": "alice", "note": None}, {"pk": 22, "name": "bob", "note": "multi\nline"}]
+
+        print_table(Console(file=stream, force_terminal=False), iter(items), "Users", self.columns)
+
+        self.assertEqual(stream.getvalue(), (
+            "ID  Name   Note\n"
+            "--  -----  ----------\n"
+            "1   alice\n"
+            "22  bob    multi line\n"
+        ))
+
+    def test_widths_are_sampled_and_later_cells_truncated(self):
+        stream = io.StringIO()
+        items = [{"pk": 1, "name": "ab", "note": "x"}, {"pk": 2, "name": "abcdef", "note": "a long last column"}]
+
+        with patch.object(output, "WIDTH_SAMPLE_ROWS", 1):
+            print_table(Console(file=stream, force_terminal=False), iter(items), None, self.columns)
+
+        self.assertEqual(stream.getvalue().splitlines()[-1], "2   abc\u2026  a long last column")
+
+    def test_rows_are_written_in_chunks(self):
+        writes = []
+
+        class Stream(io.StringIO):
+            def write(self, text):
+                writes.append(text)
+                return super().write(text)
+
+        stream = Stream()
+        items = ({"pk": i, "name": "n", "note": ""} for i in range(10))
+
+        with patch.object(output, "CHUNK_ROWS", 4):
+            print_table(Console(file=stream, force_terminal=False), items, None, self.columns)
+
+        self.assertEqual(len(stream.getvalue().splitlines()), 12)
+        self.assertEqual(len(writes), 3)
+
+    def test_terminal_uses_rich_table_until_threshold(self):
+        rich_stream = io.StringIO()
+        print_table(Console(file=rich_stream, force_terminal=True, width=80), iter([{"pk": 1, "name": "a", "note": ""}]), "Users", self.columns)
+        self.assertIn("\u2503", rich_stream.getvalue())
+
+        plain_stream = io.StringIO()
+        items = ({"pk": i, "name": "a", "note": ""} for i in range(4))
+        with patch.object(output, "RICH_TABLE_MAX_ROWS", 3):
+            print_table(Console(file=plain_stream, force_terminal=True, width=80), items, "Users", self.columns)
+        lines = plain_stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 1 + 2 + 4)
+        self.assertNotIn("\u2503", plain_stream.getvalue())
+
+    def test_rich_table_renders_values_that_are_not_strings(self):
+        stream = io.StringIO()
+        columns = [("Count", None, lambda i: i["count"]), ("Seen", None, lambda i: i["seen"])]
+        items = [{"count": 3, "seen": datetime.date(2026, 1, 2)}, {"count": 0, "seen": None}]
+
+        print_table(Console(file=stream, force_terminal=True, width=80), iter(items), None, columns)
+
+        self.assertIn("2026-01-02", stream.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import io
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from rich.console import Console
+
+from akc.output import print_json
+from akc.pagination import paginate
+
+
+def make_page(results, next_page=0, total_pages=0):
+    page = MagicMock()
+    page.results = results
+    page.pagination.next = next_page
+    page.pagination.total_pages = total_pages
+    return page
+
+
+class TestPaginate(unittest.TestCase):
+    def test_follows_next_until_last_page(self):
+        list_method = MagicMock(side_effect=[
+            make_page(["a", "b"], next_page=2),
+            make_page(["c", "d"], next_page=3),
+            make_page(["e"], next_page=0),
+        ])
+
+        self.assertEqual(list(paginate(list_method, page_size=2, search="x")), ["a", "b", "c", "d", "e"])
+        list_method.assert_any_call(page=1, page_size=2, search="x")
+        list_method.assert_called_with(page=3, page_size=2, search="x")
+
+    def test_is_lazy(self):
+        list_method = MagicMock(side_effect=[make_page(["a"], next_page=2), make_page(["b"])])
+
+        items = paginate(list_method)
+        self.assertEqual(next(items), "a")
+        self.assertEqual(list_method.call_count, 1)
+
+    def test_limit_stops_without_fetching_more_pages(self):
+        list_method = MagicMock(side_effect=[make_page(["a", "b"], next_page=2), make_page(["c", "d"])])
+
+        self.assertEqual(list(paginate(list_method, page_size=100, limit=2)), ["a", "b"])
+        list_method.assert_called_once_with(page=1, page_size=2)
+
+    def test_stops_on_missing_pagination(self):
+        page = MagicMock()
+        page.results = ["a"]
+        list_method = MagicMock(return_value=page)
+
+        self.assertEqual(list(paginate(list_method)), ["a"])
+        self.assertEqual(list_method.call_count, 1)
+
+    def test_prefetch_yields_pages_in_order(self):
+        pages = {
+            1: make_page(["a", "b"], next_page=2, total_pages=4),
+            2: make_page(["c", "d"], next_page=3, total_pages=4),
+            3: make_page(["e", "f"], next_page=4, total_pages=4),
+            4: make_page(["g"], total_pages=4),
+        }
+        list_method = MagicMock(side_effect=lambda page, page_size: pages[page])
+
+        self.assertEqual(list(paginate(list_method, page_size=2, concurrency=3)), list("abcdefg"))
+        self.assertEqual(list_method.call_count, 4)
+
+    def test_prefetch_respects_limit(self):
+        pages = {n: make_page([f"{n}a", f"{n}b"], next_page=n + 1, total_pages=10) for n in range(1, 11)}
+        list_method = MagicMock(side_effect=lambda page, page_size: pages[page])
+
+        self.assertEqual(list(paginate(list_method, page_size=2, limit=3, concurrency=4)), ["1a", "1b", "2a"])
+        self.assertEqual(list_method.call_count, 2)
+
+    def test_prefetch_falls_back_without_page_count(self):
+        list_method = MagicMock(side_effect=[make_page(["a"], next_page=2), make_page(["b"])])
+
+        self.assertEqual(list(paginate(list_method, concurrency=4)), ["a", "b"])
+
+
+class TestPrintJson(unittest.TestCase):
+    def render(self, items):
+        console = Console(record=True, width=20, file=io.StringIO())
+        print_json(console, items)
+        return console.export_text()
+
+    def test_matches_json_dumps(self):
+        items = []
+        for i in range(3):
+            item = MagicMock()
+            item.to_dict.return_value = {"pk": i, "name": f"a very long name number {i}"}
+            items.append(item)
+
+        text = self.render(iter(items))
+
+        self.assertEqual(text, json.dumps([i.to_dict() for i in items], indent=2) + "\n")
+
+    def test_empty(self):
+        self.assertEqual(json.loads(self.render(iter([]))), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import json
+import unittest
+from typing import Annotated
+from unittest.mock import MagicMock, patch
+
+import typer
+from authentik_client import api
+from pydantic import StrictBool, StrictInt, StrictStr
+from typer.testing import CliRunner
+
+from akc.main import app
+from akc.query import filter_names, query_params
+
+
+def users_list(
+    self,
+    is_active: StrictBool | None = None,
+    groups_by_name: list[StrictStr] | None = None,
+    username: Annotated[StrictStr | None, "Username"] = None,
+    count: StrictInt | None = None,
+    ordering: StrictStr | None = None,
+    page: StrictInt | None = None,
+    page_size: StrictInt | None = None,
+    search: StrictStr | None = None,
+    _request_timeout=None,
+):
+    pass
+
+
+def tenants_list(self, page=None, page_size=None):
+    pass
+
+
+class TestQueryParams(unittest.TestCase):
+    def test_coerces_values_to_parameter_types(self):
+        params = query_params(
+            users_list,
+            ["is_active=false", "groups_by_name=admins,staff", "groups_by_name=ops", "username=alice", "count=3"],
+            search="ali",
+            ordering="-last_login",
+        )
+
+        self.assertEqual(params, {
+            "is_active": False,
+            "groups_by_name": ["admins", "staff", "ops"],
+            "username": "alice",
+            "count": 3,
+            "search": "ali",
+            "ordering": "-last_login",
+        })
+
+    def test_rejects_unknown_filters(self):
+        with self.assertRaises(typer.BadParameter) as cm:
+            query_params(users_list, ["is_admin=true"])
+        self.assertIn("Unknown filter 'is_admin'", str(cm.exception))
+        self.assertIn("is_active", str(cm.exception))
+
+    def test_rejects_reserved_and_malformed_filters(self):
+        for item in ("page=2", "_request_timeout=1", "is_active"):
+            with self.assertRaises(typer.BadParameter):
+                query_params(users_list, [item])
+
+    def test_rejects_bad_values(self):
+        with self.assertRaises(typer.BadParameter):
+            query_params(users_list, ["is_active=maybe"])
+        with self.assertRaises(typer.BadParameter):
+            query_params(users_list, ["count=many"])
+
+    def test_rejects_search_when_unsupported(self):
+        with self.assertRaises(typer.BadParameter):
+            query_params(tenants_list, search="x")
+
+    def test_filter_names(self):
+        self.assertEqual(filter_names(users_list), ["count", "groups_by_name", "is_active", "username"])
+
+    def test_reads_the_generated_client_annotations(self):
+        params = query_params(api.CoreApi.core_users_list, ["is_active=yes", "groups_by_name=admins,staff"])
+
+        self.assertEqual(params, {"is_active": True, "groups_by_name": ["admins", "staff"]})
+
+
+class TestListQueryOptions(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner(env={"NO_COLOR": "1", "AKC_NO_CACHE": "1"})
+
+    def make_page(self, results):
+        page = MagicMock()
+        page.results = results
+        page.pagination.next = 0
+        return page
+
+    @patch("akc.event.EventsApi", autospec=True)
+    @patch("akc.event.get_client")
+    def test_filters_are_sent_to_the_server(self, mock_get_client, MockEventsApi):
+        events_api = MockEventsApi.return_value
+        event = MagicMock()
+        event.to_dict.return_value = {"pk": "e1", "action": "login_failed", "client_ip": "10.0.0.1", "app": "x"}
+        events_api.events_events_list.return_value = self.make_page([event])
+
+        result = self.runner.invoke(app, [
+            "event", "list", "--filter", "action=login_failed", "--filter", "client_ip=10.0.0.1",
+            "--ordering", "-created", "--fields", "pk,client_ip", "-o", "json",
+        ])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        events_api.events_events_list.assert_called_once_with(
+            page=1, page_size=100, action="login_failed", client_ip="10.0.0.1", ordering="-created"
+        )
+        self.assertEqual(json.loads(result.stdout), [{"pk": "e1", "client_ip": "10.0.0.1"}])
+
+    @patch("akc.event.EventsApi", autospec=True)
+    @patch("akc.event.get_client")
+    def test_unknown_filter_is_a_usage_error(self, mock_get_client, MockEventsApi):
+        result = self.runner.invoke(app, ["event", "list", "--filter", "colour=red"])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("Unknown filter 'colour'", result.output)
+        MockEventsApi.return_value.events_events_list.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import typer
+from authentik_client import api
+
+from akc import resolve
+from akc.resolve import KINDS
+
+FLOW = "3c9f1a52-8d7e-4b6a-9f0e-2d5c8b1a7e43"
+
+
+def page(*objects):
+    response = MagicMock()
+    response.results = list(objects)
+    response.pagination.next = 0
+    return response
+
+
+def named(pk, **fields):
+    obj = MagicMock(pk=pk)
+    for field, value in fields.items():
+        setattr(obj, field, value)
+    return obj
+
+
+class TestResolve(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patches = [
+            patch("akc.resolve.CACHE_DIR", self.tmp.name),
+            patch("akc.resolve.INDEX_PATH", os.path.join(self.tmp.name, "index.sqlite")),
+            patch("akc.resolve._connection", None),
+            patch("akc.resolve._names", {}),
+            patch("akc.resolve.api"),
+        ]
+        for p in self.patches:
+            p.start()
+        self.client = MagicMock()
+        self.client.configuration.host = "https://auth.example.com/api/v3"
+        self.core_api = resolve.api.CoreApi.return_value
+        self.flows_api = resolve.api.FlowsApi.return_value
+
+    def tearDown(self):
+        if resolve._connection is not None:
+            resolve._connection.close()
+        for p in reversed(self.patches):
+            p.stop()
+        self.tmp.cleanup()
+
+    def forget_memory(self):
+        resolve._names.clear()
+
+    def test_primary_keys_pass_through(self):
+        self.assertEqual(resolve.resolve(self.client, "user", "42"), 42)
+        self.assertEqual(resolve.resolve(self.client, "flow", FLOW), FLOW)
+        self.core_api.core_users_list.assert_not_called()
+        self.flows_api.flows_instances_list.assert_not_called()
+
+    def test_names_are_looked_up_once_and_persisted(self):
+        self.flows_api.flows_instances_list.return_value = page(named(FLOW, slug="default-auth"))
+
+        self.assertEqual(resolve.resolve(self.client, "flow", "default-auth"), FLOW)
+        self.forget_memory()
+        self.assertEqual(resolve.resolve(self.client, "flow", "default-auth"), FLOW)
+
+        self.flows_api.flows_instances_list.assert_called_once_with(slug="default-auth")
+
+    def test_stale_entries_are_looked_up_again(self):
+        self.core_api.core_users_list.side_effect = [page(named(7, username="bob")), page(named(8, username="bob"))]
+
+        self.assertEqual(resolve.resolve(self.client, "user", "bob"), 7)
+        with patch("akc.resolve.time.time", return_value=resolve.time.time() + resolve.INDEX_TTL + 1):
+            self.assertEqual(resolve.resolve(self.client, "user", "bob"), 8)
+
+    def test_renamed_objects_lose_their_old_name(self):
+        self.core_api.core_users_list.return_value = page(named(5, username="alice"))
+        self.assertEqual(resolve.resolve(self.client, "user", "alice"), 5)
+
+        resolve.reindex(self.client, "user", named(5, username="bob"))
+        self.core_api.core_users_list.return_value = page()
+
+        self.assertEqual(resolve.resolve(self.client, "user", "bob"), 5)
+        with self.assertRaises(typer.BadParameter):
+            resolve.resolve(self.client, "user", "alice")
+        self.forget_memory()
+        with self.assertRaises(typer.BadParameter):
+            resolve.resolve(self.client, "user", "alice")
+
+    def test_incremental_refresh_drops_old_names(self):
+        self.core_api.core_users_list.return_value = page(named(5, username="alice"))
+        resolve.refresh(self.client, "user")
+
+        self.core_api.core_users_list.return_value = page(named(5, username="bob"))
+        resolve.refresh(self.client, "user")
+        self.assertIn("last_updated__gt", self.core_api.core_users_list.call_args.kwargs)
+
+        self.core_api.core_users_list.return_value = page()
+        self.assertEqual(resolve.resolve(self.client, "user", "bob"), 5)
+        with self.assertRaises(typer.BadParameter):
+            resolve.resolve(self.client, "user", "alice")
+
+    def test_incremental_refresh_confirms_unchanged_names(self):
+        self.core_api.core_users_list.return_value = page(named(5, username="alice"))
+        resolve.refresh(self.client, "user")
+
+        later = resolve.time.time() + resolve.INDEX_TTL + 1
+        with patch("akc.resolve.time.time", return_value=later):
+            self.core_api.core_users_list.return_value = page()
+            resolve.refresh(self.client, "user")
+            self.forget_memory()
+            self.assertEqual(resolve.resolve(self.client, "user", "alice"), 5)
+
+        self.assertEqual(self.core_api.core_users_list.call_count, 2)
+
+    def test_refresh_indexes_one_page_at_a_time(self):
+        self.core_api.core_users_list.return_value = page(*(named(pk, username=f"user{pk}") for pk in range(5)))
+
+        with patch("akc.resolve.remember", wraps=resolve.remember) as mock_remember:
+            self.assertEqual(resolve.refresh(self.client, "user", page_size=2), 5)
+
+        self.assertEqual([len(call.args[2]) for call in mock_remember.call_args_list], [2, 2, 1])
+
+    def test_roles_and_applications_use_the_installed_client(self):
+        self.assertTrue(hasattr(api.RbacApi, KINDS["role"].list_method))
+        self.assertTrue(hasattr(api.CoreApi, KINDS["application"].list_method))
+        self.assertEqual((KINDS["role"].api, KINDS["application"].api), ("RbacApi", "CoreApi"))
+
+    def test_unknown_names_raise(self):
+        self.core_api.core_groups_list.return_value = page(named("g", name="admins-old"))
+
+        with self.assertRaises(typer.BadParameter):
+            resolve.resolve(self.client, "group", "admins")
+
+    def test_forget_drops_deleted_objects(self):
+        self.core_api.core_users_list.side_effect = [page(named(7, username="bob")), page()]
+
+        resolve.resolve(self.client, "user", "bob")
+        resolve.forget(self.client, "user", 7)
+
+        with self.assertRaises(typer.BadParameter):
+            resolve.resolve(self.client, "user", "bob")
+
+    def test_refresh_is_incremental_for_users(self):
+        self.core_api.core_users_list.side_effect = [page(named(1, username="alice")), page(named(2, username="bob"))]
+
+        self.assertEqual(resolve.refresh(self.client, "user"), 1)
+        self.assertEqual(resolve.refresh(self.client, "user"), 1)
+
+        first, second = self.core_api.core_users_list.call_args_list
+        self.assertNotIn("last_updated__gt", first.kwargs)
+        self.assertIn("last_updated__gt", second.kwargs)
+        self.forget_memory()
+        self.assertEqual(resolve.resolve(self.client, "user", "alice"), 1)
+        self.assertEqual(resolve.resolve(self.client, "user", "bob"), 2)
+
+    def test_full_refresh_replaces_the_kind(self):
+        self.flows_api.flows_instances_list.side_effect = [page(named(FLOW, slug="old")), page(named(FLOW, slug="new")), page()]
+
+        resolve.refresh(self.client, "flow")
+        resolve.refresh(self.client, "flow")
+        self.forget_memory()
+
+        self.assertEqual(resolve.resolve(self.client, "flow", "new"), FLOW)
+        with self.assertRaises(typer.BadParameter):
+            resolve.resolve(self.client, "flow", "old")
+
+
+if __name__ == "__main__":
+    unittest.main()
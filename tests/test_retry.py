@@ -0,0 +1,50 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from authentik_client.exceptions import ApiException
+
+from akc.retry import backoff_delay, call_with_retry
+
+
+class TestRetry(unittest.TestCase):
+    @patch("akc.retry.time.sleep")
+    def test_retries_transient_errors(self, mock_sleep):
+        func = MagicMock(side_effect=[ApiException(status=503), ApiException(status=429), "ok"])
+
+        self.assertEqual(call_with_retry(func, 1, key="value"), "ok")
+        func.assert_called_with(1, key="value")
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    @patch("akc.retry.time.sleep")
+    def test_does_not_retry_client_errors(self, mock_sleep):
+        func = MagicMock(side_effect=ApiException(status=400))
+
+        with self.assertRaises(ApiException):
+            call_with_retry(func)
+        func.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    @patch("akc.retry.time.sleep")
+    def test_non_idempotent_calls_retry_only_unprocessed_requests(self, mock_sleep):
+        func = MagicMock(side_effect=[ApiException(status=503), ApiException(status=429), ApiException(status=500)])
+
+        with self.assertRaises(ApiException):
+            call_with_retry(func, idempotent=False)
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    @patch("akc.retry.time.sleep")
+    def test_gives_up_after_attempts(self, mock_sleep):
+        func = MagicMock(side_effect=ApiException(status=502))
+
+        with self.assertRaises(ApiException):
+            call_with_retry(func, attempts=3)
+        self.assertEqual(func.call_count, 3)
+
+    def test_backoff_is_capped(self):
+        for attempt in range(20):
+            self.assertLessEqual(backoff_delay(attempt, base=0.5, cap=4), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
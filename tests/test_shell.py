@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import typer
+from typer.testing import CliRunner
+from urllib3.exceptions import MaxRetryError
+
+from akc.main import app
+from akc.shell import completions, run_line
+
+
+class TestShellCompletion(unittest.TestCase):
+    def setUp(self):
+        self.root = typer.main.get_command(app)
+
+    def test_completes_commands_and_subcommands(self):
+        self.assertEqual(completions(self.root, [], "ev"), ["event"])
+        self.assertIn("tail", completions(self.root, ["event"], ""))
+
+    def test_completes_options_of_a_command(self):
+        self.assertEqual(completions(self.root, ["event", "tail"], "--fo"), ["--follow"])
+
+
+class TestShell(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner(env={"NO_COLOR": "1"})
+        self.root = typer.main.get_command(app)
+
+    @patch("akc.event.EventsApi")
+    @patch("akc.event.get_client")
+    def test_runs_commands_against_one_command_tree(self, mock_get_client, MockEventsApi):
+        event = MagicMock()
+        event.to_dict.return_value = {"pk": "e1"}
+        MockEventsApi.return_value.events_events_retrieve.return_value = event
+
+        self.assertEqual(run_line(self.root, "event get e1"), 0)
+        first = self.root.commands["event"]
+        self.assertEqual(run_line(self.root, "event get 'e 2'"), 0)
+
+        self.assertIs(self.root.commands["event"], first)
+        MockEventsApi.return_value.events_events_retrieve.assert_called_with(event_uuid="e 2")
+
+    def test_errors_do_not_end_the_session(self):
+        self.assertEqual(run_line(self.root, "no-such-command"), 2)
+        self.assertEqual(run_line(self.root, "event get 'unterminated"), 2)
+        self.assertEqual(run_line(self.root, ""), 0)
+
+    @patch("akc.event.EventsApi")
+    @patch("akc.event.get_client")
+    def test_unhandled_errors_do_not_end_the_session(self, mock_get_client, MockEventsApi):
+        MockEventsApi.return_value.events_events_retrieve.side_effect = MaxRetryError(None, "/api/v3/events/events/e1/")
+
+        self.assertEqual(run_line(self.root, "event get e1"), 1)
+
+        with tempfile.TemporaryDirectory() as tmp, patch("akc.shell.HISTORY_PATH", os.path.join(tmp, "history")):
+            result = self.runner.invoke(app, ["shell"], input="event get e1\nhelp\nexit\n")
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertIn("Max retries exceeded", result.stdout)
+        self.assertIn("Usage:", result.stdout)
+
+    def test_loop_reads_lines_until_exit(self):
+        with tempfile.TemporaryDirectory() as tmp, patch("akc.shell.HISTORY_PATH", os.path.join(tmp, "history")), patch("akc.shell.run_line") as mock_run_line:
+            result = self.runner.invoke(app, ["shell"], input="event list\n\nexit\nevent get e1\n")
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertEqual([c.args[1] for c in mock_run_line.call_args_list], ["event list", ""])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from authentik_client.exceptions import ApiException
+from typer.testing import CliRunner
+
+from akc.main import app
+from akc.snapshot import read_manifest, read_records
+
+
+def obj(**fields):
+    item = MagicMock()
+    for name, value in fields.items():
+        setattr(item, name, value)
+    item.to_dict.return_value = fields
+    return item
+
+
+def page(*items):
+    return MagicMock(results=list(items), pagination=MagicMock(next=0))
+
+
+@patch("akc.snapshot.get_client")
+@patch("akc.snapshot.api")
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner(env={"NO_COLOR": "1"})
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.out = os.path.join(self.tmp.name, "snap")
+
+    def setup_api(self, mock_api):
+        mock_api.CoreApi.return_value.core_users_list.return_value = page(
+            obj(pk=12, username="zoe"), obj(pk=3, username="alice"),
+        )
+        flows_api = mock_api.FlowsApi.return_value
+        flows_api.flows_instances_list.return_value = page(obj(pk="f1", slug="login"))
+        flows_api.flows_instances_export_retrieve.return_value = b"version: 1\n"
+        return flows_api
+
+    def read(self, name):
+        with gzip.open(os.path.join(self.out, f"{name}.ndjson.gz"), "rt") as f:
+            return f.read()
+
+    def test_writes_sorted_files_and_manifest(self, mock_api, mock_get_client):
+        flows_api = self.setup_api(mock_api)
+        mock_get_client.return_value.configuration.host = "https://auth.example.com/api/v3"
+
+        result = self.runner.invoke(app, ["snapshot", "--out", self.out])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertIn("Saved 3 records of 12 resource types", result.stdout)
+        users = self.read("users")
+        self.assertEqual([json.loads(line)["username"] for line in users.splitlines()], ["zoe", "alice"])
+        self.assertEqual(json.loads(self.read("flows"))["blueprint"], "version: 1\n")
+        flows_api.flows_instances_export_retrieve.assert_called_once_with(slug="login")
+
+        with open(os.path.join(self.out, "manifest.json")) as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["resources"]["users"]["count"], 2)
+        self.assertEqual(manifest["resources"]["users"]["sha256"], hashlib.sha256(users.encode()).hexdigest())
+        self.assertEqual(manifest["resources"]["outposts"]["count"], 0)
+        self.assertEqual(list(manifest["resources"])[:3], ["users", "groups", "roles"])
+        self.assertEqual([name for name in os.listdir(self.out) if name.endswith(".tmp")], [])
+
+    def test_unchanged_data_gives_identical_files(self, mock_api, mock_get_client):
+        self.setup_api(mock_api)
+        mock_get_client.return_value.configuration.host = None
+
+        self.runner.invoke(app, ["snapshot", "--out", self.out])
+        with open(os.path.join(self.out, "users.ndjson.gz"), "rb") as f:
+            first = f.read()
+        self.runner.invoke(app, ["snapshot", "--out", self.out])
+        with open(os.path.join(self.out, "users.ndjson.gz"), "rb") as f:
+            self.assertEqual(f.read(), first)
+
+    def test_failed_resource_keeps_its_previous_data(self, mock_api, mock_get_client):
+        self.setup_api(mock_api)
+        mock_get_client.return_value.configuration.host = None
+        mock_api.SourcesApi.return_value.sources_all_list.return_value = page(obj(pk="s1", slug="ldap"))
+        self.runner.invoke(app, ["snapshot", "--out", self.out])
+        before = self.read("sources")
+        mock_api.SourcesApi.return_value.sources_all_list.side_effect = ApiException(status=500, reason="boom")
+        mock_api.SourcesApi.return_value.sources_all_list.side_effect.body = "boom"
+        mock_api.CoreApi.return_value.core_users_list.return_value = page(obj(pk=99, username="new"))
+
+        result = self.runner.invoke(app, ["snapshot", "--out", self.out])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("Error fetching sources: boom", result.stdout)
+        self.assertEqual(json.loads(self.read("users"))["username"], "new")
+        self.assertEqual(self.read("sources"), before)
+        manifest = read_manifest(self.out)
+        self.assertEqual(manifest["errors"], {"sources": "boom"})
+        self.assertEqual(manifest["resources"]["sources"]["count"], 1)
+        self.assertEqual([name for name in os.listdir(self.out) if name.endswith(".tmp")], [])
+
+    def test_failed_resource_without_previous_data_is_left_out(self, mock_api, mock_get_client):
+        self.setup_api(mock_api)
+        mock_get_client.return_value.configuration.host = None
+        mock_api.RbacApi.return_value.rbac_roles_list.side_effect = ApiException(status=404, reason="Not Found")
+
+        result = self.runner.invoke(app, ["snapshot", "--out", self.out])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("Saved 3 records of 11 resource types", result.stdout)
+        manifest = read_manifest(self.out)
+        self.assertNotIn("roles", manifest["resources"])
+        self.assertIn("roles", manifest["errors"])
+        mock_api.CoreApi.return_value.core_applications_list.assert_called()
+
+
+def users_list(current, updated):
+    """Fake ``core_users_list`` serving ``updated`` to ``last_updated__gt`` queries."""
+    def list_users(page=1, page_size=100, **params):
+        response = MagicMock(results=list(updated if "last_updated__gt" in params else current))
+        response.pagination = MagicMock(next=0, count=len(current))
+        return response
+    return list_users
+
+
+@patch("akc.snapshot.get_client")
+@patch("akc.snapshot.api")
+class TestIncrementalSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner(env={"NO_COLOR": "1"})
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.out = os.path.join(self.tmp.name, "snap")
+
+    def run_snapshot(self, mock_api, current, updated=(), *args):
+        mock_api.CoreApi.return_value.core_users_list.side_effect = users_list(current, updated)
+        result = self.runner.invoke(app, ["snapshot", "--out", self.out, "--incremental", *args])
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        return result, read_manifest(self.out)["resources"]["users"]
+
+    def usernames(self, entry):
+        return [json.loads(line)["username"] for _, line in read_records(self.out, entry)]
+
+    def test_writes_only_changes_as_delta_segments(self, mock_api, mock_get_client):
+        mock_get_client.return_value.configuration.host = None
+        users = [obj(pk=pk, username=f"user{pk}") for pk in range(1, 11)]
+        _, first = self.run_snapshot(mock_api, users)
+        self.assertNotIn("segments", first)
+
+        # Only updated users are fetched while the count shows no deletions.
+        renamed = obj(pk=2, username="renamed")
+        added = obj(pk=11, username="added")
+        users = [users[0], renamed] + users[2:] + [added]
+        result, entry = self.run_snapshot(mock_api, users, [renamed, added])
+        self.assertIn("(2 changed, 0 deleted)", result.stdout)
+        self.assertEqual(entry["file"], first["file"])
+        self.assertEqual(entry["count"], 11)
+        [segment] = entry["segments"]
+        self.assertEqual(segment["count"], 2)
+        self.assertEqual(self.usernames(entry)[:3], ["user1", "user10", "added"])
+        self.assertIn("renamed", self.usernames(entry))
+
+        # A count short of the expected total triggers a sweep that finds the deletion.
+        users = users[1:]
+        _, entry = self.run_snapshot(mock_api, users, [])
+        self.assertEqual((entry["changed"], entry["deleted"], entry["count"]), (0, 1, 10))
+        self.assertEqual(len(entry["segments"]), 2)
+        self.assertNotIn("user1", self.usernames(entry))
+
+        # Unchanged data writes nothing.
+        _, unchanged = self.run_snapshot(mock_api, users, [])
+        self.assertEqual(unchanged["segments"], entry["segments"])
+
+    def test_compaction_folds_segments_into_the_base_file(self, mock_api, mock_get_client):
+        mock_get_client.return_value.configuration.host = None
+        users = [obj(pk=pk, username=f"user{pk}") for pk in range(1, 11)]
+        self.run_snapshot(mock_api, users)
+        changed = obj(pk=5, username="renamed")
+        _, entry = self.run_snapshot(mock_api, users[:4] + [changed] + users[5:], [changed])
+        delta_file = entry["segments"][0]["file"]
+
+        _, compacted = self.run_snapshot(mock_api, users[:4] + [changed] + users[5:], [], "--compact")
+
+        self.assertEqual(compacted["segments"], [])
+        self.assertEqual(compacted["count"], 10)
+        self.assertIn("renamed", self.usernames(compacted))
+        self.assertFalse(os.path.exists(os.path.join(self.out, delta_file)))
+        self.assertFalse(os.path.exists(os.path.join(self.out, "users.ndjson.gz")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,9 @@
+import io
+import json
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock, patch
+
+from rich.console import Console
 from typer.testing import CliRunner
 
 from akc.main import app
@@ -58,3 +62,28 @@ class TestSource(unittest.TestCase):
 
         self.assertEqual(result.exit_code, 0, result.stdout)
         self.assertIn("Source 'test-slug' deleted successfully.", result.stdout)
+
+    @patch("akc.source.api.SourcesApi")
+    @patch("akc.source.get_client")
+    def test_use_all_checks_every_source_by_slug(self, mock_get_client, MockSourcesApi):
+        sources_api = MockSourcesApi.return_value
+        sources = [MagicMock(pk=f"s{i}", slug=f"slug-{i}") for i in range(2)]
+        for i, source in enumerate(sources):
+            source.name = f"source-{i}"
+        sources_api.sources_all_list.return_value = MagicMock(results=sources, pagination=MagicMock(next=0))
+        used = MagicMock()
+        used.to_dict.return_value = {"model_name": "flow", "name": "login"}
+        sources_api.sources_all_used_by_list.side_effect = lambda slug: [used] if slug == "slug-1" else []
+
+        result = self.runner.invoke(app, ["source", "use-all", "-o", "json"])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        rows = json.loads(result.stdout)
+        self.assertEqual([(r["name"], len(r["used_by"])) for r in rows], [("source-0", 0), ("source-1", 1)])
+        sources_api.sources_all_used_by_list.assert_any_call(slug="slug-0")
+
+        with patch("akc.source.console", Console(file=io.StringIO(), force_terminal=True, width=120)) as console:
+            result = self.runner.invoke(app, ["source", "use-all"])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertIn("flow 'login'", console.file.getvalue())
@@ -0,0 +1,189 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from authentik_client.exceptions import ApiException
+from typer.testing import CliRunner
+
+from akc.main import app
+
+AUTH_FLOW = "6a1f0c0e-0000-4000-8000-000000000001"
+INVALIDATION_FLOW = "6a1f0c0e-0000-4000-8000-000000000002"
+POLICY = "6a1f0c0e-0000-4000-8000-000000000003"
+APP_PBM = "6a1f0c0e-0000-4000-8000-000000000004"
+BINDING = "6a1f0c0e-0000-4000-8000-000000000005"
+
+
+def named(name, **attrs):
+    obj = MagicMock(**attrs)
+    obj.name = name
+    return obj
+
+
+def page(results):
+    response = MagicMock()
+    response.results = results
+    response.pagination.next = 0
+    return response
+
+
+class TestApplyCommand(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner(env={"NO_COLOR": "1"})
+        self.tmp = tempfile.TemporaryDirectory()
+
+        self.core_api = MagicMock()
+        self.core_api.core_groups_list.return_value = page([named("admins", pk="g1", is_superuser=True)])
+        self.core_api.core_applications_list.return_value = page(
+            [named("Grafana", pk="a1", pbm_uuid=APP_PBM, slug="grafana", provider=None)]
+        )
+
+        self.rbac_api = MagicMock()
+        self.rbac_api.rbac_roles_list.return_value = page([named("legacy", pk="r1")])
+
+        self.providers_api = MagicMock()
+        self.providers_api.providers_proxy_list.return_value = page([])
+        self.providers_api.providers_proxy_create.return_value = named("grafana-proxy", pk=12)
+
+        self.policies_api = MagicMock()
+        self.policies_api.policies_all_list.return_value = page([named("staff-only", pk=POLICY)])
+        self.policies_api.policies_bindings_list.return_value = page(
+            [MagicMock(pk=BINDING, policy=POLICY, target=APP_PBM, order=0, enabled=True)]
+        )
+
+        self.flows_api = MagicMock()
+        self.flows_api.flows_instances_list.return_value = page([
+            MagicMock(pk=AUTH_FLOW, slug="default-authorization"),
+            MagicMock(pk=INVALIDATION_FLOW, slug="default-invalidation"),
+        ])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_state(self, content):
+        path = os.path.join(self.tmp.name, "state.yaml")
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def invoke(self, content, *args):
+        state_file = self.write_state(content)
+        with patch("akc.state.get_client"), patch("akc.state.invalidate") as self.mock_invalidate, patch("akc.state.api") as mock_api:
+            mock_api.CoreApi.return_value = self.core_api
+            mock_api.RbacApi.return_value = self.rbac_api
+            mock_api.ProvidersApi.return_value = self.providers_api
+            mock_api.PoliciesApi.return_value = self.policies_api
+            mock_api.FlowsApi.return_value = self.flows_api
+            return self.runner.invoke(app, ["apply", state_file, *args])
+
+    def test_unchanged_state_only_reads(self):
+        result = self.invoke(
+            "groups:\n"
+            "  - name: admins\n"
+            "    is_superuser: true\n"
+            "applications:\n"
+            "  - slug: grafana\n"
+            "    name: Grafana\n"
+            "policy_bindings:\n"
+            "  - policy: staff-only\n"
+            "    target: grafana\n"
+            "    enabled: true\n"
+        )
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertIn("Plan: 0 to create, 0 to update, 0 to delete.", result.stdout)
+        self.core_api.core_groups_list.assert_called_once()
+        self.core_api.core_applications_list.assert_called_once()
+        self.core_api.core_groups_partial_update.assert_not_called()
+        self.core_api.core_applications_partial_update.assert_not_called()
+        self.policies_api.policies_bindings_partial_update.assert_not_called()
+        self.policies_api.policies_bindings_create.assert_not_called()
+
+    def test_plan_shows_diff_without_writing(self):
+        result = self.invoke(
+            "groups:\n"
+            "  - name: admins\n"
+            "    is_superuser: false\n"
+            "  - name: editors\n"
+            "roles:\n"
+            "  - name: legacy\n"
+            "    state: absent\n",
+            "--plan",
+        )
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertIn("~ group admins (is_superuser: True -> False)", result.stdout)
+        self.assertIn("+ group editors", result.stdout)
+        self.assertIn("- role legacy", result.stdout)
+        self.assertIn("Plan: 1 to create, 1 to update, 1 to delete.", result.stdout)
+        self.core_api.core_groups_create.assert_not_called()
+        self.core_api.core_groups_partial_update.assert_not_called()
+        self.rbac_api.rbac_roles_destroy.assert_not_called()
+
+    def test_applies_changes_in_dependency_order(self):
+        result = self.invoke(
+            "roles:\n"
+            "  - name: legacy\n"
+            "    state: absent\n"
+            "providers:\n"
+            "  - name: grafana-proxy\n"
+            "    type: proxy\n"
+            "    authorization_flow: default-authorization\n"
+            "    invalidation_flow: default-invalidation\n"
+            "    external_host: https://grafana.example.com\n"
+            "applications:\n"
+            "  - slug: grafana\n"
+            "    name: Grafana\n"
+            "    provider: grafana-proxy\n"
+        )
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.rbac_api.rbac_roles_destroy.assert_called_once_with(uuid="r1")
+        request = self.providers_api.providers_proxy_create.call_args.kwargs["proxy_provider_request"]
+        self.assertEqual(str(request.authorization_flow), AUTH_FLOW)
+        update = self.core_api.core_applications_partial_update.call_args.kwargs
+        self.assertEqual(update["slug"], "grafana")
+        self.assertEqual(update["patched_application_request"].provider, 12)
+        self.assertIn("Applied 3 changes (1 create, 1 update, 1 delete), 0 failed.", result.stdout)
+        self.mock_invalidate.assert_called_once_with("applications", "providers", "roles")
+
+    @patch("akc.retry.time.sleep")
+    def test_creates_are_not_resent_after_a_server_error(self, mock_sleep):
+        self.core_api.core_groups_create.side_effect = ApiException(status=500, reason="boom")
+
+        result = self.invoke("groups:\n  - name: editors\n")
+
+        self.assertEqual(result.exit_code, 1)
+        self.core_api.core_groups_create.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    def test_rejects_unknown_kinds(self):
+        result = self.invoke("users:\n  - username: alice\n")
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("Unknown resource kinds: users.", result.stdout)
+
+
+class TestApplyAgainstClient(unittest.TestCase):
+    """Runs apply through the installed client's API classes, with only the HTTP layer faked."""
+
+    def test_plan_for_groups_only(self):
+        runner = CliRunner(env={"NO_COLOR": "1"})
+        with tempfile.TemporaryDirectory() as tmp, patch("akc.state.get_client") as mock_get_client:
+            path = os.path.join(tmp, "state.yaml")
+            with open(path, "w") as f:
+                f.write("groups:\n  - name: admins\n  - name: editors\n")
+            client = mock_get_client.return_value
+            client.response_deserialize.return_value.data = page([named("admins", pk="g1")])
+
+            result = runner.invoke(app, ["apply", path, "--plan"])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertIn("+ group editors", result.stdout)
+        self.assertIn("Plan: 1 to create, 0 to update, 0 to delete.", result.stdout)
+        client.call_api.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
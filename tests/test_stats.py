@@ -0,0 +1,95 @@
+import datetime
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from akc.stats import EventCounter, EventRecord, _numpy, archive_records, parse_duration
+
+UTC = datetime.UTC
+
+
+def record(minute, action="login_failed", user="alice", app="", client_ip="10.0.0.1"):
+    return EventRecord(datetime.datetime(2025, 6, 19, 12, minute, tzinfo=UTC), action, user, app, client_ip)
+
+
+RECORDS = [
+    record(0),
+    record(10, client_ip="10.0.0.2"),
+    record(20),
+    record(40, action="login", user="bob"),
+    record(59, user=None),
+]
+
+
+class TestParseDuration(unittest.TestCase):
+    def test_units(self):
+        self.assertEqual(parse_duration("90s"), 90)
+        self.assertEqual(parse_duration("5m"), 300)
+        self.assertEqual(parse_duration("1h"), 3600)
+        self.assertEqual(parse_duration("7d"), 604800)
+
+    def test_invalid(self):
+        for text in ("", "1y", "h", "0m", None):
+            with self.assertRaises(ValueError):
+                parse_duration(text)
+
+
+class TestEventCounter(unittest.TestCase):
+    def count(self, group_by, use_numpy=False, bucket_seconds=1800):
+        counter = EventCounter(group_by, bucket_seconds, use_numpy=use_numpy)
+        counter.add(iter(RECORDS))
+        return counter
+
+    def test_groups_by_several_fields(self):
+        counter = self.count(["action", "client_ip"])
+
+        self.assertEqual(counter.total, 5)
+        self.assertEqual(counter.top(1), [{"action": "login_failed", "client_ip": "10.0.0.1", "count": 3}])
+        self.assertEqual(len(counter.counts), 3)
+
+    def test_buckets_and_missing_values(self):
+        counter = self.count(["bucket", "user"])
+
+        self.assertEqual(counter.top(10), [
+            {"bucket": "2025-06-19T12:00:00+00:00", "user": "alice", "count": 3},
+            {"bucket": "2025-06-19T12:30:00+00:00", "user": "bob", "count": 1},
+            {"bucket": "2025-06-19T12:30:00+00:00", "user": "", "count": 1},
+        ])
+
+    def test_rejects_unknown_fields(self):
+        with self.assertRaises(ValueError):
+            EventCounter(["colour"])
+
+    @unittest.skipUnless(_numpy(), "NumPy is not installed")
+    def test_numpy_matches_pure_python(self):
+        for group_by in (["action"], ["bucket", "user", "client_ip"]):
+            self.assertEqual(self.count(group_by, use_numpy=None).counts, self.count(group_by).counts)
+
+
+class TestArchiveRecords(unittest.TestCase):
+    def test_reads_partitions_from_since(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for day, pk in ((18, "old"), (19, "new")):
+                partition = os.path.join(tmp, f"date=2025-06-{day}")
+                os.makedirs(partition)
+                with gzip.open(os.path.join(partition, "part-1.ndjson.gz"), "wt") as f:
+                    for hour in (1, 23):
+                        f.write(json.dumps({
+                            "pk": f"{pk}{hour}",
+                            "created": f"2025-06-{day} {hour:02d}:00:00+00:00",
+                            "action": "login",
+                            "user": {"username": "alice"},
+                        }) + "\n")
+
+            since = datetime.datetime(2025, 6, 19, 12, tzinfo=UTC)
+            records = list(archive_records(tmp, since))
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].created, datetime.datetime(2025, 6, 19, 23, tzinfo=UTC))
+        self.assertEqual(records[0].user, "alice")
+
+
+if __name__ == "__main__":
+    unittest.main()
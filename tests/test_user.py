@@ -1,11 +1,14 @@
 import unittest
-from unittest.mock import patch, MagicMock
-from typer.testing import CliRunner
-from akc.main import app
-from rich.console import Console
-from authentik_client.models.user import User
+from unittest.mock import MagicMock, patch
+
 from authentik_client.models.paginated_user_list import PaginatedUserList
 from authentik_client.models.patched_user_request import PatchedUserRequest
+from authentik_client.models.user import User
+from rich.console import Console
+from typer.testing import CliRunner
+
+from akc.main import app
+
 
 class TestUserCommands(unittest.TestCase):
     def setUp(self):
@@ -1,11 +1,17 @@
+import os
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
-from typer.testing import CliRunner
-from akc.main import app
-from rich.console import Console
-from authentik_client.models.user import User
+from unittest.mock import MagicMock, patch
+
 from authentik_client.models.group import Group
 from authentik_client.models.patched_user_request import PatchedUserRequest
+from authentik_client.models.user import User
+from rich.console import Console
+from typer.testing import CliRunner
+
+from akc.main import app
+
+GROUP = "0b4d6c1e-5a43-4f8e-9a51-3f2c7e9d8a10"
 
 class TestUserGroupCommands(unittest.TestCase):
     def setUp(self):
@@ -52,5 +58,76 @@ class TestUserGroupCommands(unittest.TestCase):
         )
         self.assertIn("User 'testuser' removed from group 'testgroup' successfully.", result.stdout)
 
+class TestUserGroupBulkCommands(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner(env={"NO_COLOR": "1"})
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = patch.multiple("akc.resolve", INDEX_PATH=os.path.join(self.tmp.name, "index.sqlite"), _connection=None, _names={})
+        self.index.start()
+
+    def tearDown(self):
+        self.index.stop()
+        self.tmp.cleanup()
+
+    def write_users(self, content):
+        path = os.path.join(self.tmp.name, "users.txt")
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def make_core_api(self, members):
+        core_api = MagicMock()
+        group = MagicMock(pk="group-pk")
+        group.name = "testgroup"
+        core_api.core_groups_retrieve.return_value = group
+
+        def users_list(**kwargs):
+            page = MagicMock()
+            page.pagination.next = 0
+            if "groups_by_pk" in kwargs:
+                page.results = members
+            else:
+                page.results = [MagicMock(pk=42, username=kwargs["username"])]
+            return page
+
+        core_api.core_users_list.side_effect = users_list
+        return core_api
+
+    @patch("akc.user_group.invalidate")
+    @patch("akc.user_group.api.CoreApi")
+    @patch("akc.user_group.get_client")
+    def test_add_many_skips_existing_members(self, mock_get_client, MockCoreApi, mock_invalidate):
+        core_api = self.make_core_api([MagicMock(pk=1, username="alice")])
+        MockCoreApi.return_value = core_api
+
+        users_file = self.write_users("alice\n1\nbob\n7\nbob\n")
+
+        result = self.runner.invoke(app, ["user-group", "add-many", GROUP, "--users-file", users_file])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        core_api.core_groups_retrieve.assert_called_once_with(group_pk=GROUP)
+        added = sorted(c.kwargs["user_account_request"].pk for c in core_api.core_groups_add_user_create.call_args_list)
+        self.assertEqual(added, [7, 42])
+        core_api.core_users_list.assert_any_call(username="bob")
+        self.assertIn("2 users added to group 'testgroup', 2 skipped, 0 failed.", result.stdout)
+        mock_invalidate.assert_called_once_with("users", "groups")
+
+    @patch("akc.user_group.invalidate")
+    @patch("akc.user_group.api.CoreApi")
+    @patch("akc.user_group.get_client")
+    def test_remove_many_only_touches_members(self, mock_get_client, MockCoreApi, mock_invalidate):
+        core_api = self.make_core_api([MagicMock(pk=1, username="alice"), MagicMock(pk=2, username="carol")])
+        MockCoreApi.return_value = core_api
+
+        users_file = self.write_users("alice\n2\nbob\n")
+
+        result = self.runner.invoke(app, ["user-group", "remove-many", GROUP, "--users-file", users_file])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        removed = sorted(c.kwargs["user_account_request"].pk for c in core_api.core_groups_remove_user_create.call_args_list)
+        self.assertEqual(removed, [1, 2])
+        core_api.core_groups_add_user_create.assert_not_called()
+        self.assertIn("2 users removed from group 'testgroup', 1 skipped, 0 failed.", result.stdout)
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,11 +1,17 @@
+import os
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock, create_autospec, patch
+
+from authentik_client.api import CoreApi, RbacApi
+from authentik_client.models.patched_user_request import PatchedUserRequest
+from authentik_client.models.role import Role
+from authentik_client.models.user import User
+from rich.console import Console
 from typer.testing import CliRunner
+
 from akc.main import app
-from rich.console import Console
-from authentik_client.models.user import User
-from authentik_client.models.role import Role
-from authentik_client.models.patched_user_request import PatchedUserRequest
+
 
 class TestUserRoleCommands(unittest.TestCase):
     def setUp(self):
@@ -52,5 +58,94 @@ class TestUserRoleCommands(unittest.TestCase):
         )
         self.assertIn("Role 'testrole' removed from user 'testuser' successfully.", result.stdout)
 
+ADMIN = "0b6f1a52-8d7e-4c1e-9a55-3f0c2b8e1a01"
+VIEWER = "0b6f1a52-8d7e-4c1e-9a55-3f0c2b8e1a02"
+
+
+class TestUserRoleApply(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner(env={"NO_COLOR": "1"})
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_mapping(self, content):
+        path = os.path.join(self.tmp.name, "mapping.csv")
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def make_apis(self):
+        # Specced on the installed client, so calls to endpoints it lacks fail.
+        core_api = create_autospec(CoreApi, instance=True)
+        rbac_api = create_autospec(RbacApi, instance=True)
+        admin = MagicMock(pk=ADMIN)
+        admin.name = "admin"
+        viewer = MagicMock(pk=VIEWER)
+        viewer.name = "viewer"
+        users = [
+            MagicMock(pk=1, username="alice", roles=[ADMIN]),
+            MagicMock(pk=2, username="bob", roles=[]),
+            MagicMock(pk=3, username="carol", roles=[VIEWER]),
+        ]
+
+        def page(results):
+            response = MagicMock()
+            response.results = results
+            response.pagination.next = 0
+            return response
+
+        rbac_api.rbac_roles_list.return_value = page([admin, viewer])
+        core_api.core_users_list.return_value = page(users)
+        return core_api, rbac_api
+
+    @patch("akc.user_role.invalidate")
+    @patch("akc.user_role.api.RbacApi")
+    @patch("akc.user_role.api.CoreApi")
+    @patch("akc.user_role.get_client")
+    def test_applies_only_needed_changes(self, mock_get_client, MockCoreApi, MockRbacApi, mock_invalidate):
+        core_api, rbac_api = self.make_apis()
+        MockCoreApi.return_value = core_api
+        MockRbacApi.return_value = rbac_api
+        mapping = self.write_mapping(
+            "username,role,state\n"
+            "alice,admin,\n"
+            "bob,viewer,present\n"
+            "bob,admin,\n"
+            "carol,viewer,absent\n"
+            "dave,admin,\n"
+        )
+
+        result = self.runner.invoke(app, ["user-role", "apply", "--mapping-file", mapping])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        rbac_api.rbac_roles_list.assert_called_once()
+        core_api.core_users_list.assert_called_once()
+        updates = {
+            c.kwargs["id"]: [str(pk) for pk in c.kwargs["patched_user_request"].roles]
+            for c in core_api.core_users_partial_update.call_args_list
+        }
+        self.assertEqual(updates, {2: [VIEWER, ADMIN], 3: []})
+        self.assertIn("user 'dave' not found", result.stdout)
+        self.assertIn("2 users updated, 0 failed, 1 invalid rows.", result.stdout)
+        mock_invalidate.assert_called_once_with("users", "roles")
+
+    @patch("akc.user_role.api.RbacApi")
+    @patch("akc.user_role.api.CoreApi")
+    @patch("akc.user_role.get_client")
+    def test_dry_run_does_not_update(self, mock_get_client, MockCoreApi, MockRbacApi):
+        core_api, rbac_api = self.make_apis()
+        MockCoreApi.return_value = core_api
+        MockRbacApi.return_value = rbac_api
+        mapping = self.write_mapping("username,role\nbob,admin\n")
+
+        result = self.runner.invoke(app, ["user-role", "apply", "--mapping-file", mapping, "--dry-run"])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        core_api.core_users_partial_update.assert_not_called()
+        self.assertIn("bob: +admin --", result.stdout)
+        self.assertIn("1 users would be updated.", result.stdout)
+
 if __name__ == "__main__":
     unittest.main()
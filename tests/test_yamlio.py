@@ -0,0 +1,72 @@
+import io
+import os
+import time
+import unittest
+
+import yaml
+
+from akc.yamlio import LIBYAML, safe_load, safe_load_all
+
+
+def blueprint(documents, entries):
+    """Build a multi-document blueprint file of roughly flow-export shape."""
+    return "".join(
+        "---\n"
+        "version: 1\n"
+        f"metadata:\n  name: flow-{doc}\n  labels:\n    blueprints.goauthentik.io/generated: 'true'\n"
+        "entries:\n"
+        + "".join(
+            f"- model: authentik_flows.flowstagebinding\n"
+            f"  identifiers:\n    order: {entry}\n    target: !!str flow-{doc}\n"
+            f"  attrs:\n    evaluate_on_plan: true\n    re_evaluate_policies: false\n"
+            f"    policy_engine_mode: any\n    invalid_response_action: retry\n"
+            for entry in range(entries)
+        )
+        for doc in range(documents)
+    )
+
+
+class TestYamlio(unittest.TestCase):
+    def test_loads_single_documents(self):
+        self.assertEqual(safe_load("groups:\n- name: admins\n"), {"groups": [{"name": "admins"}]})
+        with self.assertRaises(yaml.YAMLError):
+            safe_load("!!python/object:os.system {}")
+
+    def test_yields_documents_one_at_a_time(self):
+        stream = io.StringIO("---\nslug: first\n---\nslug: [unclosed\n")
+        documents = safe_load_all(stream)
+
+        self.assertEqual(next(documents), {"slug": "first"})
+        with self.assertRaises(yaml.YAMLError):
+            next(documents)
+
+
+class TestLibyaml(unittest.TestCase):
+    @unittest.skipUnless(LIBYAML, "PyYAML was built without libyaml")
+    def test_libyaml_matches_the_python_parser(self):
+        data = blueprint(documents=20, entries=30)
+
+        fast = list(safe_load_all(data))
+
+        self.assertEqual(fast, list(yaml.load_all(data, Loader=yaml.SafeLoader)))
+        self.assertEqual(len(fast), 20)
+
+    # Wall-clock comparisons are unreliable on loaded machines, so this only
+    # runs when asked for.
+    @unittest.skipUnless(LIBYAML, "PyYAML was built without libyaml")
+    @unittest.skipUnless(os.environ.get("AKC_BENCHMARK"), "set AKC_BENCHMARK=1 to run benchmarks")
+    def test_libyaml_parses_blueprints_faster(self):
+        data = blueprint(documents=200, entries=30)
+
+        started = time.perf_counter()
+        list(safe_load_all(data))
+        fast_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        list(yaml.load_all(data, Loader=yaml.SafeLoader))
+        slow_seconds = time.perf_counter() - started
+
+        self.assertLess(fast_seconds, slow_seconds)
+
+
+if __name__ == "__main__":
+    unittest.main()